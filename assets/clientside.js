@@ -0,0 +1,52 @@
+// UI-only behaviors wired from src/components/clientside.py.
+// These run in the browser and never reach the server.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    ui: {
+        // Expand a card to fullscreen on odd clicks, collapse it on even clicks
+        toggle_card_fullscreen: function (n_clicks, className) {
+            var fullscreen = " fixed inset-4 z-50 overflow-auto w-[calc(100%-2rem)]";
+            var collapsed = (className || "").replace(fullscreen, "");
+
+            if (n_clicks % 2 === 1) {
+                return [collapsed + fullscreen, "/assets/minimize.svg"];
+            }
+            return [collapsed, "/assets/maximize.svg"];
+        },
+
+        // Keep the global year range ordered by swapping inverted bounds
+        order_years: function (start_year, end_year) {
+            var no_update = window.dash_clientside.no_update;
+
+            if (start_year !== null && end_year !== null && start_year > end_year) {
+                return [end_year, start_year];
+            }
+            return [no_update, no_update];
+        },
+
+        // Rebuild the query of the export links (one per format) from the filters
+        export_links: function (start_year, end_year, disaster_type, region, clickData) {
+            var hrefs = Array.prototype.slice.call(arguments, 5);
+            var params = [];
+
+            if (start_year !== null && start_year !== undefined) {
+                params.push("start_year=" + start_year);
+            }
+            if (end_year !== null && end_year !== undefined) {
+                params.push("end_year=" + end_year);
+            }
+            if (disaster_type && disaster_type !== "All") {
+                params.push("disaster_type=" + encodeURIComponent(disaster_type));
+            }
+            if (region && region !== "All") {
+                params.push("region=" + encodeURIComponent(region));
+            }
+            if (clickData && clickData.points && clickData.points.length) {
+                params.push("iso=" + encodeURIComponent(clickData.points[0].location));
+            }
+            return hrefs.map(function (href) {
+                // Keep the path and the format, the first parameter
+                return [href.split("&")[0]].concat(params).join("&");
+            });
+        }
+    }
+});
@@ -0,0 +1 @@
+"""Performance benchmarks of the dashboard, run as modules (python -m benchmarks.<name>)."""
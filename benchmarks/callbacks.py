@@ -0,0 +1,191 @@
+"""
+Latency of the chart computations at several data scales.
+
+Calls the graphics entry points directly (no server, no browser) for a
+matrix of filter inputs, on the data repeated 1, 10 and 100 times. Charts
+answered from the precomputed indexes should barely move with the scale;
+those filtering the events grow with it, and a chart suddenly growing
+faster than the data is a regression.
+
+    python -m benchmarks.callbacks [--scales 1 10 100] [--repeat 5]
+    python -m benchmarks.callbacks --save-baseline
+    python -m benchmarks.callbacks --compare [--tolerance 1.5]
+"""
+import argparse
+import json
+import platform
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from benchmarks.common import filter_events, load_dashboard_data, scale_data, summarize, time_call
+from src.graphics.country_details import CountryDetails
+from src.graphics.disaster_table import DisasterTable
+from src.graphics.map import Map
+from src.graphics.pie_chart import DisasterPieChart
+from src.graphics.statistics import Statistics
+from src.graphics.timed_count import TimedCount
+from src.graphics.treemap import DisasterTreemap
+from src.utils.indexes import build_indexes
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines" / "callbacks.json"
+
+# The calls bind their filters as lambda defaults, hence the open signature
+Case = Tuple[str, str, Callable[..., Any]]
+
+
+def year_ranges(data: pd.DataFrame) -> Dict[str, Tuple[Any, Any]]:
+    """Year filters exercised by every chart: everything, the last decade, the last year."""
+    last = int(data["Start Year"].max())
+    return {"all years": (None, None), "last decade": (last - 9, last), "last year": (last, last)}
+
+
+def build_cases(loaded: Dict[str, Any], data: pd.DataFrame) -> List[Case]:
+    """
+    List the (entry point, filter inputs, call) triples to time on data.
+
+    Each call includes the filtering its callback does before the entry point.
+    """
+    indexes = build_indexes(data)
+    top_type = data["Disaster Type"].value_counts().index[0]
+    top_region = data["Region"].value_counts().index[0]
+    top_iso = data["ISO"].value_counts().index[0]
+    years = year_ranges(data)
+
+    map_viz = Map(data, loaded["geojson"], loaded["areas"])
+    table = DisasterTable(data)
+    details = CountryDetails(data)
+    pie = DisasterPieChart(data, indexes.cube, indexes.countries)
+    timed = TimedCount(data, indexes.cube)
+
+    cases: List[Case] = []
+    for label, (start, end) in years.items():
+        for disaster_type, region in (("All", "All"), (top_type, "All"), ("All", top_region)):
+            filters = f"{label}, type={disaster_type}, region={region}"
+            cases.append((
+                "Map.create_figure", filters,
+                lambda s=start, e=end, t=disaster_type, r=region: map_viz.create_figure(
+                    filter_events(data, s, e, t, r), "Density"
+                ),
+            ))
+        for region in ("All", top_region):
+            cases.append((
+                "DisasterTreemap.create_figure", f"{label}, type={top_type}, region={region}",
+                lambda s=start, e=end, r=region: DisasterTreemap(
+                    filter_events(data, s, e, top_type, r)
+                ).create_figure("Total Deaths"),
+            ))
+        cases.append((
+            "DisasterTable.prepare_table_data", label,
+            lambda s=start, e=end: table.prepare_table_data(filter_events(data, s, e)),
+        ))
+        for group_by in ("Region", "Disaster Type"):
+            cases.append((
+                "TimedCount.create_yearly_traces", f"{label}, group_by={group_by}",
+                lambda s=start, e=end, g=group_by: timed.create_yearly_traces(s, e, g, "count"),
+            ))
+        cases.append((
+            "TimedCount.create_monthly_figure", label,
+            lambda s=start, e=end: timed.create_monthly_figure(s, e, "Region", "count"),
+        ))
+        cases.append((
+            "CountryDetails.create_details_content", f"{label}, iso={top_iso}",
+            lambda s=start, e=end: details.create_details_content(top_iso, filter_events(data, s, e)),
+        ))
+        cases.append((
+            "CountryIndex.type_counts", f"{label}, iso={top_iso}",
+            lambda s=start, e=end: details.create_counts_content(
+                top_iso, indexes.countries.type_counts(top_iso, s, e)
+            ),
+        ))
+        cases.append((
+            "Statistics.compute_stats", label,
+            lambda s=start, e=end: Statistics.compute_stats(data, s, e),
+        ))
+        for country in (None, top_iso):
+            cases.append((
+                "DisasterPieChart.compute_counts", f"{label}, iso={country}",
+                lambda s=start, e=end, c=country: pie.compute_counts(s, e, True, True, c),
+            ))
+    return cases
+
+
+def run(scales: List[int], repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Time every case at every scale, return the results keyed by 'entry point | filters | scale'."""
+    loaded = load_dashboard_data()
+    results: Dict[str, Dict[str, Any]] = {}
+    for scale in scales:
+        data = scale_data(loaded["data"], scale)
+        print(f"\n{scale}x data ({len(data):,} events)")
+        for entry_point, filters, call in build_cases(loaded, data):
+            call()  # Warm-up, the first call fills pandas and plotly caches
+            timing = summarize(time_call(call, repeat))
+            results[f"{entry_point} | {filters} | {scale}x"] = {
+                "entry_point": entry_point, "filters": filters, "scale": scale, "rows": len(data), **timing,
+            }
+            print(f"  {entry_point:<40}{filters:<55}{timing['median_ms']:>10.2f} ms")
+    return results
+
+
+def print_growth(results: Dict[str, Dict[str, Any]], scales: List[int]) -> None:
+    """Print how each case's median grows from the smallest to the largest scale."""
+    if len(scales) < 2:
+        return
+    low, high = min(scales), max(scales)
+    print(f"\nGrowth from {low}x to {high}x data (data grew {high // low}x)")
+    for key, result in results.items():
+        if result["scale"] != low:
+            continue
+        larger = results.get(key.replace(f"| {low}x", f"| {high}x"))
+        if larger:
+            growth = larger["median_ms"] / max(result["median_ms"], 1e-6)
+            print(f"  {result['entry_point']:<40}{result['filters']:<55}{growth:>8.1f}x")
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline_file: Path, tolerance: float) -> bool:
+    """Print the cases slower than tolerance times their baseline, return whether there are none."""
+    baseline = json.loads(baseline_file.read_text())["results"]
+    regressions = [
+        (key, baseline[key]["median_ms"], result["median_ms"])
+        for key, result in results.items()
+        if key in baseline and result["median_ms"] > tolerance * baseline[key]["median_ms"]
+    ]
+    print(f"\n{len(regressions)} regressions above {tolerance}x the baseline ({baseline_file})")
+    for key, before, after in regressions:
+        print(f"  {key}: {before:.2f} ms -> {after:.2f} ms")
+    return not regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the chart computations at several data scales")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="Data scales (default: 1 10 100)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per case (default: 5)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare the results to the baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Slowdown flagged as a regression (default: 1.5)")
+    args = parser.parse_args()
+    if args.compare and not args.save_baseline and not args.baseline.exists():
+        parser.error(f"no baseline at {args.baseline}, record one first with --save-baseline")
+
+    results = run(args.scales, args.repeat)
+    print_growth(results, args.scales)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "results": results,
+        }, indent=2))
+        print(f"\nBaseline written to {args.baseline}")
+
+    if args.compare and not compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Scaling of the cascade detection with the number of events.
+
+Synthetic catalogues of growing size (about two hundred countries, the
+disaster types of the cascade rules, starts over 125 years) are swept
+with the default rules. The time per million events of the sweep should
+stay flat as the catalogue doubles; the full build adds the sort and the
+fingerprints. A rebuild after one country changed reuses the others.
+
+    python -m benchmarks.cascades [--events 1000000 2000000 4000000 8000000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.cascades import CASCADE_RULES, CascadeIndex, sweep
+
+COUNTRIES = 200
+
+
+def synthetic_events(events: int, seed: int) -> pd.DataFrame:
+    """Events with DisNo., ISO, Region, Disaster Type and Start_Date columns."""
+    rng = np.random.default_rng(seed)
+    types = sorted({name for pair in CASCADE_RULES for name in pair} | {"Road", "Air", "Epidemic"})
+    countries = rng.integers(0, COUNTRIES, events)
+    starts = rng.integers(np.datetime64("1900-01-01").astype(int), np.datetime64("2024-12-31").astype(int), events)
+    return pd.DataFrame({
+        "DisNo.": np.char.add("E", np.arange(events).astype(str)).astype(object),
+        "ISO": np.char.add("C", countries.astype(str)).astype(object),
+        "Region": np.char.add("R", (countries % 5).astype(str)).astype(object),
+        "Disaster Type": np.array(types, dtype=object)[rng.integers(0, len(types), events)],
+        "Start_Date": starts.astype("datetime64[D]"),
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the cascade detection")
+    parser.add_argument("--events", type=int, nargs="+", default=[1_000_000, 2_000_000, 4_000_000, 8_000_000],
+                        help="Catalogue sizes (default: 1M 2M 4M 8M)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated data")
+    args = parser.parse_args()
+
+    print(f"{'events':>12}{'links':>10}{'sweep s':>10}{'s / M':>8}{'build s':>10}{'rebuild s':>11}")
+    for events in args.events:
+        data = synthetic_events(events, args.seed)
+
+        started = time.perf_counter()
+        index = CascadeIndex(data)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        sweep(index._iso_codes, index._days, index._type_codes, index._coded_rules(index.rules))
+        swept = time.perf_counter() - started
+
+        # One country gets a new event, the others keep their links
+        update = pd.concat([data, data.iloc[:1].assign(**{"DisNo.": "new"})], ignore_index=True)
+        started = time.perf_counter()
+        CascadeIndex(update, previous=index)
+        rebuild = time.perf_counter() - started
+
+        print(f"{events:>12,}{len(index._sources):>10,}{swept:>10.2f}{swept / events * 1e6:>8.2f}"
+              f"{build:>10.2f}{rebuild:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
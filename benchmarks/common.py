@@ -0,0 +1,77 @@
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from src.utils.get_data import load_areas_file, load_json_file, process_data
+from src.utils.indexes import build_indexes
+from src.utils.settings import get_project_paths
+
+
+def load_dashboard_data() -> Dict[str, Any]:
+    """
+    Load the data the dashboard is built from, as main.initialize_app does.
+
+    Returns:
+        Dict with the disasters 'data', the 'geojson', the country 'areas' and the 'indexes'
+    """
+    paths = get_project_paths()
+    data = process_data(paths["data"])["data"]
+    return {
+        "data": data,
+        "geojson": load_json_file(paths["geojson_file"]),
+        "areas": load_areas_file(paths["areas_file"]),
+        "indexes": build_indexes(data),
+    }
+
+
+def scale_data(data: pd.DataFrame, factor: int) -> pd.DataFrame:
+    """Repeat the events factor times, each copy with its own disaster numbers."""
+    if factor == 1:
+        return data
+    copies = []
+    for copy in range(factor):
+        scaled = data.copy()
+        scaled["DisNo."] = scaled["DisNo."].astype(str) + f"-{copy}"
+        copies.append(scaled)
+    return pd.concat(copies, ignore_index=True)
+
+
+def filter_events(
+    data: pd.DataFrame,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    disaster_type: Optional[str] = None,
+    region: Optional[str] = None,
+) -> pd.DataFrame:
+    """Filter the events the way the dashboard callbacks do."""
+    filtered = data
+    if start_year is not None:
+        filtered = filtered[filtered["Start Year"] >= start_year]
+    if end_year is not None:
+        filtered = filtered[filtered["Start Year"] <= end_year]
+    if disaster_type and disaster_type != "All":
+        filtered = filtered[filtered["Disaster Type"] == disaster_type]
+    if region and region != "All":
+        filtered = filtered[filtered["Region"] == region]
+    return filtered
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> List[float]:
+    """Call func repeat times and return each duration in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """Median and spread of a list of durations."""
+    series = pd.Series(durations)
+    return {
+        "median_ms": round(series.median(), 3),
+        "min_ms": round(series.min(), 3),
+        "max_ms": round(series.max(), 3),
+    }
@@ -0,0 +1,191 @@
+"""
+Local stand-in of the EM-DAT site to exercise the HTTP download path.
+
+The stub serves a login form setting a session cookie and an export of
+random bytes, with Range requests, an ETag, a Last-Modified date
+(conditional requests are answered 304) and a sha-256 Digest header.
+It can throttle its bandwidth and cut the first transfers midway, so that
+resuming and verification are exercised. A conditional refresh follows the
+download, as a nightly job on an unchanged export would:
+
+    python -m benchmarks.download_stub --size-mb 50 --drops 3 --rate-mbps 200
+
+The stub alone, to point the dashboard at it with DISASTERS_DOWNLOAD_MODE=http
+and DISASTERS_EMDAT_URL=http://127.0.0.1:8765 (credentials: stub / stub):
+
+    python -m benchmarks.download_stub --serve
+"""
+import argparse
+import base64
+import hashlib
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import parse_qs
+
+from src.utils.downloader import EXPORT_PATH, LOGIN_PATH, EmdatClient
+
+USERNAME = PASSWORD = "stub"
+
+# Bytes written at a time, and between two bandwidth checks
+SEND_CHUNK = 64 * 1024
+
+
+class StubState:
+    """Export served by the stub and the faults still to inject."""
+
+    def __init__(self, payload: bytes, drops: int, rate: Optional[float]):
+        self.payload = payload
+        self.etag = f'"{hashlib.sha256(payload).hexdigest()[:16]}"'
+        self.digest = base64.b64encode(hashlib.sha256(payload).digest()).decode("ascii")
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self.token = secrets.token_hex(16)
+        self.drops = drops
+        self.rate = rate
+        self.lock = threading.Lock()
+
+    def take_drop(self) -> bool:
+        """Whether the next transfer is cut midway."""
+        with self.lock:
+            if self.drops > 0:
+                self.drops -= 1
+                return True
+            return False
+
+
+def make_handler(state: StubState) -> type:
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def send_empty(self, status: int, headers: Optional[dict] = None) -> None:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self) -> None:
+            if self.path != LOGIN_PATH:
+                return self.send_empty(404)
+            length = int(self.headers.get("Content-Length", 0))
+            form = parse_qs(self.rfile.read(length).decode())
+            if form.get("username") != [USERNAME] or form.get("password") != [PASSWORD]:
+                return self.send_empty(401)
+            self.send_empty(200, {"Set-Cookie": f"session={state.token}; Path=/; HttpOnly"})
+
+        def do_GET(self) -> None:
+            if self.path != EXPORT_PATH:
+                return self.send_empty(404)
+            if f"session={state.token}" not in self.headers.get("Cookie", ""):
+                return self.send_empty(401)
+
+            validators = {"ETag": state.etag, "Last-Modified": state.last_modified}
+            if (
+                self.headers.get("If-None-Match") == state.etag
+                or self.headers.get("If-Modified-Since") == state.last_modified
+            ):
+                return self.send_empty(304, validators)
+
+            size = len(state.payload)
+            start, status = 0, 200
+            match = re.match(r"bytes=(\d+)-$", self.headers.get("Range", ""))
+            if_range = self.headers.get("If-Range")
+            if match and (if_range is None or if_range == state.etag):
+                start, status = int(match.group(1)), 206
+                if start >= size:
+                    return self.send_empty(416, {"Content-Range": f"bytes */{size}"})
+
+            body = memoryview(state.payload)[start:]
+            self.send_response(status)
+            self.send_header("Content-Type", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Accept-Ranges", "bytes")
+            for name, value in validators.items():
+                self.send_header(name, value)
+            self.send_header("Digest", f"sha-256={state.digest}")
+            if status == 206:
+                self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+            self.end_headers()
+
+            # A dropped transfer stops halfway and closes the connection
+            limit = len(body) // 2 if state.take_drop() else len(body)
+            started = time.perf_counter()
+            for offset in range(0, limit, SEND_CHUNK):
+                self.wfile.write(body[offset:min(offset + SEND_CHUNK, limit)])
+                if state.rate:
+                    ahead = (offset + SEND_CHUNK) / state.rate - (time.perf_counter() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+            if limit < len(body):
+                self.close_connection = True
+
+    return StubHandler
+
+
+def start_stub(state: StubState, port: int = 0) -> ThreadingHTTPServer:
+    """Serve the stub from a background thread, port 0 picks a free port."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, name="download-stub", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Download an export from a local EM-DAT stub")
+    parser.add_argument("--size-mb", type=float, default=20, help="Size of the export (default: 20)")
+    parser.add_argument("--drops", type=int, default=2, help="Transfers cut midway (default: 2)")
+    parser.add_argument("--rate-mbps", type=float, help="Bandwidth of the stub in MB/s (default: unlimited)")
+    parser.add_argument("--serve", action="store_true", help="Only serve the stub, until interrupted")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the stub with --serve (default: 8765)")
+    args = parser.parse_args()
+
+    payload = os.urandom(int(args.size_mb * 1e6))
+    state = StubState(payload, args.drops, args.rate_mbps * 1e6 if args.rate_mbps else None)
+
+    if args.serve:
+        server = start_stub(state, args.port)
+        print(f"EM-DAT stub on http://127.0.0.1:{args.port} ({len(payload) / 1e6:.1f} MB export)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    server = start_stub(state)
+    client = EmdatClient(f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            client.login(USERNAME, PASSWORD)
+            result = client.download(Path(directory) / "public_emdat.xlsx")
+            assert result["sha256"] == hashlib.sha256(payload).hexdigest()
+
+            started = time.perf_counter()
+            refresh = client.download(
+                Path(directory) / "public_emdat.xlsx",
+                etag=result["etag"],
+                last_modified=result["last_modified"],
+            )
+            refresh_seconds = time.perf_counter() - started
+            assert refresh.get("not_modified")
+    finally:
+        client.close()
+        server.shutdown()
+
+    print(
+        f"{result['size'] / 1e6:.1f} MB in {result['seconds']:.2f}s "
+        f"({result['size'] / 1e6 / result['seconds']:.0f} MB/s), {result['resumes']} resumes, checksum OK"
+    )
+    print(f"Conditional refresh: not modified in {refresh_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Import time of the web server, aggregated by package, with a budget check.
+
+Runs a fresh interpreter with -X importtime on the modules main.py imports
+(found by reading main.py, without running it) and sums the self time of
+every imported module by top-level package (and by module for src).
+Fails when the total goes over the budget or when a module that the web
+server must not load (selenium) is imported.
+
+    python -m benchmarks.import_time [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import ast
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Only needed by --scrape, not even installed in the production image
+FORBIDDEN_MODULES = ("selenium",)
+DEFAULT_BUDGET_MS = 1500
+
+
+def server_imports(entry_point: Path = PROJECT_ROOT / "main.py") -> List[str]:
+    """Modules imported at the top of the server entry point."""
+    tree = ast.parse(entry_point.read_text(encoding="utf-8"))
+    modules: List[str] = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return modules
+
+
+def measure(modules: List[str]) -> List[Tuple[str, int]]:
+    """Import modules in a fresh interpreter, return (module, self time in us) per imported module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    timings: List[Tuple[str, int]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        timings.append((name.strip(), int(self_us)))
+    return timings
+
+
+def aggregate(timings: List[Tuple[str, int]]) -> Dict[str, int]:
+    """Sum self times by top-level package, src modules are kept apart."""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us in timings:
+        key = name if name.startswith("src.") else name.split(".")[0]
+        totals[key] += self_us
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report the import time of the web server")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Total import time allowed (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--top", type=int, default=15, help="Packages listed (default: 15)")
+    args = parser.parse_args()
+
+    modules = server_imports()
+    timings = measure(modules)
+    totals = aggregate(timings)
+    total_ms = sum(totals.values()) / 1000
+
+    print(f"Importing {', '.join(modules)}")
+    print(f"\n{'package':<40}{'self ms':>10}{'share':>8}")
+    for name, self_us in sorted(totals.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<40}{self_us / 1000:>10.1f}{100 * self_us / 1000 / total_ms:>7.1f}%")
+    print(f"{'total':<40}{total_ms:>10.1f}   (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    imported = {name.split(".")[0] for name, _ in timings}
+    for module in FORBIDDEN_MODULES:
+        if module in imported:
+            failures.append(f"{module} is imported at startup")
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Latency of the "active on a day" queries of the interval index, against an overlap filter.
+
+Events are generated with a realistic spread of durations: most last a
+few days or weeks, a few (droughts, epidemics) several years, which is
+what makes a plain sort by start date insufficient. Each case is timed
+on random days and one-month periods; the overlap filter is the naive
+(start <= last) & (end >= first) pass over every event.
+
+    python -m benchmarks.intervals [--events 10000000] [--queries 200]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import summarize
+from src.utils.intervals import EventIntervals
+
+REGIONS = ["Africa", "Americas", "Asia", "Europe", "Oceania"]
+
+
+def synthetic_events(events: int, seed: int) -> pd.DataFrame:
+    """Events with Start_Date, End_Date and Region columns, between 1900 and 2024."""
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(np.datetime64("1900-01-01").astype(int), np.datetime64("2024-12-31").astype(int), events)
+    # Log-normal durations: a median of two weeks, about one event in a thousand over two years
+    durations = np.minimum(rng.lognormal(np.log(14), 1.6, events), 3650).astype(np.int64)
+    return pd.DataFrame({
+        "Start_Date": starts.astype("datetime64[D]"),
+        "End_Date": (starts + durations).astype("datetime64[D]"),
+        "Region": np.array(REGIONS, dtype=object)[rng.integers(0, len(REGIONS), events)],
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the interval index")
+    parser.add_argument("--events", type=int, default=10_000_000, help="Synthetic events (default: 10M)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries timed per case (default: 200)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated data")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data = synthetic_events(args.events, args.seed)
+    print(f"Generated {len(data):,} events in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    intervals = EventIntervals(data)
+    print(f"Indexed in {time.perf_counter() - start:.1f}s")
+
+    starts = data["Start_Date"].to_numpy().astype(np.int64)
+    ends = data["End_Date"].to_numpy().astype(np.int64)
+    rng = np.random.default_rng(args.seed)
+    days = rng.integers(intervals.min_day, intervals.max_day, args.queries)
+
+    def overlap_filter(first: int, last: int) -> np.ndarray:
+        return np.flatnonzero((starts <= last) & (ends >= first))
+
+    cases = {
+        "index, day": lambda day: intervals.active_on(np.datetime64(day, "D")),
+        "index, month": lambda day: intervals.overlapping(np.datetime64(day, "D"), np.datetime64(day + 30, "D")),
+        "index, day, region": lambda day: intervals.active_on(np.datetime64(day, "D"), "Asia"),
+        "overlap filter, day": lambda day: overlap_filter(day, day),
+        "daily counts, 10 years": lambda day: intervals.active_counts("day", 2000, 2009, "Asia"),
+    }
+    found = [len(intervals.active_on(np.datetime64(int(day), "D"))) for day in days]
+    print(f"{len(days)} days, median {int(np.median(found)):,} active events")
+
+    print(f"{'case':<24}{'median ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for label, run in cases.items():
+        durations = []
+        for day in days:
+            started = time.perf_counter()
+            run(int(day))
+            durations.append((time.perf_counter() - started) * 1000)
+        stats = summarize(durations)
+        print(f"{label:<24}{stats['median_ms']:>10.3f}{np.percentile(durations, 99):>10.3f}{stats['max_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
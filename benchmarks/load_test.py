@@ -0,0 +1,231 @@
+"""
+Replay realistic dashboard traffic against a running server and report latencies.
+
+Simulated users repeat the interactions of the dashboard (year range
+changes, map clicks, metric switches). Each interaction posts the
+_dash-update-component requests the browser would send for the callbacks
+depending on the changed input, built from the served layout and callback
+graph. Latency percentiles and throughput are reported per callback.
+
+By default a gunicorn server is started with the production settings
+(preloaded app). The simulated users replay few distinct filter states,
+so its callback cache is turned off unless --callback-cache is given,
+otherwise the repeats measure cache hits:
+
+    python -m benchmarks.load_test --users 8 --duration 30 --workers 2 --threads 4
+
+or an already running server is targeted:
+
+    python -m benchmarks.load_test --url http://127.0.0.1:8050 --users 8
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from src.utils.warmup import affected_callbacks, callback_request, collect_props, initial_state
+
+SCENARIOS = ("year_change", "map_click", "metric_switch")
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class DashboardClient:
+    """Build and send callback requests from the layout and callback graph served by the app."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+        self.props = collect_props(self.session.get(f"{self.url}/_dash-layout", timeout=30).json())
+        self.callbacks = [
+            callback for callback in self.session.get(f"{self.url}/_dash-dependencies", timeout=30).json()
+            if not callback.get("clientside_function")
+        ]
+        self.isos = [
+            total["key"] for total in self.session.get(
+                f"{self.url}/api/v1/totals", params={"group_by": "iso"}, timeout=30
+            ).json()["totals"]
+        ]
+
+    def initial_state(self) -> Dict[str, Any]:
+        """Values of every callback input and state, as first rendered."""
+        return initial_state(self.callbacks, self.props)
+
+    def options(self, component_id: str) -> List[Any]:
+        """Values a dropdown or radio component offers."""
+        return [
+            option["value"] if isinstance(option, dict) else option
+            for option in self.props.get(component_id, {}).get("options") or []
+        ]
+
+    def interaction(self, scenario: str, state: Dict[str, Any], rng: random.Random) -> List[str]:
+        """Apply a random interaction of a scenario to state, return the changed props."""
+        if scenario == "year_change":
+            years = sorted(self.options("start-year-filter"))
+            start, end = sorted(rng.sample(years, 2))
+            state["start-year-filter.value"], state["end-year-filter.value"] = start, end
+            return ["start-year-filter.value", "end-year-filter.value"]
+        if scenario == "map_click":
+            iso = rng.choice(self.isos)
+            state["map.clickData"] = {"points": [{"location": iso}]}
+            return ["map.clickData"]
+
+        metric_filters = sorted(
+            key for key in state if key.endswith("impact-metric-filter.value")
+        )
+        key = rng.choice(metric_filters)
+        state[key] = rng.choice(self.options(key.rsplit(".", 1)[0]))
+        return [key]
+
+    def post(
+        self,
+        session: requests.Session,
+        callback: Dict[str, Any],
+        state: Dict[str, Any],
+        changed: List[str],
+    ) -> Tuple[float, bool]:
+        """Send one callback request, return its latency in seconds and whether it succeeded."""
+        body = callback_request(callback, state, changed)
+        start = time.perf_counter()
+        try:
+            response = session.post(f"{self.url}/_dash-update-component", json=body, timeout=60)
+            ok = response.status_code in (200, 204)
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+
+def simulate_user(
+    client: DashboardClient,
+    deadline: float,
+    seed: int,
+    results: Dict[str, List[Tuple[float, bool]]],
+    lock: threading.Lock,
+) -> None:
+    """Repeat random interactions until the deadline, recording every callback latency."""
+    rng = random.Random(seed)
+    session = requests.Session()
+    state = client.initial_state()
+    while time.monotonic() < deadline:
+        changed = client.interaction(rng.choice(SCENARIOS), state, rng)
+        for callback in affected_callbacks(client.callbacks, changed):
+            latency, ok = client.post(session, callback, state, changed)
+            with lock:
+                results.setdefault(callback["output"].strip("."), []).append((latency, ok))
+
+
+def report(results: Dict[str, List[Tuple[float, bool]]], duration: float) -> None:
+    """Print throughput and latency percentiles per callback."""
+    print(f"\n{'callback':<60}{'requests':>9}{'errors':>8}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    everything = []
+    for callback, samples in sorted(results.items()):
+        latencies = np.array([latency for latency, _ in samples]) * 1000
+        errors = sum(not ok for _, ok in samples)
+        everything.extend(samples)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(
+            f"{callback[:59]:<60}{len(samples):>9}{errors:>8}{len(samples) / duration:>8.1f}"
+            f"{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}"
+        )
+    if everything:
+        latencies = np.array([latency for latency, _ in everything]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        errors = sum(not ok for _, ok in everything)
+        print(
+            f"{'all callbacks':<60}{len(everything):>9}{errors:>8}{len(everything) / duration:>8.1f}"
+            f"{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}"
+        )
+
+
+def start_server(
+    port: int, workers: int, threads: int, timeout: float, callback_cache: bool = False
+) -> subprocess.Popen:
+    """Start gunicorn on the app like the production image does, and wait until it is warmed up."""
+    env = dict(os.environ)
+    if not callback_cache:
+        env["DISASTERS_CALLBACK_CACHE_SIZE"] = "0"
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn",
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers),
+            "--threads", str(threads),
+            "--timeout", "90",
+            "--preload",
+            "main:server",
+        ],
+        cwd=PROJECT_ROOT,
+        env=env,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {server.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/ready", timeout=1).ok:
+                return server
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"Server not ready after {timeout}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the dashboard callbacks")
+    parser.add_argument("--url", help="Target a running server instead of starting gunicorn")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent simulated users (default: 8)")
+    parser.add_argument("--duration", type=float, default=30, help="Test duration in seconds (default: 30)")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers (default: 2)")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker (default: 4)")
+    parser.add_argument("--port", type=int, default=8051, help="Port of the started server (default: 8051)")
+    parser.add_argument(
+        "--callback-cache", action="store_true", help="Keep the callback cache of the started server on"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random interactions")
+    args = parser.parse_args()
+
+    server: Optional[subprocess.Popen] = None
+    url = args.url
+    if url is None:
+        server = start_server(args.port, args.workers, args.threads, timeout=300, callback_cache=args.callback_cache)
+        url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        client = DashboardClient(url)
+        results: Dict[str, List[Tuple[float, bool]]] = {}
+        lock = threading.Lock()
+        print(
+            f"{args.users} users for {args.duration:.0f}s against {url}"
+            + (
+                f" (gunicorn --workers {args.workers} --threads {args.threads} --preload, callback cache "
+                + ("on" if args.callback_cache else "off") + ")"
+                if server else ""
+            )
+        )
+        start = time.monotonic()
+        deadline = start + args.duration
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            users = [
+                pool.submit(simulate_user, client, deadline, args.seed + user, results, lock)
+                for user in range(args.users)
+            ]
+            for user in users:
+                user.result()
+        report(results, time.monotonic() - start)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
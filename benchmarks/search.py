@@ -0,0 +1,129 @@
+"""
+Type-ahead latency of the event search on a large synthetic catalogue.
+
+The local export holds too few distinct places to stress the index, so
+events are generated with a realistic vocabulary: locations drawn from a
+pool of place names whose words follow a Zipf law, a few named events and
+about two hundred countries. Queries replay a user typing: every prefix of
+a word from three letters on, alone or after a complete word.
+
+The type-ahead cases (top 50) should stay within a few milliseconds
+whatever the number of matches; the full match list and the countries
+of the map highlights grow with it.
+
+    python -m benchmarks.search [--events 10000000] [--queries 2000]
+"""
+import argparse
+import string
+import time
+from typing import List, Set
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import summarize
+from src.utils.search import MIN_PREFIX_LENGTH, SearchIndex, tokenize
+
+
+def random_words(rng: np.random.Generator, count: int) -> np.ndarray:
+    """Distinct lowercase pseudo-words of 3 to 10 letters."""
+    letters = np.array(list(string.ascii_lowercase))
+    words: Set[str] = set()
+    while len(words) < count:
+        lengths = rng.integers(3, 11, count)
+        words.update("".join(rng.choice(letters, length)) for length in lengths[:count - len(words)])
+    return np.array(sorted(words), dtype=object)
+
+
+def synthetic_events(events: int, places: int, words: int, seed: int) -> pd.DataFrame:
+    """Events with Location, Event Name, Country, ISO, date and deaths columns."""
+    rng = np.random.default_rng(seed)
+    vocabulary = random_words(rng, words)
+    zipf = 1 / np.arange(1, words + 1)
+    zipf /= zipf.sum()
+
+    def phrases(count: int, max_words: int) -> np.ndarray:
+        sizes = rng.integers(1, max_words + 1, count)
+        drawn = rng.choice(vocabulary, (count, max_words), p=zipf)
+        return np.array([" ".join(row[:size]).title() for row, size in zip(drawn, sizes)], dtype=object)
+
+    locations = phrases(places, 4)
+    names = phrases(2000, 2)
+    countries = phrases(200, 2)
+    country_codes = rng.integers(0, len(countries), events)
+
+    name_codes = rng.integers(0, len(names), events)
+    missing = np.array(None, dtype=object)
+    return pd.DataFrame({
+        "Location": np.where(rng.random(events) < 0.8, locations[rng.integers(0, places, events)], missing),
+        "Event Name": np.where(rng.random(events) < 0.1, names[name_codes], missing),
+        "Country": countries[country_codes],
+        "ISO": np.char.add("C", country_codes.astype(str)).astype(object),
+        "Start Year": rng.integers(1900, 2025, events),
+        "Start Month": rng.integers(1, 13, events).astype(float),
+        "Start Day": rng.integers(1, 29, events).astype(float),
+        "Total Deaths": np.where(rng.random(events) < 0.6, rng.pareto(1.2, events) * 10, np.nan),
+    })
+
+
+def typed_queries(data: pd.DataFrame, count: int, seed: int) -> List[str]:
+    """Queries a user types, keystroke by keystroke, from words of random events."""
+    rng = np.random.default_rng(seed)
+    queries: List[str] = []
+    while len(queries) < count:
+        row = data.iloc[int(rng.integers(len(data)))]
+        words = tokenize(row["Location"]) + tokenize(row["Country"])
+        if not words:
+            continue
+        target = words[int(rng.integers(len(words)))]
+        # Half of the queries follow a word already typed in full
+        before = words[0] + " " if rng.random() < 0.5 and words[0] != target else ""
+        for stop in range(MIN_PREFIX_LENGTH, len(target) + 1):
+            queries.append(before + target[:stop])
+    return queries[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the event search index")
+    parser.add_argument("--events", type=int, default=10_000_000, help="Synthetic events (default: 10M)")
+    parser.add_argument("--places", type=int, default=500_000, help="Distinct locations (default: 500k)")
+    parser.add_argument("--words", type=int, default=100_000, help="Distinct place words (default: 100k)")
+    parser.add_argument("--queries", type=int, default=2000, help="Queries timed (default: 2000)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated data")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data = synthetic_events(args.events, args.places, args.words, args.seed)
+    print(f"Generated {len(data):,} events in {time.perf_counter() - start:.1f}s")
+
+    deaths_order = np.argsort(-data["Total Deaths"].fillna(-np.inf).to_numpy(), kind="stable")
+    start = time.perf_counter()
+    index = SearchIndex(data, deaths_order)
+    print(f"Indexed {len(index.vocabulary):,} words in {time.perf_counter() - start:.1f}s")
+
+    queries = typed_queries(data, args.queries, args.seed)
+    cases = {
+        "top 50 by deaths": lambda query: index.search(query, "deaths", 50),
+        "top 50 by date": lambda query: index.search(query, "date", 50),
+        "top 50, 2000-2024": lambda query: index.search(query, "deaths", 50, 2000, 2024),
+        "top 50, 1990": lambda query: index.search(query, "deaths", 50, 1990, 1990),
+        "all matches": lambda query: index.search(query),
+        "countries": lambda query: index.countries(query),
+    }
+    totals = [len(index.search(query)) for query in queries]
+    print(f"{len(queries)} queries, median {int(np.median(totals)):,} matches, max {max(totals):,}")
+
+    print(f"{'case':<22}{'median ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for label, run in cases.items():
+        durations = []
+        for query in queries:
+            started = time.perf_counter()
+            run(query)
+            durations.append((time.perf_counter() - started) * 1000)
+        p95, p99 = np.percentile(durations, [95, 99])
+        stats = summarize(durations)
+        print(f"{label:<22}{stats['median_ms']:>10.3f}{p95:>10.3f}{p99:>10.3f}{stats['max_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Payload size and JSON encoding time of each chart update.
+
+Every chart callback returns a Patch; this builds the payload of the
+default view of each chart, with and without typed arrays, and encodes
+it with each JSON engine plotly can use.
+
+    python -m benchmarks.serialization [--repeat 20]
+"""
+import argparse
+from typing import Any, Callable, Dict
+
+from plotly.io.json import to_json_plotly
+
+from benchmarks.common import load_dashboard_data, summarize, time_call
+from src.graphics.map import Map
+from src.graphics.pie_chart import DisasterPieChart
+from src.graphics.seasonality import Seasonality
+from src.graphics.timed_count import TimedCount
+from src.graphics.treemap import DisasterTreemap
+from src.utils import serialization
+from src.utils.cube import DisasterCube
+
+
+def chart_payloads(loaded: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+    """Build the default view payload of each chart, as its callback does."""
+    data, indexes = loaded["data"], loaded["indexes"]
+    map_viz = Map(data, loaded["geojson"], loaded["areas"])
+    time_viz = TimedCount(data, indexes.cube)
+    pie_viz = DisasterPieChart(data, indexes.cube, indexes.countries)
+    treemap_viz = DisasterTreemap(data[data["Disaster Type"] == data["Disaster Type"].iloc[0]])
+    seasonality_viz = Seasonality(indexes.cube)
+
+    return {
+        "map": lambda: map_viz.create_patch(data, "Density"),
+        "time_series_yearly": lambda: _yearly_patch(time_viz, indexes.cube),
+        "time_series_monthly": lambda: _monthly_patch(time_viz, indexes.cube),
+        "pie": lambda: DisasterPieChart.create_patch(
+            pie_viz.compute_counts(grouped=True, fold_others=True), "percent"
+        ),
+        "treemap": lambda: treemap_viz.create_patch("Total Deaths"),
+        "seasonality": lambda: seasonality_viz.create_patch(None, None, "All", "count"),
+    }
+
+
+def _yearly_patch(time_viz: TimedCount, cube: DisasterCube) -> Any:
+    traces, y_title = time_viz.create_yearly_traces(cube.min_year, cube.max_year, "Region", "count")
+    return TimedCount.create_patch(traces, "Year", y_title)
+
+
+def _monthly_patch(time_viz: TimedCount, cube: DisasterCube) -> Any:
+    traces, y_title, annotations = time_viz.create_monthly_traces(
+        cube.min_year, cube.max_year, "Region", "count"
+    )
+    return TimedCount.create_patch(traces, "Month", y_title, annotations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark chart payload serialization")
+    parser.add_argument("--repeat", type=int, default=20, help="Encodings timed per case (default: 20)")
+    args = parser.parse_args()
+
+    loaded = load_dashboard_data()
+    engines = ["json"] + (["orjson"] if serialization.orjson is not None else [])
+
+    print(f"{'chart':<22}{'typed':>7}{'build ms':>10}" + "".join(
+        f"{engine + ' ms':>11}{engine + ' bytes':>14}" for engine in engines
+    ))
+    for typed in (False, True):
+        serialization.TYPED_ARRAYS_ENABLED = typed
+        for name, build in chart_payloads(loaded).items():
+            build_time = summarize(time_call(build, args.repeat))["median_ms"]
+            payload = {"response": {"figure": build()}}
+            row = f"{name:<22}{str(typed):>7}{build_time:>10.2f}"
+            for engine in engines:
+                encoded = to_json_plotly(payload, engine=engine)
+                encode_time = summarize(
+                    time_call(lambda: to_json_plotly(payload, engine=engine), args.repeat)
+                )["median_ms"]
+                row += f"{encode_time:>11.2f}{len(encoded):>14,}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Cache hits of browser-shaped requests once the warm-up finished.
+
+Builds the app in process, waits for /ready, then replays what a first
+visitor sends: the first page load (the callbacks without
+prevent_initial_call, no input changed) and year changes made one
+dropdown at a time. Every replayed request should be answered from the
+callback cache; a miss means the warm-up requests do not match the
+browser's (their cache keys include the triggers) and /ready reports
+warm while users still pay the full cost.
+
+    python -m benchmarks.warmup [--timeout 600]
+"""
+import argparse
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from src.utils.metrics import metrics
+from src.utils.warmup import (
+    WARMUP_RECENT_YEARS, YEAR_INPUTS, affected_callbacks, callback_request, collect_props, initial_state,
+)
+
+
+def browser_requests(callbacks: List[Dict[str, Any]], default: Dict[str, Any], last_year: int) -> List[Dict[str, Any]]:
+    """First page load, then the last decade and a single year picked start year first."""
+    requests = [
+        callback_request(callback, default, [])
+        for callback in callbacks
+        if not callback.get("clientside_function") and not callback.get("prevent_initial_call")
+    ]
+    single = last_year - WARMUP_RECENT_YEARS // 2
+    for years in ((last_year - WARMUP_RECENT_YEARS + 1, last_year), (single, single)):
+        state = dict(default)
+        for key, value in zip(YEAR_INPUTS, years):
+            if state.get(key) == value:
+                continue
+            state[key] = value
+            requests.extend(callback_request(callback, state, [key]) for callback in affected_callbacks(callbacks, [key]))
+    return requests
+
+
+def callback_lookups() -> Tuple[int, int]:
+    """Hits and misses of the callback response cache so far."""
+    return (
+        metrics.cache_lookups.get(("callback_responses", True), 0),
+        metrics.cache_lookups.get(("callback_responses", False), 0),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check that the warm-up fills the cache the browser reads")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for the warm-up (default: 600)")
+    args = parser.parse_args()
+
+    from main import get_app
+
+    app = get_app()
+    client = app.server.test_client()
+    prefix = app.config.routes_pathname_prefix
+    deadline = time.monotonic() + args.timeout
+    while client.get("/ready").status_code != 200:
+        if time.monotonic() > deadline:
+            sys.exit(f"Warm-up not finished after {args.timeout:.0f}s")
+        time.sleep(0.5)
+
+    props = collect_props(client.get(f"{prefix}_dash-layout").get_json())
+    callbacks = client.get(f"{prefix}_dash-dependencies").get_json()
+    last_year = props["end-year-filter"]["value"]
+    requests = browser_requests(callbacks, initial_state(callbacks, props), last_year)
+
+    hits_before, misses_before = callback_lookups()
+    for body in requests:
+        client.post(f"{prefix}_dash-update-component", json=body)
+    hits, misses = callback_lookups()
+    hits, misses = hits - hits_before, misses - misses_before
+
+    print(f"{len(requests)} browser-shaped requests after the warm-up: {hits} cache hits, {misses} misses")
+    if misses:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,53 @@
 import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
 import dash
 
 from src.pages.dashboard import create_dashboard_layout, init_callbacks
+from src.utils import logger
+from src.utils.api import init_api
+from src.utils.artifacts import (
+    MANIFEST_FILE,
+    find_bundle,
+    layout_key,
+    load_bundle,
+    load_layout_snapshot,
+    load_previous_cascades,
+    save_layout_snapshot,
+    simplify_geojson,
+    snapshot_directory,
+    write_bundle,
+)
+from src.utils.assets import TAILWIND_FILE, load_asset_manifest
+from src.utils.callback_cache import init_callback_cache
+from src.utils.compression import init_compression
 from src.utils.get_data import load_areas_file, load_json_file, process_data
+from src.utils.indexes import build_indexes
+from src.utils.metrics import init_metrics
+from src.utils.profiling import init_profiling
 from src.utils.settings import get_project_paths
+from src.utils.warmup import init_warmup
+
+
+def bundle_inputs(paths: Dict[str, Path]) -> Dict[str, Path]:
+    """Files the artifact bundle is built from, a change to any of them calls for a new bundle."""
+    return {
+        "data": paths["clean"] / "cleaned_disasters.csv",
+        "geojson": paths["geojson_file"],
+        "areas": paths["areas_file"],
+    }
+
+
+def initial_layout_key(paths: Dict[str, Path], version: str, bundle: Optional[Path] = None) -> str:
+    """
+    Key of the layout snapshot: dataset version, dashboard code, geographic files
+    and the bundle the data comes from (its borders are simplified).
+    """
+    sources = [paths["src"], paths["geojson_file"], paths["areas_file"]]
+    if bundle is not None:
+        sources.append(bundle / MANIFEST_FILE)
+    return layout_key(version, sources)
 
 
 def initialize_app(force_clean: bool = False, force_scrape: bool = False) -> dash.Dash:
@@ -19,39 +63,136 @@ def initialize_app(force_clean: bool = False, force_scrape: bool = False) -> das
     """
     paths = get_project_paths()
 
-    # Process data with new parameters
-    data = process_data(
-        paths["data"], force_clean=force_clean, force_scrape=force_scrape
-    )["data"]
+    # Bundle précalculé (python main.py --precompute) s'il correspond aux données nettoyées
+    bundle = None
+    if not (force_clean or force_scrape):
+        bundle = find_bundle(paths["artifacts"], bundle_inputs(paths))
 
-    geojson = load_json_file(paths["geojson_file"])
-    areas = load_areas_file(paths["areas_file"])
+    if bundle is not None:
+        artifacts = load_bundle(bundle)
+        data, indexes = artifacts["data"], artifacts["indexes"]
+        geojson, areas = artifacts["geojson"], artifacts["areas"]
+    else:
+        # Process data with new parameters
+        data = process_data(
+            paths["data"], force_clean=force_clean, force_scrape=force_scrape
+        )["data"]
+
+        geojson = load_json_file(paths["geojson_file"])
+        areas = load_areas_file(paths["areas_file"])
+        indexes = build_indexes(data, load_previous_cascades(paths["artifacts"]))
+
+    # Stylesheets and scripts are linked by content hash so they can be cached forever
+    asset_urls = load_asset_manifest(paths["assets"])
 
     # Initialize app
     app = dash.Dash(
         __name__,
-        external_stylesheets=["/assets/tailwind.min.css"],
+        external_stylesheets=[f"/assets/{asset_urls[TAILWIND_FILE]}"],
+        external_scripts=[
+            f"/assets/{url}" for name, url in asset_urls.items() if name.endswith(".js")
+        ],
+        assets_ignore=r"\.(css|js)$",
         suppress_callback_exceptions=True,
     )
 
     server = app.server
+    init_compression(app, paths["assets"])
 
     @server.route("/health")
     def health():
         return "OK", 200
 
-    # Set up layout
-    app.layout = create_dashboard_layout(app, data, geojson, areas)
+    # Read-only JSON aggregates for headless consumers
+    init_api(app, indexes)
+
+    # Set up layout, built once per dataset version (and layout code) then
+    # reloaded from its snapshot
+    key = initial_layout_key(paths, indexes.version, bundle)
+    snapshots = snapshot_directory(paths["artifacts"], bundle)
+    layout = load_layout_snapshot(snapshots, key)
+    if layout is None:
+        layout = create_dashboard_layout(app, data, geojson, areas, indexes)
+        save_layout_snapshot(snapshots, key, layout)
+    app.layout = layout
 
     # Initialize callbacks
-    init_callbacks(app, data, geojson, areas)
+    init_callbacks(app, data, geojson, areas, indexes)
+
+    # The data is fixed, identical callback requests reuse the same response
+    init_callback_cache(app)
+
+    # Stack sampling of callbacks on demand (X-Profile header, DISASTERS_PROFILE*)
+    init_profiling(app)
+
+    # Latency and payload size of every callback registered above, at /metrics
+    init_metrics(app, indexes.version, indexes.rows)
+
+    # Precompute the common views in the background, /ready answers once done
+    init_warmup(app, indexes.cube.max_year)
 
     return app
 
 
-# Expose server for Gunicorn
-app = initialize_app()
-server = app.server  # Gunicorn va chercher cette variable
+def precompute_artifacts(force_clean: bool = False, force_scrape: bool = False) -> Path:
+    """
+    Build the artifact bundle loaded at startup (columnar data, indexes,
+    simplified borders) and the snapshot of the initial layout.
+
+    Args:
+        force_clean: Whether to force cleaning of existing data
+        force_scrape: Whether to force new data scraping
+
+    Returns:
+        The bundle directory
+    """
+    paths = get_project_paths()
+    data = process_data(
+        paths["data"], force_clean=force_clean, force_scrape=force_scrape
+    )["data"]
+
+    # Cleaned data and geographic files unchanged (e.g. the EM-DAT export was not updated): nothing to rebuild
+    bundle = find_bundle(paths["artifacts"], bundle_inputs(paths))
+    if bundle is not None:
+        logger.info(f"Artifact bundle {bundle.name} is up to date")
+        return bundle
+
+    geojson = simplify_geojson(load_json_file(paths["geojson_file"]))
+    areas = load_areas_file(paths["areas_file"])
+    indexes = build_indexes(data, load_previous_cascades(paths["artifacts"]))
+
+    bundle = write_bundle(paths["artifacts"], bundle_inputs(paths), data, indexes, geojson, areas)
+
+    # The layout does not depend on the app, any instance builds it
+    layout = create_dashboard_layout(
+        dash.Dash(__name__, suppress_callback_exceptions=True), data, geojson, areas, indexes
+    )
+    save_layout_snapshot(
+        snapshot_directory(paths["artifacts"], bundle), initial_layout_key(paths, indexes.version, bundle), layout
+    )
+
+    return bundle
+
+
+# Built on first use, so that --precompute, --clean and --scrape do not build it for nothing
+_app: Optional[dash.Dash] = None
+
+
+def get_app() -> dash.Dash:
+    """The dashboard served by default, built from the existing data on first call."""
+    global _app
+    if _app is None:
+        _app = initialize_app()
+    return _app
+
+
+def __getattr__(name: str) -> Any:
+    """Expose app and server for Gunicorn (main:server), built when first looked up."""
+    if name == "app":
+        return get_app()
+    if name == "server":
+        return get_app().server  # Gunicorn va chercher cette variable
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def main() -> None:
@@ -64,13 +205,24 @@ def main() -> None:
     parser.add_argument("--clean", action="store_true", help="Force cleaning of existing data")
     parser.add_argument("--scrape", action="store_true", help="Force new data scraping")
     parser.add_argument("--port", type=int, default=8050, help="Port to run the dashboard on (default: 8050)")
+    parser.add_argument("--precompute", action="store_true", help="Write the artifact bundle loaded at startup, then exit")
     args = parser.parse_args()
 
+    if args.precompute:
+        precompute_artifacts(force_clean=args.clean, force_scrape=args.scrape)
+        return
+
+    # Recharger les données si un nettoyage ou un scraping est demandé
+    if args.clean or args.scrape:
+        dashboard = initialize_app(force_clean=args.clean, force_scrape=args.scrape)
+    else:
+        dashboard = get_app()
+
     # Utiliser $PORT si défini par DigitalOcean, sinon l'argument CLI
     port = int(os.environ.get("PORT", args.port))
 
     # Lancer le serveur
-    app.run_server(debug=False, port=port, host="0.0.0.0")
+    dashboard.run_server(debug=False, port=port, host="0.0.0.0")
 
 
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ from typing import List, Optional
 from dash import Dash, html
 from dash.dependencies import Input, Output, State
 
+from src.components.clientside import register_clientside_callback
+
 
 class Card:
     """Base card component with consistent styling and fullscreen capability."""
@@ -46,26 +48,15 @@ class Card:
         )
 
 def register_card_callback(app: Dash, id: str) -> None:
-    """Register the fullscreen toggle callback."""
-
-    @app.callback(
+    """Register the fullscreen toggle callback, handled in the browser."""
+    register_clientside_callback(
+        app,
+        "toggle_card_fullscreen",
         [
             Output(f"{id}-container", "className"),
             Output(f"{id}-expand-icon", "src")
         ],
         Input(f"{id}-expand-btn", "n_clicks"),
-        State(f"{id}-container", "className"),
+        [State(f"{id}-container", "className")],
         prevent_initial_call=True
     )
-    def toggle_card_fullscreen(n_clicks: Optional[int], current_className: str) -> tuple:
-        if n_clicks is None:
-            return current_className, "/assets/maximize.svg"
-            
-        if n_clicks % 2 == 1:  # Expand
-            new_class_name = current_className + " fixed inset-4 z-50 overflow-auto w-[calc(100%-2rem)]"
-            new_icon_src = "/assets/minimize.svg"
-        else:  # Collapse
-            new_class_name = current_className.replace(" fixed inset-4 z-50 overflow-auto w-[calc(100%-2rem)]", "")
-            new_icon_src = "/assets/maximize.svg"
-        
-        return new_class_name, new_icon_src
\ No newline at end of file
@@ -0,0 +1,39 @@
+from typing import List, Optional, Union
+
+from dash import ClientsideFunction, Dash
+from dash.dependencies import Input, Output, State
+
+# Namespace of the functions defined in assets/clientside.js
+CLIENTSIDE_NAMESPACE = "ui"
+
+
+def register_clientside_callback(
+    app: Dash,
+    function_name: str,
+    outputs: Union[Output, List[Output]],
+    inputs: Union[Input, List[Input]],
+    states: Optional[List[State]] = None,
+    prevent_initial_call: bool = False,
+) -> None:
+    """
+    Register a UI-only callback implemented in JavaScript.
+
+    Layout toggles that only move CSS classes or swap values around should
+    use this instead of app.callback: the function runs in the browser and
+    the interaction never hits the server.
+
+    Args:
+        app: Dash application instance
+        function_name: Name of the function in the "ui" namespace of assets/clientside.js
+        outputs: Output(s) updated by the function, in the order it returns them
+        inputs: Input(s) passed as the first arguments of the function
+        states: State(s) passed after the inputs
+        prevent_initial_call: Skip the call when the layout is first rendered
+    """
+    app.clientside_callback(
+        ClientsideFunction(namespace=CLIENTSIDE_NAMESPACE, function_name=function_name),
+        outputs,
+        inputs,
+        states or [],
+        prevent_initial_call=prevent_initial_call,
+    )
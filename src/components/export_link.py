@@ -0,0 +1,57 @@
+from typing import List
+
+from dash import Dash, html
+from dash.dependencies import Input, Output, State
+
+from src.components.clientside import register_clientside_callback
+from src.utils.api import API_PREFIX
+from src.utils.export import EXPORT_FORMATS, PARQUET_AVAILABLE
+
+
+def export_formats() -> List[str]:
+    """Formats the export endpoint can serve with the installed packages."""
+    return [name for name in EXPORT_FORMATS if name != "parquet" or PARQUET_AVAILABLE]
+
+
+class ExportLinks:
+    """Download links of the events behind the current filters, one per export format."""
+
+    def __init__(self, id: str):
+        self.id = id
+
+    def __call__(self) -> html.Div:
+        return html.Div([
+            html.Span("Download these events:", className="text-sm text-gray-700 mr-2"),
+            *[
+                html.A(
+                    export_format.upper(),
+                    id=f"{self.id}-{export_format}",
+                    href=f"{API_PREFIX}/export?format={export_format}",
+                    download="",
+                    className="text-sm text-blue-600 hover:underline mr-2",
+                )
+                for export_format in export_formats()
+            ],
+        ], className="flex items-center")
+
+
+def register_export_links_callback(app: Dash, id: str) -> None:
+    """
+    Point the download links at the year, type, region and country selected, in the browser.
+
+    The country is the one clicked on the map.
+    """
+    formats = export_formats()
+    register_clientside_callback(
+        app,
+        "export_links",
+        [Output(f"{id}-{export_format}", "href") for export_format in formats],
+        [
+            Input("start-year-filter", "value"),
+            Input("end-year-filter", "value"),
+            Input("disaster-type-filter", "value"),
+            Input("region-filter", "value"),
+            Input("map", "clickData"),
+        ],
+        [State(f"{id}-{export_format}", "href") for export_format in formats],
+    )
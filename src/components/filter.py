@@ -2,6 +2,8 @@ from typing import Any, Dict, List
 
 from dash import dcc, html
 
+from src.utils.cascades import CASCADE_RULES, pair_name
+
 
 class Filter:
     """Collection of reusable filter components with consistent styling."""
@@ -70,6 +72,30 @@ class Filter:
             value="Region"
         )
 
+    def time_step_filter(self, id: str) -> html.Div:
+        """Create a time step filter dropdown."""
+        return self.dropdown_filter(
+            id=id,
+            label="Time Step",
+            options=[
+                {"label": "Year", "value": "year"},
+                {"label": "Month", "value": "month"},
+            ],
+            value="year"
+        )
+
+    def activity_step_filter(self, id: str) -> html.Div:
+        """Create a time step filter dropdown for the ongoing disasters chart."""
+        return self.dropdown_filter(
+            id=id,
+            label="Time Step",
+            options=[
+                {"label": "Day", "value": "day"},
+                {"label": "Month", "value": "month"},
+            ],
+            value="month"
+        )
+
     def temporal_impact_metric_filter(self, id: str) -> html.Div:
         """Create an impact metric filter dropdown."""
         return self.dropdown_filter(
@@ -98,6 +124,63 @@ class Filter:
             value="Density"
         )
 
+    def quantile_metric_filter(self, id: str) -> html.Div:
+        """Create an impact metric filter dropdown for the distribution chart."""
+        return self.dropdown_filter(
+            id=id,
+            label="Impact Metric",
+            options=[
+                {"label": "Total Deaths", "value": "Total Deaths"},
+                {"label": "Affected people", "value": "Total Affected"},
+                {"label": "Total Damage ($ USD)", "value": "Total Damage"},
+            ],
+            value="Total Deaths"
+        )
+
+    def cascade_pair_filter(self, id: str) -> html.Div:
+        """Create a dropdown choosing the pair of disaster types linked into cascades."""
+        return self.dropdown_filter(
+            id=id,
+            label="Disaster Pair",
+            options=[{"label": "All", "value": "All"}] + [
+                {"label": f"{trigger} > {follow_up}", "value": pair_name(trigger, follow_up)}
+                for trigger, follow_up in CASCADE_RULES
+            ],
+            value="All"
+        )
+
+    def search_filter(self, id: str) -> html.Div:
+        """Create a text input searching the events as the user types."""
+        return html.Div([
+            html.Label(
+                "Search",
+                className="block text-base font-medium mb-2"
+            ),
+            dcc.Input(
+                id=id,
+                type="search",
+                placeholder="Location, event or country...",
+                # Sent once typing pauses, not on every keystroke
+                debounce=0.15,
+                className="w-full rounded-md border border-gray-300 shadow-sm px-3 py-2 focus:ring-indigo-500 focus:border-indigo-500",
+                style={
+                    'minWidth': '230px'
+                },
+            ),
+        ], className="relative group")
+
+    def search_rank_filter(self, id: str) -> html.Div:
+        """Create a dropdown choosing the order of the search results."""
+        return self.dropdown_filter(
+            id=id,
+            label="Rank By",
+            options=[
+                {"label": "Deaths", "value": "deaths"},
+                {"label": "Most recent", "value": "date"},
+            ],
+            value="deaths"
+        )
+
     def _get_disaster_options(self, include_all: bool = True) -> List[Dict[str, str]]:
         """Get the list of disaster type options from the data.
         
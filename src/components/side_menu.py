@@ -1,8 +1,9 @@
 from typing import Any
 
-import pandas as pd
 from dash import Dash, Input, Output, dcc, html
 
+from src.components.clientside import register_clientside_callback
+
 
 class SideMenu:
     """Side menu component for global year filters."""
@@ -71,15 +72,13 @@ class SideMenu:
     def __call__(self) -> html.Div:
         return self.layout
     
-def register_side_menu_callbacks(app: Dash, data: pd.DataFrame) -> None:
-    @app.callback(
+def register_side_menu_callbacks(app: Dash) -> None:
+    """Register the year range ordering callback, handled in the browser."""
+    register_clientside_callback(
+        app,
+        "order_years",
         [Output('start-year-filter', 'value'),
          Output('end-year-filter', 'value')],
         [Input('start-year-filter', 'value'),
          Input('end-year-filter', 'value')]
     )
-    def update_year_dropdowns(start_year: int, end_year: int) -> tuple:
-        if start_year is not None and end_year is not None:
-            if start_year > end_year:
-                return end_year, start_year
-        return start_year, end_year
\ No newline at end of file
@@ -0,0 +1,185 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import dash_ag_grid as dag
+import pandas as pd
+import plotly.graph_objects as go
+from dash import Dash, Patch, dcc, html
+from dash.dependencies import Input, Output
+
+from src.utils.cascades import parse_pair
+from src.utils.indexes import DisasterIndexes
+from src.utils.serialization import typed_array
+
+# Cascades listed by the table
+CASCADE_ROWS = 50
+
+
+class CascadeView:
+    """Compound disasters: how often each pair of types follows one another, and the deadliest cascades."""
+
+    def __init__(self, indexes: DisasterIndexes):
+        self.indexes = indexes
+        self.column_defs = [
+            {"field": "Start", "headerName": "Start", "sortable": True, "width": 110},
+            {"field": "Country", "headerName": "Country", "filter": True, "sortable": True, "width": 130},
+            {"field": "Sequence", "headerName": "Disasters", "filter": True, "sortable": True, "minWidth": 220},
+            {"field": "Days", "headerName": "Days", "filter": "agNumberColumnFilter", "sortable": True,
+             "type": "numericColumn", "width": 80},
+            {"field": "Deaths", "headerName": "Deaths", "filter": "agNumberColumnFilter", "sortable": True,
+             "type": "numericColumn", "width": 100},
+        ]
+
+    def table_rows(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+        pair: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        AG Grid rows of the deadliest cascades matching the filters.
+
+        Args:
+            start_year: First year in which a cascade may start
+            end_year: Last year in which a cascade may start
+            region: Region to restrict to ('All' keeps every region)
+            pair: Only link this pair of types ('Trigger>Follow-up'), 'All' or None links every pair
+        """
+        pairs = [parse_pair(pair)] if pair and pair != "All" else None
+        cascades = self.indexes.cascades(CASCADE_ROWS, start_year, end_year, region, pairs=pairs)
+        return [
+            {
+                "Start": f"{row['Start_Date']:%Y-%m-%d}",
+                "Country": row["Country"],
+                "Sequence": row["Sequence"],
+                "Days": int(row["Days"]),
+                "Deaths": int(row["Total Deaths"]) if pd.notna(row["Total Deaths"]) else 0,
+            }
+            for _, row in cascades.iterrows()
+        ]
+
+    def create_trace_data(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], List[Dict]]:
+        """
+        Compute the number of links of every type pair, most frequent on top.
+
+        Returns:
+            The trace arrays, and the annotations explaining an empty chart
+        """
+        counts = self.indexes.cascade_index.pair_counts(start_year, end_year, region).sort_values()
+        if counts.sum() == 0:
+            return {"x": [], "y": []}, [dict(
+                text="No data available for the selected filters, try other options!",
+                xref="paper",
+                yref="paper",
+                x=0.5,
+                y=0.5,
+                showarrow=False
+            )]
+        return {"x": counts.to_numpy(), "y": counts.index.str.replace(">", " > ").tolist()}, []
+
+    @staticmethod
+    def create_skeleton() -> go.Figure:
+        """Create the static part of the pair chart, without data."""
+        fig = go.Figure(go.Bar(
+            orientation="h",
+            marker_color="#7c3aed",
+            hovertemplate="%{y}: %{x:,} times<extra></extra>",
+        ))
+
+        fig.update_layout(
+            margin=dict(t=10, l=10, r=10, b=30),
+            xaxis=dict(title=dict(text="Follow-ups within the window")),
+            yaxis=dict(automargin=True),
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+        )
+
+        return fig
+
+    def create_figure(self, **filters: Any) -> go.Figure:
+        """Create the pair chart."""
+        trace_data, annotations = self.create_trace_data(**filters)
+        fig = self.create_skeleton()
+        fig.update_traces(**trace_data)
+        fig.update_layout(annotations=annotations)
+        return fig
+
+    def create_patch(self, **filters: Any) -> Patch:
+        """Create a partial update of the pair chart, only the data is sent."""
+        trace_data, annotations = self.create_trace_data(**filters)
+        patch = Patch()
+        for key, value in trace_data.items():
+            patch["data"][0][key] = typed_array(value)
+        patch["layout"]["annotations"] = annotations
+        return patch
+
+    def __call__(self) -> html.Div:
+        """Render the component, showing the cascades of every year."""
+        return html.Div([
+            dcc.Graph(
+                id="cascade-pairs-chart",
+                figure=self.create_figure(),
+                responsive=True,
+                style={"height": "300px"},
+                config={
+                    "displayModeBar": False,
+                    "displaylogo": False
+                }
+            ),
+            dag.AgGrid(
+                id="cascade-table",
+                columnDefs=self.column_defs,
+                rowData=self.table_rows(),
+                columnSize="sizeToFit",
+                defaultColDef={"resizable": True, "sortable": True, "filter": True},
+                dashGridOptions={
+                    "pagination": True,
+                    "paginationAutoPageSize": True,
+                    "animateRows": True,
+                },
+                className="ag-theme-alpine",
+                style={"height": "400px", "width": "100%"},
+            ),
+        ], className="w-full")
+
+
+def register_cascade_callbacks(app: Dash, indexes: DisasterIndexes) -> None:
+    """
+    Register callbacks for the cascading disasters view.
+
+    Args:
+        app: Dash application instance
+        indexes: Shared dashboard indexes
+    """
+    view = CascadeView(indexes)
+
+    @app.callback(
+        Output("cascade-pairs-chart", "figure"),
+        [
+            Input("start-year-filter", "value"),
+            Input("end-year-filter", "value"),
+            Input("cascade-region-filter", "value"),
+        ],
+        # The layout already holds the counts of every year
+        prevent_initial_call=True,
+    )
+    def update_pairs(start_year: int, end_year: int, region: str) -> Patch:
+        return view.create_patch(start_year=start_year, end_year=end_year, region=region)
+
+    @app.callback(
+        Output("cascade-table", "rowData"),
+        [
+            Input("start-year-filter", "value"),
+            Input("end-year-filter", "value"),
+            Input("cascade-region-filter", "value"),
+            Input("cascade-pair-filter", "value"),
+        ],
+        prevent_initial_call=True,
+    )
+    def update_cascades(start_year: int, end_year: int, region: str, pair: str) -> List[Dict[str, Any]]:
+        return view.table_rows(start_year, end_year, region, pair)
@@ -4,6 +4,8 @@ import pandas as pd
 from dash import Dash, html
 from dash.dependencies import Input, Output
 
+from src.utils.country_index import CountryIndex
+
 
 class CountryDetails:
     """A component to display country-specific disaster details."""
@@ -60,8 +62,18 @@ class CountryDetails:
                 className="text-gray-500 italic text-center p-4",
             )
 
-        country_name = country_data["Country"].iloc[0]
-        disaster_counts = country_data["Disaster Type"].value_counts()
+        return self.create_counts_content(
+            country_data["Country"].iloc[0], country_data["Disaster Type"].value_counts()
+        )
+
+    def create_counts_content(self, country_name: str, disaster_counts: pd.Series) -> html.Div:
+        """Create the content for country details from per-type counts."""
+        if len(disaster_counts) == 0:
+            return html.Div(
+                "No disasters recorded for selected filters",
+                className="text-gray-500 italic text-center p-4",
+            )
+
         total_disasters = disaster_counts.sum()
 
         # Create disaster rows sorted by count
@@ -101,11 +113,14 @@ class CountryDetails:
 
     def __call__(self) -> html.Div:
         """Render the component."""
-        return html.Div(id="country-details-content", className="h-full")
+        return html.Div(
+            self.create_details_content(None), id="country-details-content", className="h-full"
+        )
 
 
-def register_details_callbacks(app: Dash, data: pd.DataFrame) -> None:
+def register_details_callbacks(app: Dash, data: pd.DataFrame, countries: CountryIndex) -> None:
     """Register callbacks for the details card."""
+    details = CountryDetails(data)
 
     @app.callback(
         Output("country-details-content", "children"),
@@ -116,6 +131,8 @@ def register_details_callbacks(app: Dash, data: pd.DataFrame) -> None:
             Input("start-year-filter", "value"),
             Input("end-year-filter", "value"),
         ],
+        # The layout already holds the message shown before any click
+        prevent_initial_call=True,
     )
     def update_details(
         clickData: Optional[dict],
@@ -124,18 +141,16 @@ def register_details_callbacks(app: Dash, data: pd.DataFrame) -> None:
         start_year: Optional[int],
         end_year: Optional[int],
     ) -> html.Div:
-        filtered_data = data.copy()
-
-        # Apply filters
-        if start_year is not None:
-            filtered_data = filtered_data[filtered_data["Start Year"] >= start_year]
-        if end_year is not None:
-            filtered_data = filtered_data[filtered_data["Start Year"] <= end_year]
-        if region and region != "All":
-            filtered_data = filtered_data[filtered_data["Region"] == region]
-
-        # Create details content
-        details = CountryDetails(data)
         country_iso = clickData["points"][0]["location"] if clickData else None
+        if not country_iso:
+            return details.create_details_content(None)
+
+        # The region filter keeps either all or none of a country's events
+        if region and region != "All" and countries.region(country_iso) != region:
+            disaster_counts = pd.Series(dtype=int)
+        else:
+            disaster_counts = countries.type_counts(country_iso, start_year, end_year)
 
-        return details.create_details_content(country_iso, filtered_data)
+        return details.create_counts_content(
+            countries.country_name(country_iso) or country_iso, disaster_counts
+        )
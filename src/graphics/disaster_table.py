@@ -5,6 +5,11 @@ import pandas as pd
 from dash import html
 from dash.dependencies import Input, Output
 
+from src.utils.indexes import DisasterIndexes
+
+# Events listed by the table
+TABLE_ROWS = 50
+
 
 class DisasterTable:
     """Disaster table visualization component."""
@@ -82,10 +87,13 @@ class DisasterTable:
 
         # Process data: get deadliest disasters
         worst_disasters = data_to_use.sort_values("Total Deaths", ascending=False).head(
-            50
+            TABLE_ROWS
         )
 
-        # Prepare data for table
+        return self.table_rows(worst_disasters)
+
+    def table_rows(self, events: pd.DataFrame) -> list:
+        """Turn events into AG Grid rows, in their order"""
         return [
             {
                 "Year": int(row["Start Year"]),
@@ -99,7 +107,7 @@ class DisasterTable:
                 if pd.notna(row["Total Damage"]) and row["Total Damage"] != 0
                 else None,
             }
-            for _, row in worst_disasters.iterrows()
+            for _, row in events.iterrows()
         ]
 
     def __call__(self) -> html.Div:
@@ -126,7 +134,7 @@ class DisasterTable:
         )
 
 
-def register_table_callbacks(app: Any, data: pd.DataFrame) -> None:
+def register_table_callbacks(app: Any, data: pd.DataFrame, indexes: DisasterIndexes) -> None:
     """Register callbacks for the disaster table visualization."""
     table_viz = DisasterTable(data)
 
@@ -135,9 +143,18 @@ def register_table_callbacks(app: Any, data: pd.DataFrame) -> None:
         [
             Input("start-year-filter", "value"),
             Input("end-year-filter", "value"),
+            Input("event-search", "value"),
+            Input("search-rank-filter", "value"),
         ],
+        # The layout already holds the rows of the full year range
+        prevent_initial_call=True,
     )
-    def update_table(start_year: int, end_year: int) -> list[dict[str, Any]]:
+    def update_table(start_year: int, end_year: int, query: str, rank_by: str) -> list[dict[str, Any]]:
+        # Searched events come from the index, ranked by deaths or date
+        if query and query.strip():
+            events = indexes.search(query, rank_by or "deaths", TABLE_ROWS, start_year, end_year)
+            return table_viz.table_rows(events)
+
         filtered_data = data.copy()
 
         # Apply filters
@@ -0,0 +1,195 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+from dash import Dash, Patch, dcc, html
+from dash.dependencies import Input, Output
+
+from src.utils.quantiles import DEFAULT_QUANTILES, QuantileSketches
+from src.utils.serialization import typed_array
+
+QUANTILE_LABELS = {0.5: "median", 0.9: "p90", 0.99: "p99"}
+QUANTILE_COLORS = {0.5: "#2563eb", 0.9: "#d97706", 0.99: "#dc2626"}
+
+
+class ImpactDistribution:
+    """Cumulative distribution of an impact metric, with its median, p90 and p99."""
+
+    def __init__(self, sketches: QuantileSketches):
+        self.sketches = sketches
+
+    def create_trace_data(
+        self,
+        measure: str = "Total Deaths",
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        disaster_type: Optional[str] = None,
+        region: Optional[str] = None,
+        iso: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], List[Dict], List[Dict]]:
+        """
+        Compute the distribution curve and its quantile markers from the merged sketches.
+
+        The curve gives, for each value, the share of the events at or below
+        it. The x axis is logarithmic, so events with a zero impact are only
+        counted in the title annotation.
+
+        Returns:
+            The trace arrays, the quantile lines (shapes) and the annotations
+        """
+        counts = self.sketches.merge(measure, start_year, end_year, disaster_type, region, iso)
+        total = int(counts.sum())
+        if total == 0:
+            return {"x": [], "y": []}, [], [dict(
+                text="No data available for the selected filters, try other options!",
+                xref="paper",
+                yref="paper",
+                x=0.5,
+                y=0.5,
+                showarrow=False
+            )]
+
+        values = self.sketches.bucket_values(measure, len(counts))
+        shares = 100 * np.cumsum(counts) / total
+        present = counts > 0
+        present[0] = False
+
+        shapes, annotations = [], [dict(
+            text=f"{total:,} events with a known value, {shares[0]:.0f}% of them at 0",
+            xref="paper",
+            yref="paper",
+            x=0,
+            y=1.08,
+            showarrow=False,
+            xanchor="left",
+        )]
+        quantiles = self.sketches.quantiles_of(measure, counts, DEFAULT_QUANTILES)
+        for position, (quantile, value) in enumerate(zip(DEFAULT_QUANTILES, quantiles.tolist())):
+            if value <= 0:
+                continue
+            color = QUANTILE_COLORS[quantile]
+            shapes.append(dict(
+                type="line",
+                xref="x",
+                yref="paper",
+                x0=value,
+                x1=value,
+                y0=0,
+                y1=1,
+                line=dict(color=color, dash="dash", width=1.5),
+            ))
+            annotations.append(dict(
+                text=f"{QUANTILE_LABELS[quantile]}: {value:,.0f}",
+                xref="x",
+                yref="paper",
+                x=np.log10(value),
+                y=0.95 - 0.08 * position,
+                showarrow=False,
+                xanchor="left",
+                font=dict(color=color),
+            ))
+
+        return {"x": values[present], "y": shares[present]}, shapes, annotations
+
+    @staticmethod
+    def create_skeleton(measure: str = "Total Deaths") -> go.Figure:
+        """Create the static part of the distribution chart, without data."""
+        fig = go.Figure(go.Scatter(
+            mode="lines",
+            line=dict(shape="hv", color="#4b5563"),
+            hovertemplate=f"%{{y:.1f}}% of events with {measure} up to %{{x:,.0f}}<extra></extra>",
+        ))
+
+        fig.update_layout(
+            margin=dict(t=40, l=10, r=10, b=30),
+            xaxis=dict(type="log", title=dict(text=measure)),
+            yaxis=dict(title=dict(text="% of events"), range=[0, 100]),
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+        )
+
+        return fig
+
+    def create_figure(self, measure: str = "Total Deaths", **filters: Any) -> go.Figure:
+        """Create the distribution chart of a measure over the filtered events."""
+        trace_data, shapes, annotations = self.create_trace_data(measure, **filters)
+        fig = self.create_skeleton(measure)
+        fig.update_traces(**trace_data)
+        fig.update_layout(shapes=shapes, annotations=annotations)
+        return fig
+
+    def create_patch(self, measure: str = "Total Deaths", **filters: Any) -> Patch:
+        """Create a partial update of the chart, only the data, markers and labels are sent."""
+        trace_data, shapes, annotations = self.create_trace_data(measure, **filters)
+        skeleton = self.create_skeleton(measure)
+        patch = Patch()
+        for key, value in trace_data.items():
+            patch["data"][0][key] = typed_array(value)
+        patch["data"][0]["hovertemplate"] = skeleton.data[0].hovertemplate
+        patch["layout"]["xaxis"]["title"]["text"] = measure
+        patch["layout"]["shapes"] = shapes
+        patch["layout"]["annotations"] = annotations
+        return patch
+
+    def __call__(self) -> html.Div:
+        """Render the component, showing the deaths of every event."""
+        return html.Div([
+            dcc.Loading(
+                id="loading-distribution",
+                type="circle",
+                children=dcc.Graph(
+                    id="distribution-chart",
+                    figure=self.create_figure(),
+                    responsive=True,
+                    style={"height": "450px"},
+                    config={
+                        "displayModeBar": False,
+                        "displaylogo": False
+                    }
+                )
+            )
+        ], className="w-full")
+
+
+def register_distribution_callbacks(app: Dash, sketches: QuantileSketches) -> None:
+    """
+    Register callbacks for the impact distribution chart.
+
+    Args:
+        app: Dash application instance
+        sketches: Precomputed quantile sketches
+    """
+    distribution = ImpactDistribution(sketches)
+
+    @app.callback(
+        Output("distribution-chart", "figure"),
+        [
+            Input("distribution-metric-filter", "value"),
+            Input("distribution-type-filter", "value"),
+            Input("distribution-region-filter", "value"),
+            Input("start-year-filter", "value"),
+            Input("end-year-filter", "value"),
+            Input("distribution-country", "value"),
+            Input("map", "clickData"),
+        ],
+        # The layout already holds the deaths of every event
+        prevent_initial_call=True,
+    )
+    def update_distribution(
+        measure: str,
+        disaster_type: str,
+        region: str,
+        start_year: int,
+        end_year: int,
+        show_country: Any,
+        clickData: Optional[Dict[str, Any]],
+    ) -> Patch:
+        iso = clickData["points"][0]["location"] if show_country and clickData else None
+        return distribution.create_patch(
+            measure,
+            start_year=start_year,
+            end_year=end_year,
+            disaster_type=disaster_type,
+            region=region,
+            iso=iso,
+        )
@@ -1,10 +1,19 @@
+from typing import Any, Dict, List, Optional
+
 import plotly.graph_objects as go
 from dash.dependencies import Input, Output
-from dash import dcc, html, Dash
+from dash import Patch, dcc, html, Dash, ctx
 import numpy as np
 
 import pandas as pd
 
+from src.utils.search import SearchIndex
+from src.utils.serialization import typed_array
+
+# Border of the countries holding searched events
+HIGHLIGHT_COLOR = "#dc2626"
+HIGHLIGHT_WIDTH = 2.5
+
 
 class Map:
     """Choropleth map visualization component."""
@@ -14,8 +23,8 @@ class Map:
         self.geojson = geojson
         self.areas = areas
 
-    def create_figure(self, filtered_data: pd.DataFrame, impact_metric: str = "Density") -> go.Figure:
-        """Create choropleth map figure from data"""
+    def compute_trace_data(self, filtered_data: pd.DataFrame, impact_metric: str = "Density") -> Dict[str, Any]:
+        """Compute the data arrays of the choropleth trace"""
         data_to_use = filtered_data if not filtered_data.empty else self.data
 
         counts_by_country = (
@@ -46,22 +55,28 @@ class Map:
             counts_by_country["Display_Value"] - min_val
         ) / (max_val - min_val)
 
+        return {
+            "locations": counts_by_country["ISO"],
+            "z": counts_by_country["Scaled_Value"],
+            "text": counts_by_country["Country"],
+            # Numeric only, so that it can be sent as a typed array
+            "customdata": counts_by_country[["Disaster_Count", "Area"]].to_numpy(dtype=float),
+        }
+
+    def create_skeleton(self) -> go.Figure:
+        """Create the static part of the map: geometry, styling and layout, without data"""
         fig = go.Figure(
             go.Choroplethmapbox(
                 geojson=self.geojson,
-                locations=counts_by_country["ISO"],
-                z=counts_by_country["Scaled_Value"],
                 featureidkey="properties.ISO_A3",
                 colorscale="Viridis",
                 marker_opacity=0.5,
                 marker_line_width=0,
-                hovertemplate="<b>%{customdata[1]}</b><br><br>"
+                marker_line_color=HIGHLIGHT_COLOR,
+                hovertemplate="<b>%{text}</b><br><br>"
                 + "Number of disasters: %{customdata[0]:,}<br>"
-                + "Area: %{customdata[2]:,.2f} km²<br>"
+                + "Area: %{customdata[1]:,.2f} km²<br>"
                 + "Click for details<extra></extra>",
-                customdata=counts_by_country[
-                    ["Disaster_Count", "Country", "Area"]
-                ].values,
                 colorbar=dict(
                     title=dict(side="right"),
                     tickmode="array",
@@ -86,6 +101,41 @@ class Map:
 
         return fig
 
+    def create_figure(self, filtered_data: pd.DataFrame, impact_metric: str = "Density") -> go.Figure:
+        """Create choropleth map figure from data"""
+        fig = self.create_skeleton()
+        fig.update_traces(**self.compute_trace_data(filtered_data, impact_metric))
+        return fig
+
+    def create_patch(
+        self,
+        filtered_data: pd.DataFrame,
+        impact_metric: str = "Density",
+        highlighted: Optional[List[str]] = None,
+        trace_data: bool = True,
+    ) -> Patch:
+        """Create a partial update of the map figure, only the trace data is sent
+
+        Args:
+            filtered_data: Events shown on the map
+            impact_metric: "Density" or "Count"
+            highlighted: ISO codes of the countries outlined, None outlines none
+            trace_data: Whether the values are sent, or only the outlines
+        """
+        patch = Patch()
+        trace = self.compute_trace_data(filtered_data, impact_metric)
+        if trace_data:
+            for key, value in trace.items():
+                patch["data"][0][key] = typed_array(value)
+
+        # Border widths follow the order of the locations
+        if highlighted is None:
+            patch["data"][0]["marker"]["line"]["width"] = 0
+        else:
+            widths = np.where(trace["locations"].isin(highlighted), HIGHLIGHT_WIDTH, 0.0)
+            patch["data"][0]["marker"]["line"]["width"] = typed_array(widths)
+        return patch
+
     def __call__(self) -> html.Div:
         fig = self.create_figure(pd.DataFrame())
         return html.Div(
@@ -110,7 +160,7 @@ class Map:
         )
 
 
-def register_map_callbacks(app: Dash, data: pd.DataFrame, geojson: dict, areas: dict) -> None:
+def register_map_callbacks(app: Dash, data: pd.DataFrame, geojson: dict, areas: dict, search_index: SearchIndex) -> None:
     map_viz = Map(data, geojson, areas)
 
     @app.callback(
@@ -121,9 +171,19 @@ def register_map_callbacks(app: Dash, data: pd.DataFrame, geojson: dict, areas:
             Input("start-year-filter", "value"),
             Input("end-year-filter", "value"),
             Input("map-impact-metric-filter", "value"),
+            Input("event-search", "value"),
         ],
+        # The layout already holds the map of the full data
+        prevent_initial_call=True,
     )
-    def update_map(disaster_type: str, region: str, start_year: int, end_year: int, impact_metric: str) -> go.Figure:
+    def update_map(
+        disaster_type: str,
+        region: str,
+        start_year: int,
+        end_year: int,
+        impact_metric: str,
+        query: Optional[str],
+    ) -> Patch:
         filtered_data = data.copy()
 
         # Apply filters
@@ -138,4 +198,8 @@ def register_map_callbacks(app: Dash, data: pd.DataFrame, geojson: dict, areas:
         if region and region != "All":
             filtered_data = filtered_data[filtered_data["Region"] == region]
 
-        return map_viz.create_figure(filtered_data, impact_metric)
+        # Countries of the searched events are outlined; a new query leaves the values as they are
+        highlighted = search_index.countries(query, start_year, end_year) if query and query.strip() else None
+        return map_viz.create_patch(
+            filtered_data, impact_metric, highlighted, trace_data=ctx.triggered_id != "event-search"
+        )
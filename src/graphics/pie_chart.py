@@ -1,35 +1,28 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import pandas as pd
 import plotly.graph_objects as go
-from dash import Dash, dcc, html
+from dash import Dash, Patch, dcc, html
 from dash.dependencies import Input, Output
 
+from src.utils.country_index import CountryIndex
+from src.utils.cube import DisasterCube
+from src.utils.serialization import typed_array
 
-def group_similar_disasters(data: Any, group: bool = False) -> Any:
-    """Help function to group similar disaster types together. """
-    if not group:
-        return data
-
-    groups = {
-        "Mass Movement": ["Mass movement (dry)", "Mass movement (wet)"],
-        "Collapse": ["Collapse (Industrial)", "Collapse (Miscellaneous)"],
-        "Explosion": ["Explosion (Industrial)", "Explosion (Miscellaneous)"],
-        "Fire": ["Fire (Industrial)", "Fire (Miscellaneous)"],
-    }
-
-    data_copy = data.copy()
-    for group_name, disasters in groups.items():
-        mask = data_copy["Disaster Type"].isin(disasters)
-        if mask.any():
-            data_copy.loc[mask, "Disaster Type"] = group_name
-
-    return data_copy
+# Number of categories kept before the smaller ones are folded into "Others"
+MAX_PIE_CATEGORIES = 9
 
 
 class DisasterPieChart:
-    def __init__(self, data: Any = None) -> None:
+    def __init__(
+        self,
+        data: Any = None,
+        cube: Optional[DisasterCube] = None,
+        countries: Optional[CountryIndex] = None,
+    ) -> None:
         self.data = data
+        self.cube = cube
+        self.countries = countries
         self.layout = html.Div(
             [
                 # Pie chart
@@ -37,6 +30,7 @@ class DisasterPieChart:
                     [
                         dcc.Graph(
                             id="disaster-pie-chart",
+                            figure=self.create_skeleton(),
                             style={},
                             config={"displayModeBar": False, "displaylogo": False},
                         )
@@ -47,11 +41,86 @@ class DisasterPieChart:
             className="h-full flex flex-col",
         )
 
+    def compute_counts(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        grouped: bool = False,
+        fold_others: bool = False,
+        country_iso: Optional[str] = None,
+    ) -> pd.Series:
+        """
+        Count disasters by type from the precomputed indexes.
+
+        Args:
+            start_year: First year included
+            end_year: Last year included
+            grouped: Fold similar disaster types together
+            fold_others: Fold the categories after the MAX_PIE_CATEGORIES largest into "Others"
+            country_iso: Restrict to a country
+
+        Raises:
+            ValueError: The chart was built without the indexes
+        """
+        if self.cube is None or self.countries is None:
+            raise ValueError("The counts are read from the indexes, build the chart with cube and countries")
+
+        # Type totals come straight from the indexes, grouped by precomputed codes
+        if country_iso:
+            counts = self.countries.type_counts(country_iso, start_year, end_year, grouped=grouped)
+        else:
+            counts = self.cube.type_totals("count", start_year, end_year, grouped=grouped)
+
+        if fold_others:
+            # Ranked rather than cut by position, categories tied at the cut-off stay together
+            other_mask = counts.rank(ascending=False) > MAX_PIE_CATEGORIES
+            if other_mask.any():
+                others_sum = counts[other_mask].sum()
+                counts = counts[~other_mask].copy()
+                counts["Others"] = others_sum
+
+        return counts
+
+    @staticmethod
+    def create_patch(counts: pd.Series, text_infos: str) -> Patch:
+        """Create a partial update of the pie chart, only the data is sent."""
+        pie_patch = Patch()
+        pie_patch["data"][0]["labels"] = counts.index
+        pie_patch["data"][0]["values"] = typed_array(counts.values)
+        pie_patch["data"][0]["textinfo"] = text_infos
+        return pie_patch
+
+    @staticmethod
+    def create_skeleton() -> go.Figure:
+        """Create the static part of the pie chart, the callback patches labels and values in."""
+        return go.Figure(
+            data=[
+                go.Pie(
+                    labels=[],
+                    values=[],
+                    showlegend=True,
+                    textposition="auto",
+                    hole=0.4,
+                    marker=dict(line=dict(color="white", width=2)),
+                )
+            ],
+            layout=dict(
+                autosize=True,
+                margin=dict(l=20, r=20, t=20, b=20),
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+            ),
+        )
+
     def __call__(self) -> html.Div:
         return self.layout
 
 
-def register_pie_callbacks(app: Dash, data: pd.DataFrame) -> None:
+def register_pie_callbacks(
+    app: Dash, data: pd.DataFrame, cube: DisasterCube, countries: CountryIndex
+) -> None:
+    pie_viz = DisasterPieChart(data, cube, countries)
+
     @app.callback(
         Output("disaster-pie-chart", "figure"),
         [
@@ -70,51 +139,17 @@ def register_pie_callbacks(app: Dash, data: pd.DataFrame) -> None:
         end_year: int,
         show_country: Any,
         clickData: Dict[str, Any],
-    ) -> go.Figure:
-        start_year = start_year if start_year is not None else data["Start Year"].min()
-        end_year = end_year if end_year is not None else data["Start Year"].max()
-
-        filtered_data = data[
-            (data["Start Year"] >= start_year) & (data["Start Year"] <= end_year)
-        ]
-
-        if show_country:
-            country_iso = clickData["points"][0]["location"] if clickData else None
-            if country_iso:
-                filtered_data = filtered_data[filtered_data["ISO"] == country_iso]
-
-        if group_similar and "group" in group_similar:
-            filtered_data = group_similar_disasters(filtered_data, True)
-
-        counts = filtered_data["Disaster Type"].value_counts()
-
-        if show_other and "other" in show_other:
-            other_mask = counts.rank(ascending=False) > 9
-            if other_mask.any():
-                others_sum = counts[other_mask].sum()
-                counts = counts[~other_mask]
-                counts["Others"] = others_sum
+    ) -> Patch:
+        country_iso = clickData["points"][0]["location"] if show_country and clickData else None
+        counts = pie_viz.compute_counts(
+            start_year,
+            end_year,
+            grouped=bool(group_similar and "group" in group_similar),
+            fold_others=bool(show_other and "other" in show_other),
+            country_iso=country_iso,
+        )
 
         text_infos = "percent" if show_other else "none"
 
-        pie_fig = go.Figure(
-            data=[
-                go.Pie(
-                    labels=counts.index,
-                    values=counts.values,
-                    textinfo=text_infos,
-                    showlegend=True,
-                    textposition="auto",
-                    hole=0.4,
-                    marker=dict(line=dict(color="white", width=2)),
-                )
-            ],
-            layout=dict(
-                autosize=True,
-                margin=dict(l=20, r=20, t=20, b=20),
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-            ),
-        )
-
-        return pie_fig
+        # Only the data changes between interactions, the skeleton stays on the client
+        return DisasterPieChart.create_patch(counts, text_infos)
@@ -0,0 +1,172 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+from dash import Patch, dcc, html
+from dash.dependencies import Input, Output
+
+from src.utils.cube import DisasterCube
+from src.utils.serialization import typed_array
+
+
+class Seasonality:
+    """Month x disaster type heatmap showing when each type of disaster strikes."""
+
+    def __init__(self, cube: DisasterCube):
+        self.cube = cube
+        self.layout = html.Div([
+            dcc.Loading(
+                id="loading-seasonality",
+                type="circle",
+                children=dcc.Graph(
+                    id="seasonality-heatmap",
+                    figure=self.create_skeleton(),
+                    responsive=True,
+                    style={"height": "600px"},
+                    config={
+                        "displayModeBar": False,
+                        "displaylogo": False
+                    }
+                )
+            )
+        ], className="w-full")
+
+    def create_trace_data(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+        metric: str = "count",
+    ) -> Tuple[Dict[str, Any], List[Dict]]:
+        """
+        Compute the data arrays of the seasonality heatmap.
+
+        Each row is normalized by the disaster type total so that rare and
+        frequent types can be compared; raw values are shown on hover. Events
+        with an unknown start month keep their own column.
+
+        Args:
+            start_year: First year included
+            end_year: Last year included
+            region: Region to restrict to ('All' keeps every region)
+            metric: Impact metric to distribute over the months
+
+        Returns:
+            The trace arrays, and the annotations explaining an empty heatmap
+        """
+        table = self.cube.seasonality(metric, start_year, end_year, region)
+        table = table[table.sum(axis=1) > 0]
+
+        if table.empty:
+            return {"z": [], "x": [], "y": [], "customdata": []}, [dict(
+                text="No data available for the selected filters, try other options!",
+                xref="paper",
+                yref="paper",
+                x=0.5,
+                y=0.5,
+                showarrow=False
+            )]
+
+        values = table.to_numpy(dtype=float)
+        return {
+            "z": 100 * values / values.sum(axis=1, keepdims=True),
+            "x": table.columns,
+            "y": table.index,
+            "customdata": np.round(values),
+        }, []
+
+    @staticmethod
+    def _hovertemplate(metric: str) -> str:
+        """Hover label naming the metric shown in customdata."""
+        y_title = "Number of disasters" if metric == "count" else metric
+        return (
+            "Disaster Type: %{y}<br>"
+            + "Month: %{x}<br>"
+            + f"{y_title}: %{{customdata:,.0f}}<br>"
+            + "Share of type: %{z:.1f}%<br>"
+            + "<extra></extra>"
+        )
+
+    @staticmethod
+    def create_skeleton(metric: str = "count") -> go.Figure:
+        """Create the static part of the heatmap, without data."""
+        fig = go.Figure(go.Heatmap(
+            colorscale="Viridis",
+            colorbar=dict(title=dict(text="% of type", side="right")),
+            hovertemplate=Seasonality._hovertemplate(metric),
+        ))
+
+        fig.update_layout(
+            margin=dict(t=10, l=10, r=10, b=30),
+            yaxis=dict(autorange="reversed"),
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+        )
+
+        return fig
+
+    def create_figure(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+        metric: str = "count",
+    ) -> Dict:
+        """
+        Create the seasonality heatmap.
+
+        Args:
+            start_year: First year included
+            end_year: Last year included
+            region: Region to restrict to ('All' keeps every region)
+            metric: Impact metric to distribute over the months
+        """
+        trace_data, annotations = self.create_trace_data(start_year, end_year, region, metric)
+        fig = self.create_skeleton(metric)
+        fig.update_traces(**trace_data)
+        fig.update_layout(annotations=annotations)
+        return fig
+
+    def create_patch(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+        metric: str = "count",
+    ) -> Patch:
+        """Create a partial update of the heatmap, only the data and hover labels are sent."""
+        trace_data, annotations = self.create_trace_data(start_year, end_year, region, metric)
+        patch = Patch()
+        for key, value in trace_data.items():
+            patch["data"][0][key] = typed_array(value)
+        patch["data"][0]["hovertemplate"] = self._hovertemplate(metric)
+        patch["layout"]["annotations"] = annotations
+        return patch
+
+    def __call__(self) -> html.Div:
+        """Render the component."""
+        return self.layout
+
+
+def register_seasonality_callbacks(app: Any, cube: DisasterCube) -> None:
+    """
+    Register callbacks for the seasonality heatmap.
+
+    Args:
+        app: Dash application instance
+        cube: Precomputed disaster cube
+    """
+    seasonality = Seasonality(cube)
+
+    @app.callback(
+        Output("seasonality-heatmap", "figure"),
+        [
+            Input("start-year-filter", "value"),
+            Input("end-year-filter", "value"),
+            Input("seasonality-region-filter", "value"),
+            Input("seasonality-impact-metric-filter", "value"),
+        ]
+    )
+    def update_seasonality(start_year: int, end_year: int,
+                           region: str, impact_metric: str) -> Patch:
+        return seasonality.create_patch(start_year, end_year, region, impact_metric)
@@ -1,4 +1,4 @@
-from typing import Any, List
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 from dash import html
@@ -83,16 +83,11 @@ class Statistics:
             },
         )
 
-    def __call__(self) -> html.Div:
-        return self.layout
-
-
-def register_statistics_callbacks(app: Any, data: pd.DataFrame) -> None:
-    @app.callback(
-        Output("stats-container", "children"),
-        [Input("start-year-filter", "value"), Input("end-year-filter", "value")],
-    )
-    def update_statistics(start_year: int, end_year: int) -> List[html.Div]:
+    @staticmethod
+    def compute_stats(
+        data: pd.DataFrame, start_year: Optional[int] = None, end_year: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Compute the headline figures of the events within a year range."""
         start_year = start_year if start_year is not None else data["Start Year"].min()
         end_year = end_year if end_year is not None else data["Start Year"].max()
 
@@ -100,13 +95,27 @@ def register_statistics_callbacks(app: Any, data: pd.DataFrame) -> None:
             (data["Start Year"] >= start_year) & (data["Start Year"] <= end_year)
         ]
 
-        stats = {
+        return {
             "total_disasters": len(filtered_df),
             "total_deaths": filtered_df["Total Deaths"].sum(),
             "total_affected": filtered_df["Total Affected"].sum(),
             "countries": filtered_df["Country"].nunique(),
         }
 
+    def __call__(self) -> html.Div:
+        return self.layout
+
+
+def register_statistics_callbacks(app: Any, data: pd.DataFrame) -> None:
+    @app.callback(
+        Output("stats-container", "children"),
+        [Input("start-year-filter", "value"), Input("end-year-filter", "value")],
+        # The layout already holds the figures of the full year range
+        prevent_initial_call=True,
+    )
+    def update_statistics(start_year: int, end_year: int) -> List[html.Div]:
+        stats = Statistics.compute_stats(data, start_year, end_year)
+
         return [
             Statistics._create_stat_box(
                 "Total Disasters", "total-disasters", stats["total_disasters"]
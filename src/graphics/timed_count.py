@@ -1,21 +1,26 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 import plotly.graph_objects as go
-from dash import dcc, html, Dash
+from dash import Patch, dcc, html, Dash
 from dash.dependencies import Input, Output
 
+from src.utils.cube import DisasterCube
+from src.utils.serialization import encode_trace_arrays
+
 
 class TimedCount:
     """Time series visualization component."""
 
-    def __init__(self, data: Any = None) -> None:
+    def __init__(self, data: Any = None, cube: Optional[DisasterCube] = None) -> None:
         self.data = data
+        self.cube = cube
         self.layout = html.Div(
             [
                 dcc.Graph(
                     responsive=True,
                     id="time-series-chart",
+                    figure=self.create_skeleton(),
                     style={"width": "95%", "height": "300px"},
                     config={
                         "displayModeBar": False,
@@ -25,17 +30,17 @@ class TimedCount:
             className="flex-1 ml-16",
         )
 
-    def create_figure(self, group_by: str = "Region", metric: str = "count") -> Dict:
+    def create_traces(self, group_by: str = "Region", metric: str = "count") -> Tuple[List[Dict], str]:
         """
-        Create the time series histogram.
+        Create the yearly bar traces, one per category.
 
         Args:
             group_by: Column to group by ('Region', 'Disaster Type', or 'Subregion')
             metric: Impact metric (variable) to display ('count', 'Total Damage', etc.)
-        """
-        if self.data is None:
-            return {}
 
+        Returns:
+            The traces and the y axis title
+        """
         # Group data by year and group_by column
         if metric == "count":
             grouped = (
@@ -50,15 +55,14 @@ class TimedCount:
             )
             y_title = metric
 
-        # Create figure
-        fig = go.Figure()
-
-        # Add traces for each category
+        # One trace for each category
+        traces = []
         for category in sorted(grouped[group_by].unique()):
             df_filtered = grouped[grouped[group_by] == category]
 
-            fig.add_trace(
-                go.Bar(
+            traces.append(
+                dict(
+                    type="bar",
                     name=category,
                     x=df_filtered["Start Year"],
                     y=df_filtered["Count"]
@@ -73,10 +77,170 @@ class TimedCount:
                 )
             )
 
-        # Update layout
+        return traces, y_title
+
+    def create_yearly_traces(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        group_by: str = "Region",
+        metric: str = "count",
+    ) -> Tuple[List[Dict], str]:
+        """
+        Create the yearly bar traces from the precomputed cube, one per category.
+
+        Args:
+            start_year: First year displayed
+            end_year: Last year displayed
+            group_by: Column to group by ('Region', 'Disaster Type', or 'Subregion')
+            metric: Impact metric (variable) to display ('count', 'Total Damage', etc.)
+
+        Returns:
+            The traces and the y axis title
+        """
+        y_title = "Number of disasters" if metric == "count" else metric
+        if self.cube is None:
+            return [], y_title
+
+        yearly = self.cube.yearly(metric, group_by, start_year, end_year)
+
+        traces = []
+        for category in yearly.columns:
+            if not yearly[category].any():
+                continue
+
+            traces.append(
+                dict(
+                    type="bar",
+                    name=category,
+                    x=yearly.index,
+                    y=yearly[category],
+                    hovertemplate=(
+                        f"{group_by}: {category}<br>"
+                        + "Year: %{x}<br>"
+                        + f"{y_title}: %{{y:,.0f}}<br>"
+                        + "<extra></extra>"
+                    ),
+                )
+            )
+
+        return traces, y_title
+
+    def create_monthly_traces(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        group_by: str = "Region",
+        metric: str = "count",
+    ) -> Tuple[List[Dict], str, List[Dict]]:
+        """
+        Create the monthly bar traces from the precomputed cube, one per category.
+
+        Args:
+            start_year: First year displayed
+            end_year: Last year displayed
+            group_by: Column to group by ('Region', 'Disaster Type', or 'Subregion')
+            metric: Impact metric (variable) to display ('count', 'Total Damage', etc.)
+
+        Returns:
+            The traces, the y axis title and the annotations of the figure
+        """
+        y_title = "Number of disasters" if metric == "count" else metric
+        if self.cube is None:
+            return [], y_title, []
+
+        monthly, unknown = self.cube.monthly(metric, group_by, start_year, end_year)
+        # Plotly reads "YYYY-MM" as the first day of the month
+        months = pd.DatetimeIndex(monthly.index).strftime("%Y-%m")
+
+        traces = []
+        for category in monthly.columns:
+            if not monthly[category].any():
+                continue
+
+            traces.append(
+                dict(
+                    type="bar",
+                    name=category,
+                    x=months,
+                    y=monthly[category],
+                    hovertemplate=(
+                        f"{group_by}: {category}<br>"
+                        + "Month: %{x|%b %Y}<br>"
+                        + f"{y_title}: %{{y:,.0f}}<br>"
+                        + "<extra></extra>"
+                    ),
+                )
+            )
+
+        # Events without a start month cannot be placed on the axis, say so
+        annotations = []
+        if unknown.sum() > 0:
+            annotations.append(
+                dict(
+                    text=f"Unknown month (not shown): {unknown.sum():,.0f}",
+                    xref="paper",
+                    yref="paper",
+                    x=0,
+                    y=1.08,
+                    showarrow=False,
+                    font=dict(size=11, color="gray"),
+                )
+            )
+
+        return traces, y_title, annotations
+
+    def create_figure(self, group_by: str = "Region", metric: str = "count") -> Dict:
+        """
+        Create the time series histogram.
+
+        Args:
+            group_by: Column to group by ('Region', 'Disaster Type', or 'Subregion')
+            metric: Impact metric (variable) to display ('count', 'Total Damage', etc.)
+        """
+        if self.data is None:
+            return {}
+
+        traces, y_title = self.create_traces(group_by, metric)
+        fig = self.create_skeleton()
+        fig.add_traces(traces)
+        fig.update_layout(xaxis_title="Year", yaxis_title=y_title)
+
+        return fig
+
+    def create_monthly_figure(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        group_by: str = "Region",
+        metric: str = "count",
+    ) -> Dict:
+        """
+        Create the time series histogram at month grain from the precomputed cube.
+
+        Args:
+            start_year: First year displayed
+            end_year: Last year displayed
+            group_by: Column to group by ('Region', 'Disaster Type', or 'Subregion')
+            metric: Impact metric (variable) to display ('count', 'Total Damage', etc.)
+        """
+        if self.cube is None:
+            return {}
+
+        traces, y_title, annotations = self.create_monthly_traces(
+            start_year, end_year, group_by, metric
+        )
+        fig = self.create_skeleton()
+        fig.add_traces(traces)
+        fig.update_layout(xaxis_title="Month", yaxis_title=y_title, annotations=annotations)
+
+        return fig
+
+    @staticmethod
+    def create_skeleton() -> go.Figure:
+        """Create the layout shared by the yearly and monthly histograms, without traces."""
+        fig = go.Figure()
         fig.update_layout(
-            xaxis_title="Year",
-            yaxis_title=y_title,
             barmode="stack",
             showlegend=True,
             legend=dict(
@@ -91,14 +255,27 @@ class TimedCount:
             margin=dict(l=50, r=100, t=30, b=30),
             hovermode="closest",
         )
-
         return fig
 
+    @staticmethod
+    def create_patch(
+        traces: List[Dict], x_title: str, y_title: str, annotations: Optional[List[Dict]] = None
+    ) -> Patch:
+        """Create a partial update replacing the traces and titles, the skeleton stays on the client."""
+        patch = Patch()
+        patch["data"] = [encode_trace_arrays(trace) for trace in traces]
+        patch["layout"]["xaxis"]["title"]["text"] = x_title
+        patch["layout"]["yaxis"]["title"]["text"] = y_title
+        patch["layout"]["annotations"] = annotations or []
+        return patch
+
     def __call__(self) -> html.Div:
         return self.layout
 
 
-def register_timed_count_callbacks(app: Dash, data: pd.DataFrame) -> None:
+def register_timed_count_callbacks(app: Dash, data: pd.DataFrame, cube: DisasterCube) -> None:
+    time_viz = TimedCount(data, cube)
+
     @app.callback(
         Output("time-series-chart", "figure"),
         [
@@ -106,22 +283,23 @@ def register_timed_count_callbacks(app: Dash, data: pd.DataFrame) -> None:
             Input("end-year-filter", "value"),
             Input("group-by-filter", "value"),
             Input("temporal-impact-metric-filter", "value"),
+            Input("time-step-filter", "value"),
         ],
     )
     def update_time_series(
-        start_year: int, end_year: int, group_by: str, metric: str
-    ) -> Dict[str, Any]:
+        start_year: int, end_year: int, group_by: str, metric: str, time_step: str
+    ) -> Patch:
         # Use min/max values if no year is selected
         start_year = (
             start_year if start_year is not None else int(data["Start Year"].min())
         )
         end_year = end_year if end_year is not None else int(data["Start Year"].max())
 
-        # Filter data by year range
-        filtered_data = data[
-            (data["Start Year"] >= start_year) & (data["Start Year"] <= end_year)
-        ].copy()
+        if time_step == "month":
+            traces, y_title, annotations = time_viz.create_monthly_traces(
+                start_year, end_year, group_by, metric
+            )
+            return TimedCount.create_patch(traces, "Month", y_title, annotations)
 
-        # Create visualization
-        time_viz = TimedCount(filtered_data)
-        return time_viz.create_figure(group_by, metric)
+        traces, y_title = time_viz.create_yearly_traces(start_year, end_year, group_by, metric)
+        return TimedCount.create_patch(traces, "Year", y_title)
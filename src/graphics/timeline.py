@@ -0,0 +1,262 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from dash import Dash, Patch, dcc, html
+from dash.dependencies import Input, Output
+
+from src.utils.indexes import DisasterIndexes
+from src.utils.serialization import typed_array
+
+# Events drawn on the timeline, the deadliest of those active on the selected day
+TIMELINE_EVENTS = 25
+
+MILLISECONDS_PER_DAY = 86_400_000
+
+NO_DATA_ANNOTATION = dict(
+    text="No data available for the selected filters, try other options!",
+    xref="paper",
+    yref="paper",
+    x=0.5,
+    y=0.5,
+    showarrow=False
+)
+
+
+def epoch_milliseconds(dates: pd.DatetimeIndex) -> np.ndarray:
+    """Dates as milliseconds since 1970, sent as a typed array to a date axis."""
+    return dates.to_numpy(dtype="datetime64[ms]").astype(np.int64).astype(float)
+
+
+class Timeline:
+    """Number of ongoing disasters through time, and the events ongoing on a selected day."""
+
+    def __init__(self, indexes: DisasterIndexes):
+        self.indexes = indexes
+
+    def create_counts_data(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+        step: str = "month",
+    ) -> Tuple[Dict[str, Any], List[Dict]]:
+        """
+        Compute the active-count line from the precomputed series.
+
+        Args:
+            start_year: First year included
+            end_year: Last year included
+            region: Region to restrict to ('All' keeps every region)
+            step: "day" or "month"
+
+        Returns:
+            The trace arrays, and the annotations explaining an empty chart
+        """
+        counts = self.indexes.intervals.active_counts(step, start_year, end_year, region)
+        if counts.empty:
+            return {"x": [], "y": []}, [NO_DATA_ANNOTATION]
+        return {"x": epoch_milliseconds(pd.DatetimeIndex(counts.index)), "y": counts.to_numpy()}, []
+
+    def selected_day(
+        self,
+        clickData: Optional[Dict[str, Any]],
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+    ) -> Optional[pd.Timestamp]:
+        """Day clicked on the active-count chart, or the busiest day of the selection."""
+        if clickData:
+            return pd.Timestamp(clickData["points"][0]["x"]).normalize()
+        counts = self.indexes.intervals.active_counts("day", start_year, end_year, region)
+        if counts.empty or counts.max() == 0:
+            return None
+        return pd.DatetimeIndex(counts.index)[int(counts.to_numpy().argmax())]
+
+    def create_events_data(
+        self, day: Optional[pd.Timestamp], region: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], List[Dict], List[Dict]]:
+        """
+        Compute the timeline bars of the deadliest events ongoing on a day.
+
+        Bars span from the start to the end of each event, both days included.
+
+        Returns:
+            The trace arrays, the line marking the day (shapes) and the annotations
+        """
+        events = self.indexes.active_events(day, None, region, n=TIMELINE_EVENTS) if day is not None else None
+        if events is None or events.empty:
+            return {"base": [], "x": [], "y": [], "customdata": []}, [], [NO_DATA_ANNOTATION]
+
+        starts = epoch_milliseconds(pd.DatetimeIndex(events["Start_Date"]))
+        ends = epoch_milliseconds(pd.DatetimeIndex(events["End_Date"])) + MILLISECONDS_PER_DAY
+        days = ((ends - starts) // MILLISECONDS_PER_DAY).astype(int)
+        labels = (
+            events["Country"].astype(str) + " " + events["Disaster Type"].astype(str)
+            + " (" + events["DisNo."].astype(str) + ")"
+        )
+        marker = epoch_milliseconds(pd.DatetimeIndex([day]))[0]
+        return {
+            "base": starts,
+            "x": ends - starts,
+            "y": labels.tolist(),
+            "customdata": [
+                [duration, "unknown" if np.isnan(deaths) else f"{deaths:,.0f}"]
+                for duration, deaths in zip(days.tolist(), events["Total Deaths"])
+            ],
+        }, [dict(
+            type="line",
+            xref="x",
+            yref="paper",
+            x0=marker,
+            x1=marker,
+            y0=0,
+            y1=1,
+            line=dict(color="#dc2626", dash="dash", width=1.5),
+        )], [dict(
+            text=f"{len(events)} deadliest events ongoing on {day:%Y-%m-%d}",
+            xref="paper",
+            yref="paper",
+            x=0,
+            y=1.06,
+            showarrow=False,
+            xanchor="left",
+        )]
+
+    @staticmethod
+    def create_counts_skeleton() -> go.Figure:
+        """Create the static part of the active-count chart, without data."""
+        fig = go.Figure(go.Scatter(
+            mode="lines",
+            line=dict(shape="hv", color="#2563eb", width=1),
+            fill="tozeroy",
+            hovertemplate="%{x|%Y-%m-%d}: %{y:,} ongoing disasters<extra></extra>",
+        ))
+
+        fig.update_layout(
+            margin=dict(t=10, l=10, r=10, b=30),
+            xaxis=dict(type="date"),
+            yaxis=dict(title=dict(text="Ongoing disasters"), rangemode="tozero"),
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+        )
+
+        return fig
+
+    @staticmethod
+    def create_events_skeleton() -> go.Figure:
+        """Create the static part of the timeline, without data."""
+        fig = go.Figure(go.Bar(
+            orientation="h",
+            marker_color="#d97706",
+            hovertemplate=(
+                "%{y}<br>"
+                + "From %{base|%Y-%m-%d}, for %{customdata[0]:,} days<br>"
+                + "Deaths: %{customdata[1]}"
+                + "<extra></extra>"
+            ),
+        ))
+
+        fig.update_layout(
+            margin=dict(t=40, l=10, r=10, b=30),
+            xaxis=dict(type="date"),
+            yaxis=dict(autorange="reversed", automargin=True),
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+        )
+
+        return fig
+
+    def create_counts_patch(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+        step: str = "month",
+    ) -> Patch:
+        """Create a partial update of the active-count chart, only the data is sent."""
+        trace_data, annotations = self.create_counts_data(start_year, end_year, region, step)
+        patch = Patch()
+        for key, value in trace_data.items():
+            patch["data"][0][key] = typed_array(value)
+        patch["layout"]["annotations"] = annotations
+        return patch
+
+    def create_events_patch(self, day: Optional[pd.Timestamp], region: Optional[str] = None) -> Patch:
+        """Create a partial update of the timeline, only the bars, the day marker and the title are sent."""
+        trace_data, shapes, annotations = self.create_events_data(day, region)
+        patch = Patch()
+        for key, value in trace_data.items():
+            patch["data"][0][key] = typed_array(value)
+        patch["layout"]["shapes"] = shapes
+        patch["layout"]["annotations"] = annotations
+        return patch
+
+    def __call__(self) -> html.Div:
+        """Render the component, filled by its callbacks."""
+        config = {
+            "displayModeBar": False,
+            "displaylogo": False
+        }
+        return html.Div([
+            dcc.Loading(
+                id="loading-active-counts",
+                type="circle",
+                children=dcc.Graph(
+                    id="active-counts-chart",
+                    figure=self.create_counts_skeleton(),
+                    responsive=True,
+                    style={"height": "250px"},
+                    config=config,
+                )
+            ),
+            dcc.Loading(
+                id="loading-active-events",
+                type="circle",
+                children=dcc.Graph(
+                    id="active-events-chart",
+                    figure=self.create_events_skeleton(),
+                    responsive=True,
+                    style={"height": "550px"},
+                    config=config,
+                )
+            ),
+        ], className="w-full")
+
+
+def register_timeline_callbacks(app: Dash, indexes: DisasterIndexes) -> None:
+    """
+    Register callbacks for the ongoing disasters charts.
+
+    Args:
+        app: Dash application instance
+        indexes: Shared dashboard indexes
+    """
+    timeline = Timeline(indexes)
+
+    @app.callback(
+        Output("active-counts-chart", "figure"),
+        [
+            Input("start-year-filter", "value"),
+            Input("end-year-filter", "value"),
+            Input("activity-region-filter", "value"),
+            Input("activity-step-filter", "value"),
+        ]
+    )
+    def update_active_counts(start_year: int, end_year: int, region: str, step: str) -> Patch:
+        return timeline.create_counts_patch(start_year, end_year, region, step)
+
+    @app.callback(
+        Output("active-events-chart", "figure"),
+        [
+            Input("active-counts-chart", "clickData"),
+            Input("start-year-filter", "value"),
+            Input("end-year-filter", "value"),
+            Input("activity-region-filter", "value"),
+        ]
+    )
+    def update_active_events(clickData: Optional[Dict[str, Any]], start_year: int,
+                             end_year: int, region: str) -> Patch:
+        day = timeline.selected_day(clickData, start_year, end_year, region)
+        return timeline.create_events_patch(day, region)
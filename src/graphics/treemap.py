@@ -1,10 +1,12 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 import pandas as pd
 import plotly.graph_objects as go
-from dash import dcc, html
+from dash import Patch, dcc, html
 from dash.dependencies import Input, Output
 
+from src.utils.serialization import typed_array
+
 
 class DisasterTreemap:
     """Treemap visualization component showing disaster impact by country."""
@@ -18,6 +20,7 @@ class DisasterTreemap:
                 type="circle",  
                 children=dcc.Graph(
                     id='disaster-treemap',
+                    figure=self.create_skeleton(),
                     responsive=True,
                     style={'height': '600px'},
                     config={
@@ -28,26 +31,33 @@ class DisasterTreemap:
             )
         ], className="w-full")
 
-    def create_figure(self, metric: str = "Total Deaths") -> Dict:
+    @staticmethod
+    def _message(text: str) -> Dict[str, Any]:
+        """Create a centered annotation used in place of the treemap."""
+        return dict(
+            text=text,
+            xref="paper",
+            yref="paper",
+            x=0.5,
+            y=0.5,
+            showarrow=False
+        )
+
+    def create_trace_data(self, metric: str = "Total Deaths") -> Tuple[Dict[str, Any], List[Dict]]:
         """
-        Create treemap figure from data.
-        
+        Compute the data arrays of the treemap trace.
+
         Args:
             metric: Impact metric to visualize (e.g., "Total Deaths", "Total Affected")
-            
+
         Returns:
-            Plotly figure dictionary
+            The trace arrays, and the annotations explaining an empty treemap
         """
+        empty: Dict[str, Any] = {"labels": [], "parents": [], "values": [], "marker.colors": []}
+
         if self.data is None or len(self.data) == 0:
-            return go.Figure().add_annotation(
-                text="No data available for the selected filters, try other options!",
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.5,
-                showarrow=False
-            )
-            
+            return empty, [self._message("No data available for the selected filters, try other options!")]
+
         try:
             # Group data by disaster type and country
             if metric == "count":
@@ -62,75 +72,98 @@ class DisasterTreemap:
                     .sum()
                     .reset_index(name='value')
                 )
-                
+
             if len(grouped) == 0 or grouped['value'].sum() == 0:
-                return go.Figure().add_annotation(
-                    text=f"No data available for {metric} with the selected filters",
-                    xref="paper",
-                    yref="paper",
-                    x=0.5,
-                    y=0.5,
-                    showarrow=False
-                )
-                
+                return empty, [self._message(f"No data available for {metric} with the selected filters")]
+
             # Sort by value and get top countries for each disaster type
             top_countries = []
             for disaster_type in grouped['Disaster Type'].unique():
                 disaster_data = grouped[grouped['Disaster Type'] == disaster_type]
                 top_n = disaster_data.nlargest(8, 'value')  # Get top 8 countries
                 top_countries.append(top_n)
-            
+
             final_data = pd.concat(top_countries)
-            
+
             if metric == "count":
                 labels = final_data.apply(
-                    lambda x: f"{x['Country']} ({int(x['value'])} disasters)", 
+                    lambda x: f"{x['Country']} ({int(x['value'])} disasters)",
                     axis=1
                 )
             else:
                 labels = final_data.apply(
-                    lambda x: f"{x['Country']} ({x['value']:,.0f})", 
+                    lambda x: f"{x['Country']} ({x['value']:,.0f})",
                     axis=1
                 )
-            
-            # Create treemap
-            fig = go.Figure(go.Treemap(
-                labels=labels,
-                parents=final_data['Disaster Type'],
-                values=final_data['value'],
-                branchvalues='total',
-                textinfo='label',
-                hovertemplate="""
-                    Disaster Type: %{parent}<br>
-                    Country: %{label}<br>
-                    Impact: %{value:,.0f}<br>
-                    <extra></extra>
-                """,
-                marker=dict(
-                    colors=final_data['value'],
-                    colorscale='Viridis',
-                    showscale=True
-                )
-            ))
-            
-            # Update layout
-            fig.update_layout(
-                margin=dict(t=0, l=0, r=0, b=0),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            
-            return fig
-            
+
+            return {
+                "labels": labels,
+                "parents": final_data['Disaster Type'],
+                "values": final_data['value'],
+                "marker.colors": final_data['value'],
+            }, []
+
         except Exception as e:
-            return go.Figure().add_annotation(
-                text=f"Error processing data: {str(e)}",
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.5,
-                showarrow=False
+            return empty, [self._message(f"Error processing data: {str(e)}")]
+
+    @staticmethod
+    def create_skeleton() -> go.Figure:
+        """Create the static part of the treemap, without data."""
+        fig = go.Figure(go.Treemap(
+            branchvalues='total',
+            textinfo='label',
+            hovertemplate="""
+                Disaster Type: %{parent}<br>
+                Country: %{label}<br>
+                Impact: %{value:,.0f}<br>
+                <extra></extra>
+            """,
+            marker=dict(
+                colorscale='Viridis',
+                showscale=True
             )
+        ))
+
+        # Update layout
+        fig.update_layout(
+            margin=dict(t=0, l=0, r=0, b=0),
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+
+        return fig
+
+    def create_figure(self, metric: str = "Total Deaths") -> Dict:
+        """
+        Create treemap figure from data.
+
+        Args:
+            metric: Impact metric to visualize (e.g., "Total Deaths", "Total Affected")
+
+        Returns:
+            Plotly figure dictionary
+        """
+        trace_data, annotations = self.create_trace_data(metric)
+        fig = self.create_skeleton()
+        fig.update_traces(
+            labels=trace_data["labels"],
+            parents=trace_data["parents"],
+            values=trace_data["values"],
+            marker_colors=trace_data["marker.colors"],
+        )
+        fig.update_layout(annotations=annotations)
+        return fig
+
+    def create_patch(self, metric: str = "Total Deaths") -> Patch:
+        """Create a partial update of the treemap figure, only the trace data is sent."""
+        trace_data, annotations = self.create_trace_data(metric)
+        patch = Patch()
+        patch["data"][0]["labels"] = trace_data["labels"]
+        patch["data"][0]["parents"] = trace_data["parents"]
+        patch["data"][0]["values"] = typed_array(trace_data["values"])
+        patch["data"][0]["marker"]["colors"] = typed_array(trace_data["marker.colors"])
+        patch["layout"]["annotations"] = annotations
+        return patch
 
     def __call__(self) -> html.Div:
         """Render the component."""
@@ -157,7 +190,7 @@ def register_treemap_callbacks(app: Any, data: pd.DataFrame) -> None:
     )
     def update_treemap(disaster_type: str, region: str, 
                       start_year: int, end_year: int,
-                      impact_metric: str) -> Dict[str, Any]:
+                      impact_metric: str) -> Patch:
                       
         # Create a local copy of the data for filtering
         filtered_data = data.copy()
@@ -176,4 +209,4 @@ def register_treemap_callbacks(app: Any, data: pd.DataFrame) -> None:
             filtered_data = filtered_data[filtered_data['Region'] == region]
             
         treemap = DisasterTreemap(filtered_data)
-        return treemap.create_figure(impact_metric)
\ No newline at end of file
+        return treemap.create_patch(impact_metric)
\ No newline at end of file
@@ -5,22 +5,31 @@ from dash import Dash, html
 
 from src.components.card import Card, register_card_callback
 from src.components.checkbox import Checkbox
+from src.components.export_link import ExportLinks, register_export_links_callback
 from src.components.filter import Filter
 from src.components.side_menu import SideMenu, register_side_menu_callbacks
 
 # Graphics components
+from src.graphics.cascades import CascadeView, register_cascade_callbacks
 from src.graphics.country_details import CountryDetails, register_details_callbacks
+from src.graphics.distribution import ImpactDistribution, register_distribution_callbacks
 from src.graphics.disaster_table import DisasterTable, register_table_callbacks
 from src.graphics.map import Map, register_map_callbacks
 from src.graphics.pie_chart import DisasterPieChart, register_pie_callbacks
+from src.graphics.seasonality import Seasonality, register_seasonality_callbacks
 from src.graphics.statistics import Statistics, register_statistics_callbacks
+from src.graphics.timeline import Timeline, register_timeline_callbacks
 from src.graphics.timed_count import TimedCount, register_timed_count_callbacks
 from src.graphics.treemap import DisasterTreemap, register_treemap_callbacks
+from src.utils.indexes import DisasterIndexes
 
 # Import resource strings
 from src.utils.resources import (
+    CASCADE_CARD_CAPTION,
     DETAILS_CARD_CAPTION,
+    DISTRIBUTION_CARD_CAPTION,
     MAP_CARD_CAPTION,
+    ONGOING_CARD_CAPTION,
     PIE_CARD_CAPTION,
     TABLE_CARD_CAPTION,
     TEMPORAL_CARD_CAPTION,
@@ -28,17 +37,30 @@ from src.utils.resources import (
 )
 
 
-def create_dashboard_layout(app: Dash, data: pd.DataFrame, geojson: Dict[str, Any], areas: Dict[str, float]) -> html.Div:
+def create_dashboard_layout(app: Dash, data: pd.DataFrame, geojson: Dict[str, Any], areas: Dict[str, float], indexes: DisasterIndexes) -> html.Div:
     """Create the main dashboard layout."""
     filters = Filter(data)
     disaster_filter = filters.disaster_filter("disaster-type-filter")
     region_filter = filters.region_filter("region-filter")
     group_by_filter = filters.group_by_filter("group-by-filter")
     temporal_impact_metric_filter = filters.temporal_impact_metric_filter("temporal-impact-metric-filter")
+    time_step_filter = filters.time_step_filter("time-step-filter")
     treemap_region_filter = filters.region_filter("treemap-region-filter")
     treemap_impact_metric_filter = filters.temporal_impact_metric_filter("treemap-impact-metric-filter")
     map_impact_metric_filter = filters.map_impact_metric_filter("map-impact-metric-filter")
     disaster_filter_without_all = filters.disaster_filter_without_all("disaster-type-filter_without_all")
+    seasonality_region_filter = filters.region_filter("seasonality-region-filter")
+    seasonality_impact_metric_filter = filters.temporal_impact_metric_filter("seasonality-impact-metric-filter")
+    event_search_filter = filters.search_filter("event-search")
+    search_rank_filter = filters.search_rank_filter("search-rank-filter")
+    distribution_metric_filter = filters.quantile_metric_filter("distribution-metric-filter")
+    distribution_type_filter = filters.disaster_filter("distribution-type-filter")
+    distribution_region_filter = filters.region_filter("distribution-region-filter")
+    activity_region_filter = filters.region_filter("activity-region-filter")
+    activity_step_filter = filters.activity_step_filter("activity-step-filter")
+    cascade_region_filter = filters.region_filter("cascade-region-filter")
+    cascade_pair_filter = filters.cascade_pair_filter("cascade-pair-filter")
+    export_links = ExportLinks("export-link")()
 
     pie_chart_group_checkbox = Checkbox(
         id="group-similar-disasters",
@@ -57,6 +79,12 @@ def create_dashboard_layout(app: Dash, data: pd.DataFrame, geojson: Dict[str, An
         options=[{"label": "Depending on the country selected on the map", "value": "country"}],
         value=["country"]
     )()
+
+    distribution_country_checkbox = Checkbox(
+        id="distribution-country",
+        options=[{"label": "Depending on the country selected on the map", "value": "country"}],
+        value=[]
+    )()
     
     # Create the main layout
     return html.Div([
@@ -71,7 +99,7 @@ def create_dashboard_layout(app: Dash, data: pd.DataFrame, geojson: Dict[str, An
                 Card(
                     id="map-card",
                     title="Geographic distribution of disasters",
-                    filters=[disaster_filter, region_filter, map_impact_metric_filter],
+                    filters=[disaster_filter, region_filter, map_impact_metric_filter, export_links],
                     caption=MAP_CARD_CAPTION
                 )(Map(data, geojson, areas)()),
                 
@@ -79,7 +107,7 @@ def create_dashboard_layout(app: Dash, data: pd.DataFrame, geojson: Dict[str, An
                 Card(
                     id="temporal-card",
                     title="Disaster occurrences through time",
-                    filters=[group_by_filter, temporal_impact_metric_filter],
+                    filters=[group_by_filter, temporal_impact_metric_filter, time_step_filter],
                     caption=TEMPORAL_CARD_CAPTION
                 )(TimedCount(data)()),
                 
@@ -90,6 +118,29 @@ def create_dashboard_layout(app: Dash, data: pd.DataFrame, geojson: Dict[str, An
                     filters=[disaster_filter_without_all, treemap_region_filter, treemap_impact_metric_filter],
                     caption=TREEMAP_CARD_CAPTION
                 )(DisasterTreemap(data)()),
+
+                # Seasonality heatmap
+                Card(
+                    id="seasonality-card",
+                    title="Disaster seasonality",
+                    filters=[seasonality_region_filter, seasonality_impact_metric_filter]
+                )(Seasonality(indexes.cube)()),
+
+                # Impact distribution
+                Card(
+                    id="distribution-card",
+                    title="Distribution of disaster impacts",
+                    filters=[distribution_metric_filter, distribution_type_filter, distribution_region_filter, distribution_country_checkbox],
+                    caption=DISTRIBUTION_CARD_CAPTION
+                )(ImpactDistribution(indexes.quantiles)()),
+
+                # Ongoing disasters
+                Card(
+                    id="ongoing-card",
+                    title="Ongoing disasters",
+                    filters=[activity_region_filter, activity_step_filter],
+                    caption=ONGOING_CARD_CAPTION
+                )(Timeline(indexes)()),
             ], className="flex-1 flex flex-col gap-4"),
             
             # Right column - Secondary visualizations and stats
@@ -120,29 +171,42 @@ def create_dashboard_layout(app: Dash, data: pd.DataFrame, geojson: Dict[str, An
                 Card(
                     id="table-card",
                     title="Deadliest disasters",
-                    filters=[],
+                    filters=[event_search_filter, search_rank_filter],
                     caption=TABLE_CARD_CAPTION
                 )(DisasterTable(data)()),
 
+                # Cascading disasters
+                Card(
+                    id="cascade-card",
+                    title="Cascading disasters",
+                    filters=[cascade_region_filter, cascade_pair_filter],
+                    caption=CASCADE_CARD_CAPTION
+                )(CascadeView(indexes)()),
+
             ], className="w-1/3 flex flex-col gap-4"),
 
         ], className="flex gap-4 p-4 ml-64 bg-gray-300 min-h-screen")
     ])
 
-def init_callbacks(app: Dash, data: pd.DataFrame, geojson: Dict[str, Any], areas: Dict[str, float]) -> None:
+def init_callbacks(app: Dash, data: pd.DataFrame, geojson: Dict[str, Any], areas: Dict[str, float], indexes: DisasterIndexes) -> None:
     """Initialize dashboard callbacks."""
     app.config.suppress_callback_exceptions = True
     
     # Register callbacks from components
-    register_map_callbacks(app, data, geojson, areas)
-    register_timed_count_callbacks(app, data)
-    register_pie_callbacks(app, data)
+    register_map_callbacks(app, data, geojson, areas, indexes.search_index)
+    register_timed_count_callbacks(app, data, indexes.cube)
+    register_pie_callbacks(app, data, indexes.cube, indexes.countries)
     register_statistics_callbacks(app, data)
-    register_details_callbacks(app, data)
-    register_table_callbacks(app, data)
+    register_details_callbacks(app, data, indexes.countries)
+    register_table_callbacks(app, data, indexes)
     register_treemap_callbacks(app, data)
-    register_side_menu_callbacks(app, data)
+    register_seasonality_callbacks(app, indexes.cube)
+    register_distribution_callbacks(app, indexes.quantiles)
+    register_timeline_callbacks(app, indexes)
+    register_cascade_callbacks(app, indexes)
+    register_side_menu_callbacks(app)
+    register_export_links_callback(app, "export-link")
 
 
-    for id in ["map-card", "temporal-card", "details-card", "stats-card", "pie-card", "table-card", "treemap-card"]:
+    for id in ["map-card", "temporal-card", "details-card", "stats-card", "pie-card", "table-card", "treemap-card", "seasonality-card", "distribution-card", "ongoing-card", "cascade-card"]:
         register_card_callback(app, id)
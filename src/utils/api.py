@@ -0,0 +1,344 @@
+from typing import Any, Dict, Optional, Tuple
+
+import flask
+import numpy as np
+import pandas as pd
+from dash import Dash
+
+from . import logger
+from .cascades import parse_pair
+from .cube import CUBE_MEASURES
+from .export import (
+    EXPORT_FORMATS,
+    PARQUET_AVAILABLE,
+    export_slots,
+    filtered_chunks,
+    parquet_schema,
+    stream_csv,
+    stream_parquet,
+)
+from .indexes import DisasterIndexes
+from .metrics import metrics
+from .quantiles import DEFAULT_QUANTILES, QUANTILE_MEASURES
+
+API_PREFIX = "/api/v1"
+
+# Answers only change with the data, clients revalidate with their ETag
+API_CACHE_CONTROL = "public, no-cache"
+
+# group_by values accepted by /totals, and the column they group on
+GROUP_BY_COLUMNS = {
+    "year": "Year",
+    "type": "Disaster Type",
+    "region": "Region",
+    "subregion": "Subregion",
+    "iso": "ISO",
+}
+
+MAX_TOP_EVENTS = 100
+
+
+class ApiError(Exception):
+    """Invalid request, answered with a JSON error and its status code."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _year_arg(name: str) -> Optional[int]:
+    """Read an optional year from the query string."""
+    value = flask.request.args.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(f"{name} must be a year, got '{value}'")
+
+
+def _iso_arg() -> Optional[str]:
+    """Read an optional country code from the query string, ISO codes are upper case."""
+    iso = flask.request.args.get("iso")
+    return iso.upper() if iso else None
+
+
+def _metric_arg() -> str:
+    """Read the metric from the query string, 'count' by default."""
+    metric = flask.request.args.get("metric", "count")
+    if metric not in ["count", *CUBE_MEASURES]:
+        raise ApiError(f"metric must be one of {['count', *CUBE_MEASURES]}, got '{metric}'")
+    return metric
+
+
+def _json_value(value: Any) -> Any:
+    """Turn numpy scalars and missing values into JSON values."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return _json_value(value.item())
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _records(frame: pd.DataFrame) -> list:
+    """Rows of a frame as JSON objects."""
+    return [
+        {column: _json_value(value) for column, value in row.items()}
+        for row in frame.to_dict("records")
+    ]
+
+
+def _series(series: pd.Series) -> list:
+    """A totals series as a list of {key, value} objects, in its order."""
+    return [
+        {"key": _json_value(key), "value": _json_value(value)}
+        for key, value in series.items()
+    ]
+
+
+def init_api(app: Dash, indexes: DisasterIndexes) -> None:
+    """
+    Serve read-only JSON aggregates of the data under /api/v1.
+
+    Every answer is computed from the dashboard indexes and tagged with an
+    ETag derived from the dataset version: a request whose If-None-Match
+    holds the current version is answered 304 without computing anything.
+
+    Endpoints:
+        GET /api/v1/version: dataset version, number of events and year range
+        GET /api/v1/totals: count or impact sum by year, type, region, subregion or iso
+            (group_by, metric, start_year, end_year, disaster_type, region)
+        GET /api/v1/deadliest: top-N deadliest events
+            (n, start_year, end_year, disaster_type, region, iso)
+        GET /api/v1/quantiles: approximate quantiles of an impact metric, within 1%
+            (metric, q, start_year, end_year, disaster_type, region, iso)
+        GET /api/v1/cascades: compound disasters, events of a country following each other, deadliest first
+            (n, start_year, end_year, region, iso, pair=Trigger>Follow-up (repeatable), window)
+        GET /api/v1/countries/<iso>: events by type and impact totals of a country
+            (start_year, end_year)
+        GET /api/v1/export: the matching events streamed as a file
+            (format=csv|parquet, start_year, end_year, disaster_type, region, iso)
+
+    Args:
+        app: Dash application instance
+        indexes: Shared dashboard indexes
+    """
+    api = flask.Blueprint("api_v1", __name__, url_prefix=API_PREFIX)
+    etag = indexes.version
+
+    @api.before_request
+    def answer_not_modified() -> Optional[flask.Response]:
+        not_modified = flask.request.if_none_match.contains_weak(etag)
+        metrics.record_cache("api_etag", not_modified)
+        if not_modified:
+            response = flask.Response(status=304)
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = API_CACHE_CONTROL
+            return response
+        return None
+
+    @api.after_request
+    def tag_response(response: flask.Response) -> flask.Response:
+        if response.status_code == 200:
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = API_CACHE_CONTROL
+        return response
+
+    @api.errorhandler(ApiError)
+    def handle_api_error(error: ApiError) -> Tuple[flask.Response, int]:
+        return flask.jsonify({"success": False, "error": error.message}), error.status
+
+    @api.route("/version")
+    def version() -> flask.Response:
+        return flask.jsonify({
+            "version": indexes.version,
+            "rows": indexes.rows,
+            "min_year": indexes.cube.min_year,
+            "max_year": indexes.cube.max_year,
+        })
+
+    @api.route("/totals")
+    def totals() -> flask.Response:
+        args = flask.request.args
+        group_by = args.get("group_by", "year")
+        if group_by not in GROUP_BY_COLUMNS:
+            raise ApiError(f"group_by must be one of {list(GROUP_BY_COLUMNS)}, got '{group_by}'")
+        metric = _metric_arg()
+        start_year, end_year = _year_arg("start_year"), _year_arg("end_year")
+        disaster_type, region = args.get("disaster_type"), args.get("region")
+
+        if group_by == "iso":
+            if region and region != "All":
+                raise ApiError("region cannot be combined with group_by=iso")
+            values = indexes.countries.totals(metric, start_year, end_year, disaster_type)
+        else:
+            values = indexes.cube.totals(
+                metric, GROUP_BY_COLUMNS[group_by], start_year, end_year, disaster_type, region
+            )
+
+        return flask.jsonify({
+            "group_by": group_by,
+            "metric": metric,
+            "filters": {
+                "start_year": start_year,
+                "end_year": end_year,
+                "disaster_type": disaster_type,
+                "region": region,
+            },
+            "totals": _series(values),
+        })
+
+    @api.route("/deadliest")
+    def deadliest() -> flask.Response:
+        args = flask.request.args
+        try:
+            n = int(args.get("n", 10))
+        except ValueError:
+            raise ApiError(f"n must be an integer, got '{args.get('n')}'")
+        if not 1 <= n <= MAX_TOP_EVENTS:
+            raise ApiError(f"n must be between 1 and {MAX_TOP_EVENTS}")
+
+        events = indexes.deadliest(
+            n,
+            _year_arg("start_year"),
+            _year_arg("end_year"),
+            args.get("disaster_type"),
+            args.get("region"),
+            _iso_arg(),
+        )
+        return flask.jsonify({"events": _records(events)})
+
+    @api.route("/quantiles")
+    def quantiles() -> flask.Response:
+        args = flask.request.args
+        metric = args.get("metric", "Total Deaths")
+        if metric not in QUANTILE_MEASURES or metric not in indexes.quantiles:
+            raise ApiError(f"metric must be one of {QUANTILE_MEASURES}, got '{metric}'")
+        try:
+            wanted = [float(q) for q in args.getlist("q")] or list(DEFAULT_QUANTILES)
+        except ValueError:
+            raise ApiError(f"q must be a number between 0 and 1, got {args.getlist('q')}")
+        if not all(0 <= q <= 1 for q in wanted):
+            raise ApiError(f"q must be between 0 and 1, got {wanted}")
+
+        values = indexes.quantiles.quantiles(
+            metric,
+            wanted,
+            _year_arg("start_year"),
+            _year_arg("end_year"),
+            args.get("disaster_type"),
+            args.get("region"),
+            _iso_arg(),
+        )
+        return flask.jsonify({
+            "metric": metric,
+            "quantiles": [
+                {"q": q, "value": _json_value(value)} for q, value in values.items()
+            ],
+        })
+
+    @api.route("/cascades")
+    def cascades() -> flask.Response:
+        args = flask.request.args
+        try:
+            n = int(args.get("n", 20))
+        except ValueError:
+            raise ApiError(f"n must be an integer, got '{args.get('n')}'")
+        if not 1 <= n <= MAX_TOP_EVENTS:
+            raise ApiError(f"n must be between 1 and {MAX_TOP_EVENTS}")
+        try:
+            window = int(args["window"]) if args.get("window") else None
+        except ValueError:
+            raise ApiError(f"window must be a number of days, got '{args.get('window')}'")
+        if window is not None and window < 0:
+            raise ApiError(f"window must be a number of days, got {window}")
+
+        try:
+            pairs = [parse_pair(pair) for pair in args.getlist("pair")] or None
+            found = indexes.cascades(
+                n,
+                _year_arg("start_year"),
+                _year_arg("end_year"),
+                args.get("region"),
+                _iso_arg(),
+                pairs,
+                window,
+            )
+        except ValueError as e:
+            raise ApiError(str(e))
+
+        found["Start_Date"] = found["Start_Date"].dt.strftime("%Y-%m-%d")
+        return flask.jsonify({
+            "rules": [
+                {"trigger": trigger, "follow_up": follow_up, "window": days}
+                for trigger, follow_up, days in indexes.cascade_index.select_rules(pairs, window)
+            ],
+            "cascades": _records(found),
+        })
+
+    @api.route("/countries/<iso>")
+    def country(iso: str) -> flask.Response:
+        iso = iso.upper()
+        countries = indexes.countries
+        if iso not in countries:
+            raise ApiError(f"No disasters recorded for '{iso}'", status=404)
+
+        start_year, end_year = _year_arg("start_year"), _year_arg("end_year")
+        details: Dict[str, Any] = {
+            "iso": iso,
+            "country": countries.country_name(iso),
+            "region": countries.region(iso),
+            "start_year": start_year,
+            "end_year": end_year,
+            "totals": {
+                metric: _json_value(value)
+                for metric, value in countries.measures(iso, start_year, end_year).items()
+            },
+            "types": _series(countries.type_counts(iso, start_year, end_year)),
+        }
+        return flask.jsonify(details)
+
+    @api.route("/export")
+    def export() -> flask.Response:
+        args = flask.request.args
+        export_format = args.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            raise ApiError(f"format must be one of {list(EXPORT_FORMATS)}, got '{export_format}'")
+        if export_format == "parquet" and not PARQUET_AVAILABLE:
+            raise ApiError("Parquet export needs pyarrow, which is not installed", status=501)
+
+        chunks = filtered_chunks(
+            indexes.countries,
+            _year_arg("start_year"),
+            _year_arg("end_year"),
+            args.get("disaster_type"),
+            args.get("region"),
+            _iso_arg(),
+        )
+
+        # Exports are long, a few at a time keep workers free for the dashboard
+        if not export_slots.acquire(blocking=False):
+            raise ApiError("Too many exports in progress, retry later", status=429)
+
+        try:
+            data = indexes.countries.data
+            if export_format == "csv":
+                body = stream_csv(chunks, data.columns)
+            else:
+                body = stream_parquet(chunks, parquet_schema(data))
+            response = flask.Response(body, mimetype=EXPORT_FORMATS[export_format])
+        except Exception:
+            export_slots.release()
+            raise
+        # The server closes the response once sent, or dropped (HEAD requests, disconnected clients)
+        response.call_on_close(export_slots.release)
+        response.headers["Content-Disposition"] = (
+            f"attachment; filename=disasters-{indexes.version}.{export_format}"
+        )
+        return response
+
+    app.server.register_blueprint(api)
+    logger.info(f"Serving the JSON API under {API_PREFIX} (dataset version {etag})")
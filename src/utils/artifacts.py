@@ -0,0 +1,403 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from dash import dcc, html
+from dash.development.base_component import Component
+from plotly.io.json import to_json_plotly
+
+from . import logger
+from .cascades import CascadeIndex
+from .indexes import DisasterIndexes
+
+# Bumped whenever the bundle layout changes, older bundles are then ignored
+ARTIFACT_FORMAT = 6
+
+MANIFEST_FILE = "manifest.json"
+
+# Component libraries of a serialized layout root, by namespace
+LAYOUT_NAMESPACES = {"dash_html_components": html, "dash_core_components": dcc}
+
+# Bundles kept in the artifacts directory, the one just written and the previous one
+# (still mapped by the workers of a running deployment)
+MAX_BUNDLES = 2
+
+# Layout snapshots kept per folder, the newest ones (older code or geographic files)
+MAX_LAYOUT_SNAPSHOTS = 2
+
+# Douglas-Peucker tolerance of the country borders, in degrees (about 1 km)
+GEOMETRY_TOLERANCE = 0.01
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the sha256 hex digest of a file, read by chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def simplify_ring(points: List[List[float]], tolerance: float = GEOMETRY_TOLERANCE) -> List[List[float]]:
+    """
+    Simplify a closed ring of [lon, lat] points with the Douglas-Peucker algorithm.
+
+    The first and last points are always kept, and a ring never drops below
+    the four points of a valid polygon.
+    """
+    if len(points) <= 4:
+        return points
+
+    coords = np.asarray(points, dtype=float)[:, :2]
+    keep = np.zeros(len(coords), dtype=bool)
+    keep[0] = keep[-1] = True
+
+    # Iterative to stay clear of the recursion limit on long borders
+    stack = [(0, len(coords) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = coords[first], coords[last]
+        segment = end - start
+        inner = coords[first + 1:last] - start
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.extend([(first, split), (split, last)])
+
+    if keep.sum() < 4:
+        return points
+    return [points[i] for i in np.flatnonzero(keep)]
+
+
+def simplify_geojson(geojson: Dict[str, Any], tolerance: float = GEOMETRY_TOLERANCE) -> Dict[str, Any]:
+    """
+    Return a copy of a GeoJSON feature collection with simplified polygons.
+
+    Country borders are drawn at world scale, most of their points are
+    below a pixel and only weigh on the layout sent to every browser.
+    """
+    if "features" not in geojson:
+        return geojson
+
+    def simplify_polygon(rings: List) -> List:
+        return [simplify_ring(ring, tolerance) for ring in rings]
+
+    features = []
+    for feature in geojson["features"]:
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") == "Polygon":
+            geometry = {**geometry, "coordinates": simplify_polygon(geometry["coordinates"])}
+        elif geometry.get("type") == "MultiPolygon":
+            geometry = {**geometry, "coordinates": [simplify_polygon(p) for p in geometry["coordinates"]]}
+        features.append({**feature, "geometry": geometry})
+
+    return {**geojson, "features": features}
+
+
+def category_value(value: Any) -> Any:
+    """A category as stored in JSON: numpy scalars as Python ones, other non-JSON values as text."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    return value if isinstance(value, (str, bool, int, float)) else str(value)
+
+
+def write_columns(data: pd.DataFrame, directory: Path) -> List[Dict[str, Any]]:
+    """
+    Write a DataFrame column by column as .npy files.
+
+    Numeric, boolean and date columns are stored as is, other columns as
+    integer codes plus their categories (a JSON file, which keeps strings,
+    booleans and numbers apart), so that every .npy file can be memory-mapped.
+
+    Returns:
+        The description of the columns, in order, for read_columns
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = []
+    for position, name in enumerate(data.columns):
+        series = data[name]
+        column = {"name": name, "file": f"column_{position}.npy"}
+        if series.dtype.kind in "biufMm":
+            values = series.to_numpy()
+        else:
+            try:
+                codes, categories = pd.factorize(series, sort=True)
+            except TypeError:  # Values of several types cannot be sorted together
+                codes, categories = pd.factorize(series)
+            values = codes.astype(np.int32)
+            column["categories"] = f"categories_{position}.json"
+            (directory / column["categories"]).write_text(json.dumps([category_value(c) for c in categories]))
+        column["dtype"] = str(series.dtype)
+        np.save(directory / column["file"], values)
+        columns.append(column)
+    return columns
+
+
+def read_columns(directory: Path, columns: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Read the columns written by write_columns.
+
+    Numeric columns stay memory-mapped read-only, coded columns are decoded
+    back to their Python values (missing values as NaN) into arrays of each
+    process's own.
+    """
+    values = {}
+    for column in columns:
+        array = np.load(directory / column["file"], mmap_mode="r")
+        if "categories" in column:
+            categories = json.loads((directory / column["categories"]).read_text())
+            categories = np.array(categories + [np.nan], dtype=object)
+            # Code -1 (missing) picks the trailing NaN
+            array = categories[array]
+        values[column["name"]] = array
+    return pd.DataFrame(values, copy=False)
+
+
+def layout_component(layout: Dict[str, Any]) -> Component:
+    """
+    Rebuild the root component of a layout serialized by Dash.
+
+    Its children stay serialized, they are sent to the browser as they are
+    without building the component tree again.
+    """
+    component = getattr(LAYOUT_NAMESPACES[layout["namespace"]], layout["type"])
+    return component(**layout["props"])
+
+
+def layout_key(version: str, sources: List[Path]) -> str:
+    """
+    Return the key of the initial layout built from a dataset version.
+
+    Besides the data, the layout depends on the code building it and on the
+    geographic files, so their content is part of the key.
+
+    Args:
+        version: Dataset version
+        sources: Files and directories (their .py files) the layout is built from
+    """
+    digest = hashlib.sha256(version.encode())
+    for source in sources:
+        files = sorted(source.rglob("*.py")) if source.is_dir() else [source]
+        for path in files:
+            if path.is_file():
+                digest.update(str(path.name).encode())
+                digest.update(file_digest(path).encode())
+    return digest.hexdigest()[:16]
+
+
+def snapshot_directory(root: Path, bundle: Optional[Path] = None) -> Path:
+    """
+    Folder of the layout snapshots.
+
+    Snapshots of a bundle's data live in the bundle, and go away with it;
+    those of data built without a bundle in root / "layouts".
+    """
+    return (bundle if bundle is not None else root) / "layouts"
+
+
+def load_layout_snapshot(directory: Path, key: str) -> Optional[Component]:
+    """Load the layout snapshot saved under a key, None if there is none."""
+    path = directory / f"{key}.json"
+    try:
+        layout = layout_component(json.loads(path.read_text()))
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+    logger.info(f"Loaded layout snapshot {path.name}")
+    return layout
+
+
+def save_layout_snapshot(
+    directory: Path, key: str, layout: Component, keep: int = MAX_LAYOUT_SNAPSHOTS
+) -> Optional[Path]:
+    """
+    Serialize a layout under a key, for load_layout_snapshot.
+
+    The file is written aside then renamed, so that workers starting
+    together never read a partial snapshot. Only the keep most recent
+    snapshots of the folder are kept. A read-only disk only costs the
+    snapshot, None is returned.
+    """
+    path = directory / f"{key}.json"
+    staging = path.with_name(f".{key}.{os.getpid()}.tmp")
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        staging.write_text(to_json_plotly(layout))
+        os.replace(staging, path)
+        snapshots = sorted(directory.glob("*.json"), key=lambda file: file.stat().st_mtime, reverse=True)
+        for stale in snapshots[keep:]:
+            stale.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Could not save the layout snapshot: {e}")
+        return None
+    logger.info(f"Saved layout snapshot {path.name}")
+    return path
+
+
+def bundle_path(root: Path, version: str) -> Path:
+    """Directory of the bundle of a dataset version."""
+    return root / version
+
+
+def input_digests(inputs: Dict[str, Path]) -> Dict[str, Optional[str]]:
+    """Digest of every input file of a bundle by name, None for a missing file."""
+    return {name: file_digest(path) if path.is_file() else None for name, path in sorted(inputs.items())}
+
+
+def write_bundle(
+    root: Path,
+    inputs: Dict[str, Path],
+    data: pd.DataFrame,
+    indexes: DisasterIndexes,
+    geojson: Dict[str, Any],
+    areas: Dict[str, float],
+    keep: int = MAX_BUNDLES,
+) -> Path:
+    """
+    Write the data and everything computed from it at startup to a versioned bundle.
+
+    The bundle is written to a temporary directory then renamed, a reader
+    never sees a partial bundle: a bundle of the same version is moved
+    aside before the new one takes its place, and only deleted afterwards.
+    Only the keep most recent bundles of root are kept.
+
+    Args:
+        root: Directory holding the bundles
+        inputs: Files the bundle is built from (cleaned CSV, borders, areas),
+            by name; the bundle is tied to their digests
+        data: Cleaned data
+        indexes: Indexes built from data
+        geojson: Country borders (simplified or not)
+        areas: Country areas
+        keep: Bundles kept in root, the new one included
+
+    Returns:
+        The bundle directory
+    """
+    target = bundle_path(root, indexes.version)
+    staging = root / f".{indexes.version}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    columns = write_columns(data, staging / "data")
+    indexes.save(staging / "indexes")
+    (staging / "geojson.json").write_text(json.dumps(geojson))
+    (staging / "areas.json").write_text(json.dumps(areas))
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": indexes.version,
+        "rows": indexes.rows,
+        "inputs": input_digests(inputs),
+        "columns": columns,
+    }
+    (staging / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+
+    replaced = root / f".{indexes.version}.old"
+    shutil.rmtree(replaced, ignore_errors=True)
+    if target.exists():
+        target.rename(replaced)
+    staging.rename(target)
+    shutil.rmtree(replaced, ignore_errors=True)
+    logger.info(f"Wrote artifact bundle {target}")
+    prune_bundles(root, keep)
+    return target
+
+
+def prune_bundles(root: Path, keep: int = MAX_BUNDLES) -> None:
+    """Delete the bundles of root (of any format) but the keep most recently written."""
+    bundles = [bundle for bundle in root.iterdir() if (bundle / MANIFEST_FILE).is_file()]
+    bundles.sort(key=lambda path: (path / MANIFEST_FILE).stat().st_mtime, reverse=True)
+    for stale in bundles[keep:]:
+        shutil.rmtree(stale, ignore_errors=True)
+        logger.info(f"Deleted artifact bundle {stale.name}")
+
+
+def read_manifest(bundle: Path) -> Optional[Dict[str, Any]]:
+    """Return the manifest of a bundle, None if it is missing or of another format."""
+    try:
+        manifest = json.loads((bundle / MANIFEST_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == ARTIFACT_FORMAT else None
+
+
+def find_bundle(root: Path, inputs: Dict[str, Path]) -> Optional[Path]:
+    """
+    Find the bundle built from the current content of its input files.
+
+    Args:
+        root: Directory holding the bundles
+        inputs: Files the bundle is built from, by name (as given to write_bundle)
+
+    Returns:
+        The bundle directory, None if no bundle matches all the files
+    """
+    if not root.is_dir():
+        return None
+
+    digests = input_digests(inputs)
+    for bundle in sorted(root.iterdir()):
+        manifest = read_manifest(bundle)
+        if manifest is not None and manifest["inputs"] == digests:
+            return bundle
+    return None
+
+
+def load_previous_cascades(root: Path) -> Optional[CascadeIndex]:
+    """
+    Load the cascades of the most recent bundle, to rebuild only the countries whose events changed.
+
+    Args:
+        root: Directory holding the bundles
+
+    Returns:
+        The cascade index, None if there is no readable bundle
+    """
+    if not root.is_dir():
+        return None
+
+    bundles = [bundle for bundle in root.iterdir() if read_manifest(bundle) is not None]
+    for bundle in sorted(bundles, key=lambda path: (path / MANIFEST_FILE).stat().st_mtime, reverse=True):
+        try:
+            cascades = CascadeIndex.load(bundle / "indexes" / "cascades")
+        except (OSError, ValueError, KeyError):
+            continue
+        logger.info(f"Reusing the cascades of artifact bundle {bundle.name}")
+        return cascades
+    return None
+
+
+def load_bundle(bundle: Path) -> Dict[str, Any]:
+    """
+    Load a bundle written by write_bundle.
+
+    Returns:
+        Dictionary with the data, indexes, geojson and areas
+    """
+    manifest = read_manifest(bundle)
+    if manifest is None:
+        raise ValueError(f"{bundle} is not an artifact bundle of format {ARTIFACT_FORMAT}")
+
+    data = read_columns(bundle / "data", manifest["columns"])
+    indexes = DisasterIndexes.load(bundle / "indexes", data)
+    logger.info(f"Loaded artifact bundle {bundle.name} ({manifest['rows']} events)")
+
+    return {
+        "data": data,
+        "indexes": indexes,
+        "geojson": json.loads((bundle / "geojson.json").read_text()),
+        "areas": json.loads((bundle / "areas.json").read_text()),
+    }
@@ -0,0 +1,202 @@
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+from . import logger
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+MANIFEST_FILE = "manifest.json"
+TAILWIND_FILE = "tailwind.min.css"
+PURGED_TAILWIND_FILE = "tailwind.purged.min.css"
+
+# Assets shipped precompressed
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg"}
+
+# Candidate class names, as extracted by Tailwind's own default extractor
+CLASS_CANDIDATE_PATTERN = re.compile(r"[^<>\"'`\s]*[^<>\"'`\s:]")
+CSS_CLASS_PATTERN = re.compile(r"\.((?:\\[0-9a-fA-F]{1,6} ?|\\.|[\w-])+)")
+CSS_ESCAPE_PATTERN = re.compile(r"\\([0-9a-fA-F]{1,6}) ?|\\(.)")
+
+
+def content_hash(path: Path) -> str:
+    """Return a short content hash of a file, used to version asset URLs."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:12]
+
+
+def collect_used_classes(sources: Iterable[Path]) -> Set[str]:
+    """
+    Collect every token of the source files that could be a CSS class.
+
+    Args:
+        sources: Files or directories to scan (.py and .js files)
+    """
+    used: Set[str] = set()
+    for source in sources:
+        files = [source] if source.is_file() else [
+            *source.rglob("*.py"), *source.rglob("*.js")
+        ]
+        for file in files:
+            used.update(CLASS_CANDIDATE_PATTERN.findall(file.read_text(encoding="utf-8")))
+    return used
+
+
+def _unescape_class(name: str) -> str:
+    """Turn an escaped CSS class (e.g. 'hover\\:bg-gray-100') back into its markup form."""
+    return CSS_ESCAPE_PATTERN.sub(
+        lambda match: chr(int(match.group(1), 16)) if match.group(1) else match.group(2), name
+    )
+
+
+def _split_top_level(text: str, separator: str) -> List[str]:
+    """Split on a separator, ignoring separators nested in parentheses or brackets."""
+    parts: List[str] = []
+    current: List[str] = []
+    depth = 0
+    for char in text:
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        if char == separator and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def _purge_block(css: str, used: Set[str]) -> str:
+    """Keep the rules of a CSS block whose selectors only use classes in used."""
+    kept, position = [], 0
+    while position < len(css):
+        open_brace = css.find("{", position)
+        if open_brace == -1:
+            break
+        prelude = css[position:open_brace].strip()
+
+        # Find the matching closing brace, at-rules can nest blocks
+        depth, end = 1, open_brace + 1
+        while depth and end < len(css):
+            depth += {"{": 1, "}": -1}.get(css[end], 0)
+            end += 1
+        body = css[open_brace + 1:end - 1]
+        position = end
+
+        # Comments are dropped, purge_css restores the license header
+        prelude = re.sub(r"/\*.*?\*/", "", prelude, flags=re.S).strip()
+
+        if prelude.startswith("@media") or prelude.startswith("@supports"):
+            inner = _purge_block(body, used)
+            if inner:
+                kept.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@"):
+            kept.append(f"{prelude}{{{body}}}")
+        else:
+            selectors = [
+                selector for selector in _split_top_level(prelude, ",")
+                if all(
+                    _unescape_class(name) in used
+                    for name in CSS_CLASS_PATTERN.findall(selector)
+                )
+            ]
+            if selectors:
+                kept.append(f"{','.join(selectors)}{{{body}}}")
+    return "".join(kept)
+
+
+def purge_css(css_path: Path, output_path: Path, sources: Iterable[Path]) -> None:
+    """
+    Write a copy of a stylesheet without the rules using classes absent from the sources.
+
+    Rules without class selectors (preflight, element styles) are always kept.
+
+    Args:
+        css_path: Stylesheet to purge
+        output_path: Where to write the purged stylesheet
+        sources: Files or directories whose class names must be kept
+    """
+    used = collect_used_classes(sources)
+    css = css_path.read_text(encoding="utf-8")
+    license_header = re.match(r"\s*(/\*!.*?\*/)", css, flags=re.S)
+    purged = _purge_block(css, used)
+    if license_header:
+        purged = license_header.group(1) + purged
+    output_path.write_text(purged, encoding="utf-8")
+    logger.info(
+        f"Purged {css_path.name}: {len(css):,} -> {len(purged):,} bytes ({output_path.name})"
+    )
+
+
+def precompress(path: Path) -> None:
+    """Write .gz (and .br if brotli is installed) copies of a file next to it."""
+    body = path.read_bytes()
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(body, compresslevel=9))
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(body, quality=11))
+
+
+def build_assets(assets_dir: Path, purge: bool = False, sources: Iterable[Path] = ()) -> Dict[str, str]:
+    """
+    Prepare the assets folder for production.
+
+    Optionally purges the Tailwind stylesheet, precompresses every
+    compressible asset and writes a manifest mapping each stylesheet and
+    script to its content-hashed URL path.
+
+    Args:
+        assets_dir: Dash assets folder
+        purge: Purge unused Tailwind classes (see purge_css)
+        sources: Files or directories scanned for used classes when purging
+
+    Returns:
+        The manifest written to assets_dir / MANIFEST_FILE
+    """
+    tailwind = assets_dir / TAILWIND_FILE
+    purged = assets_dir / PURGED_TAILWIND_FILE
+    if purge and tailwind.exists():
+        purge_css(tailwind, purged, [*sources, assets_dir])
+    elif purged.exists():
+        purged.unlink()
+
+    manifest = {}
+    for path in sorted(assets_dir.iterdir()):
+        if path.suffix not in COMPRESSIBLE_EXTENSIONS:
+            continue
+        precompress(path)
+        if path.suffix in (".css", ".js") and path not in (tailwind, purged):
+            manifest[path.name] = f"{path.name}?v={content_hash(path)}"
+
+    # The purged stylesheet stands in for the full one
+    if tailwind.exists():
+        served = purged if purged.exists() else tailwind
+        manifest[TAILWIND_FILE] = f"{served.name}?v={content_hash(served)}"
+
+    (assets_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    logger.info(f"Built {len(manifest)} hashed assets in {assets_dir}")
+    return manifest
+
+
+def load_asset_manifest(assets_dir: Path) -> Dict[str, str]:
+    """
+    Map each stylesheet and script of the assets folder to its content-hashed URL path.
+
+    Reads the manifest written by build_assets, or hashes the files when the
+    assets were not built.
+    """
+    manifest_path = assets_dir / MANIFEST_FILE
+    if manifest_path.exists():
+        return json.loads(manifest_path.read_text())
+
+    return {
+        path.name: f"{path.name}?v={content_hash(path)}"
+        for path in sorted(assets_dir.iterdir())
+        if path.suffix in (".css", ".js") and path.name != PURGED_TAILWIND_FILE
+    }
@@ -0,0 +1,96 @@
+import collections
+import functools
+import json
+import os
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+import flask
+from dash import Dash
+
+from . import logger
+from .metrics import metrics
+from .profiling import profile_requested
+
+# Responses kept per worker, a chart response weighs a few KB to a few tens of KB
+CALLBACK_CACHE_SIZE = int(os.environ.get("DISASTERS_CALLBACK_CACHE_SIZE", "1024"))
+
+
+class CallbackCache:
+    """
+    Least recently used cache of callback responses.
+
+    The data never changes while the server runs and the dashboard
+    callbacks only depend on their inputs and on which of them fired
+    (some callbacks send a smaller patch for some triggers), so the JSON
+    response of a callback can be reused for the same input values and
+    triggers.
+    """
+
+    def __init__(self, size: int = CALLBACK_CACHE_SIZE):
+        self.size = size
+        self._responses: "collections.OrderedDict[Tuple[str, str], str]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def get(self, key: Tuple[str, str]) -> Optional[str]:
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+            return response
+
+    def put(self, key: Tuple[str, str], response: str) -> None:
+        with self._lock:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.size:
+                self._responses.popitem(last=False)
+
+
+callback_cache = CallbackCache()
+
+
+def cached_callback(callback_id: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a Dash callback handler to reuse its responses for identical inputs.
+
+    Args:
+        callback_id: Name of the callback in the cache keys (its output)
+        func: Handler registered by Dash, called with the input and state values
+    """
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        # A profiled request must run the callback for real
+        if flask.has_request_context() and profile_requested():
+            return func(*args, **kwargs)
+
+        context = kwargs.get("callback_context") or {}
+        triggered = sorted(item["prop_id"] for item in context.get("triggered_inputs") or [])
+        key = (callback_id, json.dumps([triggered, args], sort_keys=True, default=str))
+        response = callback_cache.get(key)
+        metrics.record_cache("callback_responses", response is not None)
+        if response is None:
+            response = func(*args, **kwargs)
+            if isinstance(response, str):
+                callback_cache.put(key, response)
+        return response
+
+    setattr(wrapper, "cached", True)
+    return wrapper
+
+
+def init_callback_cache(app: Dash) -> None:
+    """
+    Cache the responses of every server-side callback registered so far.
+
+    Set DISASTERS_CALLBACK_CACHE_SIZE=0 to turn the cache off.
+    """
+    if CALLBACK_CACHE_SIZE <= 0:
+        return
+    for callback_id, callback in app.callback_map.items():
+        if "callback" in callback and not getattr(callback["callback"], "cached", False):
+            callback["callback"] = cached_callback(callback_id.strip("."), callback["callback"])
+    logger.info(f"Caching up to {CALLBACK_CACHE_SIZE} callback responses per worker")
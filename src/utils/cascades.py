@@ -0,0 +1,377 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import logger
+from .intervals import event_days
+
+# Trigger and follow-up disaster types of a compound disaster, with the
+# longest gap in days between their starts. EM-DAT records tsunamis as
+# earthquakes, landslides as mass movements.
+CASCADE_RULES: Dict[Tuple[str, str], int] = {
+    ("Earthquake", "Mass movement (dry)"): 7,
+    ("Volcanic activity", "Earthquake"): 7,
+    ("Volcanic activity", "Mass movement (dry)"): 7,
+    ("Storm", "Flood"): 7,
+    ("Storm", "Mass movement (wet)"): 7,
+    ("Flood", "Mass movement (wet)"): 7,
+    ("Flood", "Epidemic"): 60,
+    ("Storm", "Epidemic"): 60,
+    ("Extreme temperature", "Wildfire"): 30,
+    ("Drought", "Wildfire"): 90,
+}
+
+# Separates the trigger and follow-up types of a pair, e.g. "Storm>Flood"
+PAIR_SEPARATOR = ">"
+
+
+def pair_name(trigger: str, follow_up: str) -> str:
+    """Name of a type pair, as accepted by parse_pair."""
+    return f"{trigger}{PAIR_SEPARATOR}{follow_up}"
+
+
+def parse_pair(name: str) -> Tuple[str, str]:
+    """Trigger and follow-up types of a pair name."""
+    trigger, separator, follow_up = name.partition(PAIR_SEPARATOR)
+    if not separator or not trigger.strip() or not follow_up.strip():
+        raise ValueError(f"A type pair is written 'Trigger{PAIR_SEPARATOR}Follow-up', got '{name}'")
+    return trigger.strip(), follow_up.strip()
+
+
+def sweep(
+    iso_codes: np.ndarray,
+    days: np.ndarray,
+    type_codes: np.ndarray,
+    rules: Sequence[Tuple[int, int, int]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Link every follow-up event to the latest trigger event of the same country within the window.
+
+    One pass per rule over the events sorted by (country, start day): a
+    running maximum carries the position of the latest trigger seen, which
+    each follow-up checks against its country and window. A trigger
+    starting the same day as its follow-up is found whatever their order.
+
+    Args:
+        iso_codes: Country code of every event, sorted
+        days: Start day of every event, sorted within each country
+        type_codes: Disaster type code of every event
+        rules: (trigger type code, follow-up type code, window in days) of each rule
+
+    Returns:
+        The trigger and follow-up positions of every link, and the rule of each link
+    """
+    size = len(days)
+    links: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+    if size:
+        positions = np.arange(size)
+        # Last position of the run of events of the same country and day
+        breaks = np.flatnonzero((np.diff(iso_codes) != 0) | (np.diff(days) != 0))
+        run_lasts = np.append(breaks, size - 1)
+        run_ends = np.repeat(run_lasts, np.diff(np.concatenate([[-1], run_lasts])))
+
+    for rule, (trigger, follow_up, window) in enumerate(rules):
+        if not size:
+            break
+        followers = np.flatnonzero(type_codes == follow_up)
+        if trigger < 0 or not len(followers):
+            continue
+        latest = np.maximum.accumulate(np.where(type_codes == trigger, positions, -1))
+        if trigger == follow_up:
+            # An event does not trigger itself, the previous one of its type does
+            triggers = np.where(followers > 0, latest[np.maximum(followers - 1, 0)], -1)
+        else:
+            triggers = latest[run_ends[followers]]
+        found = triggers >= 0
+        triggers, followers = triggers[found], followers[found]
+        keep = (iso_codes[triggers] == iso_codes[followers]) & (days[followers] - days[triggers] <= window)
+        links.append((triggers[keep], followers[keep], np.full(int(keep.sum()), rule, dtype=np.int16)))
+
+    if not links:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int16)
+    sources, targets, link_rules = (np.concatenate(parts) for parts in zip(*links))
+    return sources.astype(np.int64), targets.astype(np.int64), link_rules
+
+
+def connected_clusters(size: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Cluster of every position, labelled by its lowest position, from the links between them.
+
+    Union-find over whole arrays: each round hooks the root of the higher
+    end of every link under the lower one, then compresses the paths by
+    pointer jumping, until every link joins a single root.
+    """
+    parent = np.arange(size)
+    while True:
+        low = np.minimum(parent[sources], parent[targets])
+        high = np.maximum(parent[sources], parent[targets])
+        pending = low != high
+        if not pending.any():
+            return parent
+        np.minimum.at(parent, high[pending], low[pending])
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+
+class CascadeIndex:
+    """
+    Compound disasters: events of a country following one another within a few days.
+
+    Events are sorted by (country, start date) and swept once per rule of
+    CASCADE_RULES (see sweep), so detection grows linearly with the number
+    of events, past the sort, instead of comparing every pair. Each
+    follow-up is linked to the latest trigger before it, and the linked
+    events form the cascades.
+
+    Links never cross a country, so the links of a country only change
+    with its events. Each country's events are fingerprinted: built with
+    the index of a previous dataset, only the countries whose events
+    changed are swept again, the others keep their previous links.
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        rules: Dict[Tuple[str, str], int] = CASCADE_RULES,
+        previous: Optional["CascadeIndex"] = None,
+    ):
+        days = event_days(data, "Start")
+        iso_codes, isos = pd.factorize(data["ISO"], sort=True)
+        type_codes, types = pd.factorize(data["Disaster Type"], sort=True)
+        known = (iso_codes >= 0) & (type_codes >= 0) & ~np.isnan(days)
+        rows = np.flatnonzero(known)
+
+        self.rows = len(data)
+        self.isos: List[str] = [str(iso) for iso in isos]
+        self.types: List[str] = [str(t) for t in types]
+        self.rules: List[Tuple[str, str, int]] = [(a, b, int(window)) for (a, b), window in rules.items()]
+
+        regions = data.loc[known, ["ISO", "Region"]].drop_duplicates("ISO").set_index("ISO")["Region"]
+        self.iso_regions = np.array([str(regions.get(iso, "")) for iso in self.isos], dtype=object)
+
+        # Events sorted by country, then start; same-day events by type and
+        # event number (its hash), so that the order does not depend on the row order
+        numbers = data["DisNo."].astype(str) if "DisNo." in data.columns else pd.Series("", index=data.index)
+        number_hashes = pd.util.hash_array(numbers.to_numpy(dtype=object), categorize=False)
+        first_day = int(days[rows].min()) if len(rows) else 0
+        span = int(days[rows].max()) - first_day + 1 if len(rows) else 1
+        keys = (iso_codes[rows] * span + (days[rows].astype(np.int64) - first_day)) * len(self.types) + type_codes[rows]
+        self._rows = rows[np.lexsort((number_hashes[rows], keys))].astype(np.int64)
+        self._iso_codes = iso_codes[self._rows].astype(np.int32)
+        self._days = days[self._rows].astype(np.int32)
+        self._type_codes = type_codes[self._rows].astype(np.int16)
+        self._iso_offsets = np.searchsorted(self._iso_codes, np.arange(len(self.isos) + 1)).astype(np.int64)
+
+        self._fingerprints = self._country_fingerprints(number_hashes[self._rows])
+        self._sources, self._targets, self._link_rules = self._detect(previous)
+        self._clusters = connected_clusters(len(self._rows), self._sources, self._targets)
+
+    def _country_fingerprints(self, number_hashes: np.ndarray) -> List[str]:
+        """Digest of the events of every country (type, start, number, order) and of the rules."""
+        type_hashes = pd.util.hash_array(np.asarray(self.types, dtype=object))
+        hashes = pd.util.hash_pandas_object(pd.DataFrame({
+            "type": type_hashes[self._type_codes],
+            "day": self._days,
+            "event": number_hashes,
+            "rank": np.arange(len(self._rows)) - self._iso_offsets[self._iso_codes],
+        }), index=False).to_numpy()
+
+        counts = np.diff(self._iso_offsets)
+        sums = np.zeros(len(self.isos), dtype=np.uint64)
+        present = counts > 0
+        if present.any():
+            sums[present] = np.add.reduceat(hashes, self._iso_offsets[:-1][present])
+        rules = json.dumps(self.rules)
+        return [
+            hashlib.sha256(f"{rules}:{count}:{total}".encode()).hexdigest()[:16]
+            for count, total in zip(counts.tolist(), sums.tolist())
+        ]
+
+    def _coded_rules(self, rules: Sequence[Tuple[str, str, int]]) -> List[Tuple[int, int, int]]:
+        """Rules with type codes, -1 for a type absent from the data."""
+        def code(name: str) -> int:
+            return self.types.index(name) if name in self.types else -1
+        return [(code(trigger), code(follow_up), window) for trigger, follow_up, window in rules]
+
+    def _detect(self, previous: Optional["CascadeIndex"]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Links of every country, swept again only where the events differ from previous."""
+        kept = np.zeros(len(self.isos), dtype=bool)
+        parts = []
+        if previous is not None:
+            before = dict(zip(previous.isos, previous._fingerprints))
+            kept = np.array([before.get(iso) == fingerprint
+                             for iso, fingerprint in zip(self.isos, self._fingerprints)], dtype=bool)
+            # Previous links of the unchanged countries, moved to their new positions
+            new_codes = {iso: code for code, iso in enumerate(self.isos) if kept[code]}
+            moved = np.array([new_codes.get(iso, -1) for iso in previous.isos], dtype=np.int64)
+            if len(previous._sources):
+                old_codes = np.asarray(previous._iso_codes)[previous._sources]
+                codes = moved[old_codes]
+                reuse = codes >= 0
+                shift = self._iso_offsets[codes[reuse]] - np.asarray(previous._iso_offsets)[old_codes[reuse]]
+                parts.append((
+                    np.asarray(previous._sources)[reuse] + shift,
+                    np.asarray(previous._targets)[reuse] + shift,
+                    np.asarray(previous._link_rules)[reuse],
+                ))
+
+        changed = np.flatnonzero(~kept)
+        lengths = np.diff(self._iso_offsets)[changed]
+        positions = (
+            np.repeat(self._iso_offsets[changed] - np.cumsum(lengths) + lengths, lengths)
+            + np.arange(int(lengths.sum()))
+        )
+        sources, targets, link_rules = sweep(
+            self._iso_codes[positions], self._days[positions], self._type_codes[positions],
+            self._coded_rules(self.rules),
+        )
+        parts.append((positions[sources], positions[targets], link_rules))
+
+        sources, targets, link_rules = (np.concatenate(arrays) for arrays in zip(*parts))
+        logger.info(
+            f"Detected {len(sources)} cascade links, "
+            f"{len(changed)} of {len(self.isos)} countries swept"
+        )
+        return sources.astype(np.int64), targets.astype(np.int64), link_rules.astype(np.int16)
+
+    def save(self, directory: Path) -> None:
+        """Write the sorted events and links (.npy) and the axes (cascades.json) to directory."""
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ("rows", "iso_codes", "days", "type_codes", "iso_offsets",
+                     "sources", "targets", "link_rules", "clusters"):
+            np.save(directory / f"{name}.npy", getattr(self, f"_{name}"))
+        (directory / "cascades.json").write_text(json.dumps({
+            "rows": self.rows,
+            "isos": self.isos,
+            "types": self.types,
+            "rules": self.rules,
+            "iso_regions": self.iso_regions.tolist(),
+            "fingerprints": self._fingerprints,
+        }))
+
+    @classmethod
+    def load(cls, directory: Path) -> "CascadeIndex":
+        """Load an index written by save, the arrays are memory-mapped read-only."""
+        meta = json.loads((directory / "cascades.json").read_text())
+        index = cls.__new__(cls)
+        index.rows = meta["rows"]
+        index.isos = meta["isos"]
+        index.types = meta["types"]
+        index.rules = [(a, b, int(window)) for a, b, window in meta["rules"]]
+        index.iso_regions = np.array(meta["iso_regions"], dtype=object)
+        index._fingerprints = meta["fingerprints"]
+        for name in ("rows", "iso_codes", "days", "type_codes", "iso_offsets",
+                     "sources", "targets", "link_rules", "clusters"):
+            setattr(index, f"_{name}", np.load(directory / f"{name}.npy", mmap_mode="r"))
+        return index
+
+    def select_rules(
+        self,
+        pairs: Optional[Sequence[Tuple[str, str]]] = None,
+        window: Optional[int] = None,
+    ) -> List[Tuple[str, str, int]]:
+        """
+        Rules restricted to some type pairs, with their own window or a common one.
+
+        A pair missing from the rules is added, with the window given.
+        """
+        windows = {(trigger, follow_up): days for trigger, follow_up, days in self.rules}
+        if pairs is None:
+            pairs = list(windows)
+        selected = []
+        for trigger, follow_up in pairs:
+            days = window if window is not None else windows.get((trigger, follow_up))
+            if days is None:
+                raise ValueError(
+                    f"No window for {pair_name(trigger, follow_up)}, give one or pick one of "
+                    f"{[pair_name(a, b) for a, b in windows]}"
+                )
+            selected.append((trigger, follow_up, int(days)))
+        return selected
+
+    def links(
+        self, rules: Optional[Sequence[Tuple[str, str, int]]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Trigger positions, follow-up positions and rule of every link, swept again for other rules."""
+        if rules is None or list(rules) == self.rules:
+            return np.asarray(self._sources), np.asarray(self._targets), np.asarray(self._link_rules)
+        return sweep(self._iso_codes, self._days, self._type_codes, self._coded_rules(rules))
+
+    def members(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+        iso: Optional[str] = None,
+        rules: Optional[Sequence[Tuple[str, str, int]]] = None,
+    ) -> pd.DataFrame:
+        """
+        Events of the cascades matching the filters.
+
+        Args:
+            start_year: First year in which a cascade may start
+            end_year: Last year in which a cascade may start
+            region: Keep only this region ('All' or None keeps every region)
+            iso: Keep only this country
+            rules: Rules linking the events (see select_rules), the index rules when None
+
+        Returns:
+            One row per event: its cascade (position of its first event), data row,
+            start day and disaster type, by country then start
+        """
+        sources, targets, _ = self.links(rules)
+        if rules is None or list(rules) == self.rules:
+            clusters = np.asarray(self._clusters)
+        else:
+            clusters = connected_clusters(len(self._rows), sources, targets)
+
+        linked = np.zeros(len(self._rows), dtype=bool)
+        linked[sources] = linked[targets] = True
+        positions = np.flatnonzero(linked)
+        firsts = clusters[positions]
+
+        keep = np.ones(len(positions), dtype=bool)
+        first_days = self._days[firsts].astype("datetime64[D]")
+        if start_year is not None:
+            keep &= first_days >= np.datetime64(f"{int(start_year):04d}-01-01")
+        if end_year is not None:
+            keep &= first_days <= np.datetime64(f"{int(end_year):04d}-12-31")
+        iso_codes = self._iso_codes[positions]
+        if region and region != "All":
+            keep &= (self.iso_regions == region)[iso_codes]
+        if iso:
+            keep &= iso_codes == (self.isos.index(iso) if iso in self.isos else -1)
+
+        positions, firsts = positions[keep], firsts[keep]
+        return pd.DataFrame({
+            "Cascade": firsts,
+            "Row": self._rows[positions],
+            "Day": self._days[positions],
+            "Disaster Type": np.asarray(self.types, dtype=object)[self._type_codes[positions]],
+        })
+
+    def pair_counts(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+    ) -> pd.Series:
+        """Number of links of every rule whose trigger started in the years and region, by pair name."""
+        sources, link_rules = np.asarray(self._sources), np.asarray(self._link_rules)
+        keep = np.ones(len(sources), dtype=bool)
+        starts = self._days[sources].astype("datetime64[D]")
+        if start_year is not None:
+            keep &= starts >= np.datetime64(f"{int(start_year):04d}-01-01")
+        if end_year is not None:
+            keep &= starts <= np.datetime64(f"{int(end_year):04d}-12-31")
+        if region and region != "All":
+            keep &= (self.iso_regions == region)[self._iso_codes[sources]]
+        counts = np.bincount(link_rules[keep], minlength=len(self.rules))
+        return pd.Series(counts, index=[pair_name(a, b) for a, b, _ in self.rules])
@@ -36,6 +36,14 @@ class EMDATCleaner:
         'Total Affected'
     ]
     
+    REQUIRED_COLUMNS = [
+        'DisNo.',
+        'Disaster Type',
+        'ISO',
+        'Country',
+        'Start Year'
+    ]
+
     BINARY_COLUMNS = [
         'Historic',
         'OFDA/BHA Response',
@@ -50,15 +58,7 @@ class EMDATCleaner:
 
     def validate_required_columns(self) -> None:
         """Validate presence of essential columns."""
-        required_columns = [
-            'DisNo.',
-            'Disaster Type',
-            'ISO',
-            'Country',
-            'Start Year'
-        ]
-        
-        missing_columns = [col for col in required_columns if col not in self.df.columns]
+        missing_columns = [col for col in self.REQUIRED_COLUMNS if col not in self.df.columns]
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
 
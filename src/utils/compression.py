@@ -0,0 +1,152 @@
+import collections
+import gzip
+import mimetypes
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+import flask
+from dash import Dash
+
+from .assets import brotli, load_asset_manifest
+from .metrics import metrics
+
+# Smaller payloads are not worth the CPU (and can grow once compressed)
+MIN_COMPRESS_SIZE = 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Dash routes whose responses are compressed on the fly
+COMPRESSED_ROUTES = ("_dash-update-component", "_dash-layout", "_dash-dependencies")
+# Fingerprinted component bundles never change, their compressed body is kept
+CACHED_ROUTES = ("_dash-component-suites/",)
+# Compressed bodies kept, a bundle or a stylesheet weighs a few KB to a few hundred KB
+COMPRESSED_CACHE_SIZE = 256
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best content encoding supported by both the client and the server."""
+    accepted = {token.split(";")[0].strip() for token in accept_encoding.lower().split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, static: bool = False) -> bytes:
+    """Compress a body, harder for static content that is compressed only once."""
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if static else 5)
+    return gzip.compress(body, compresslevel=9 if static else 6)
+
+
+def init_compression(app: Dash, assets_dir: Path, min_size: int = MIN_COMPRESS_SIZE) -> None:
+    """
+    Compress responses and serve assets with long-lived caching.
+
+    - Callback, layout and dependency responses above min_size are compressed
+      with brotli (when installed) or gzip
+    - Component bundles are compressed once per fingerprinted URL
+    - Assets requested with their current content hash (?v=...) get
+      immutable cache headers and are compressed once like the bundles
+    - Assets with a precompressed copy are served from it
+
+    Args:
+        app: Dash application instance
+        assets_dir: Dash assets folder, where build_assets wrote precompressed copies
+        min_size: Smallest body size compressed, in bytes
+    """
+    server = app.server
+    prefix = app.config.routes_pathname_prefix
+    assets_prefix = prefix + app.config.assets_url_path.strip("/") + "/"
+    compressed_routes = tuple(prefix + route for route in COMPRESSED_ROUTES)
+    cached_routes = tuple(prefix + route for route in CACHED_ROUTES)
+    # Content hash of every asset the layout links to, by file name
+    fingerprints = dict(url.split("?v=", 1) for url in load_asset_manifest(assets_dir).values())
+    # Least recently used compressed bodies, keyed on the path and version only:
+    # any other query parameter would let clients fill the cache with copies
+    compressed_cache: "collections.OrderedDict[Tuple[str, str, str], bytes]" = collections.OrderedDict()
+    cache_lock = threading.Lock()
+
+    def cached_compress(key: Tuple[str, str, str], body: bytes) -> bytes:
+        with cache_lock:
+            compressed_body = compressed_cache.get(key)
+            if compressed_body is not None:
+                compressed_cache.move_to_end(key)
+        metrics.record_cache("compressed_responses", compressed_body is not None)
+        if compressed_body is None:
+            compressed_body = compress(body, key[2], static=True)
+            with cache_lock:
+                compressed_cache[key] = compressed_body
+                while len(compressed_cache) > COMPRESSED_CACHE_SIZE:
+                    compressed_cache.popitem(last=False)
+        return compressed_body
+
+    @server.before_request
+    def serve_precompressed_asset() -> Optional[flask.Response]:
+        request = flask.request
+        if not request.path.startswith(assets_prefix):
+            return None
+
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return None
+
+        asset = (assets_dir / request.path[len(assets_prefix):]).resolve()
+        extension = ".br" if encoding == "br" else ".gz"
+        compressed = asset.with_name(asset.name + extension)
+        if assets_dir.resolve() not in asset.parents or not compressed.is_file():
+            return None
+        if asset.is_file() and compressed.stat().st_mtime < asset.stat().st_mtime:
+            return None  # Stale copy, the asset changed since build_assets ran
+
+        response = flask.send_file(
+            compressed,
+            mimetype=mimetypes.guess_type(asset.name)[0] or "application/octet-stream",
+            conditional=True,
+        )
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    @server.after_request
+    def compress_response(response: flask.Response) -> flask.Response:
+        request = flask.request
+
+        # Only the current hash is immutable, an old or made-up one may get other content later
+        version = request.args.get("v", "")
+        hashed_asset = (
+            request.path.startswith(assets_prefix)
+            and bool(version)
+            and fingerprints.get(request.path[len(assets_prefix):]) == version
+        )
+        if hashed_asset:
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+
+        # Hashed assets without a precompressed copy are compressed once, like bundles
+        cached = hashed_asset or request.path.startswith(cached_routes)
+        if (
+            not (cached or request.path in compressed_routes)
+            or response.status_code != 200
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        response.direct_passthrough = False
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+
+        if cached:
+            compressed_body = cached_compress((request.path, version if hashed_asset else "", encoding), body)
+        else:
+            compressed_body = compress(body, encoding)
+
+        response.set_data(compressed_body)
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
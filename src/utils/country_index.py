@@ -0,0 +1,240 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import logger
+from .cube import CUBE_MEASURES, group_disaster_types
+
+
+class CountryIndex:
+    """
+    Disasters partitioned by ISO code.
+
+    The events are sorted by (ISO, Start Year) once so that each country's
+    events are contiguous and ordered by year. A country view is then a
+    slice of that frame, located by binary search on the years, and costs
+    proportional to the number of events of the country.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        # Positions of the events in data, in (ISO, Start Year) order
+        self._order = (
+            data.reset_index(drop=True)
+            .sort_values(["ISO", "Start Year"], kind="stable")
+            .index.to_numpy()
+        )
+        self.data = data.iloc[self._order].reset_index(drop=True)
+        self._build()
+
+    def _build(self) -> None:
+        """Compute the partition and the per-country aggregates of the sorted events."""
+
+        self._years = pd.to_numeric(self.data["Start Year"], errors="coerce").to_numpy()
+        self._type_codes, types = pd.factorize(self.data["Disaster Type"], sort=True)
+        self.types: List[str] = [str(t) for t in types]
+        self.type_groups, self._type_group_codes = group_disaster_types(self.types)
+
+        # Rows without ISO are sorted last, so the partition offsets line up
+        iso = self.data["ISO"]
+        isos, starts, lengths = np.unique(
+            iso[iso.notna()].to_numpy(dtype=str), return_index=True, return_counts=True
+        )
+        self._slices: Dict[str, Tuple[int, int]] = {
+            str(code): (int(start), int(start + length))
+            for code, start, length in zip(isos, starts, lengths)
+        }
+
+        # Full-range type counts, the default view of every country
+        self._positions = {code: position for position, code in enumerate(self._slices)}
+        self._type_counts = np.zeros((len(self._slices), len(self.types)), dtype=np.int64)
+        for code, (start, stop) in self._slices.items():
+            codes = self._type_codes[start:stop]
+            self._type_counts[self._positions[code]] = np.bincount(
+                codes[codes >= 0], minlength=len(self.types)
+            )
+
+        # Running sums of each measure, a country total over a year range is the
+        # difference of two entries
+        self._values: Dict[str, np.ndarray] = {"count": np.ones(len(self.data))}
+        for measure in CUBE_MEASURES:
+            if measure in self.data.columns:
+                self._values[measure] = (
+                    pd.to_numeric(self.data[measure], errors="coerce").fillna(0).to_numpy(dtype=float)
+                )
+        self._cumulative = {
+            metric: np.concatenate([[0.0], np.cumsum(values)])
+            for metric, values in self._values.items()
+        }
+
+        logger.info(f"Built country index for {len(self._slices)} countries")
+
+    def save(self, directory: Path) -> None:
+        """Write the sort order and the per-country aggregates to directory."""
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "order.npy", self._order)
+        np.save(directory / "type_counts.npy", self._type_counts)
+        for position, cumulative in enumerate(self._cumulative.values()):
+            np.save(directory / f"cumulative_{position}.npy", cumulative)
+        (directory / "countries.json").write_text(json.dumps({
+            "slices": self._slices,
+            "metrics": list(self._cumulative),
+        }))
+
+    @classmethod
+    def load(cls, directory: Path, data: pd.DataFrame) -> "CountryIndex":
+        """
+        Load an index written by save for the same data.
+
+        The sort order and aggregates are memory-mapped instead of computed,
+        only the sorted frame itself (a copy of data) and the per-event
+        measures are rebuilt.
+        """
+        meta = json.loads((directory / "countries.json").read_text())
+        index = cls.__new__(cls)
+        index._order = np.load(directory / "order.npy", mmap_mode="r")
+        index.data = data.iloc[index._order].reset_index(drop=True)
+        index._years = pd.to_numeric(index.data["Start Year"], errors="coerce").to_numpy()
+        index._type_codes, types = pd.factorize(index.data["Disaster Type"], sort=True)
+        index.types = [str(t) for t in types]
+        index.type_groups, index._type_group_codes = group_disaster_types(index.types)
+        index._slices = {iso: (start, stop) for iso, (start, stop) in meta["slices"].items()}
+        index._positions = {code: position for position, code in enumerate(index._slices)}
+        index._type_counts = np.load(directory / "type_counts.npy", mmap_mode="r")
+        index._cumulative = {
+            metric: np.load(directory / f"cumulative_{position}.npy", mmap_mode="r")
+            for position, metric in enumerate(meta["metrics"])
+        }
+        # Only needed to filter by disaster type, derived back from the running sums
+        index._values = {metric: np.diff(cumulative) for metric, cumulative in index._cumulative.items()}
+        return index
+
+    def __contains__(self, iso: object) -> bool:
+        return iso in self._slices
+
+    @property
+    def isos(self) -> List[str]:
+        """ISO codes of every country with at least one event, sorted."""
+        return list(self._slices)
+
+    def country_name(self, iso: str) -> Optional[str]:
+        """Return the country name of an ISO code, None if it has no events."""
+        if iso not in self._slices:
+            return None
+        return str(self.data["Country"].iat[self._slices[iso][0]])
+
+    def region(self, iso: str) -> Optional[str]:
+        """Return the region of an ISO code, None if it has no events."""
+        if iso not in self._slices:
+            return None
+        return str(self.data["Region"].iat[self._slices[iso][0]])
+
+    def bounds(
+        self, iso: str, start_year: Optional[int] = None, end_year: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Locate the rows of a country within a year range.
+
+        Returns:
+            (start, stop) positions in the sorted frame, empty if the country is unknown
+        """
+        if iso not in self._slices:
+            return 0, 0
+        start, stop = self._slices[iso]
+        years = self._years[start:stop]
+        if start_year is not None:
+            start += int(np.searchsorted(years, start_year, side="left"))
+        if end_year is not None:
+            stop = self._slices[iso][0] + int(np.searchsorted(years, end_year, side="right"))
+        return start, max(start, stop)
+
+    def events(
+        self, iso: str, start_year: Optional[int] = None, end_year: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Return the events of a country within a year range, sorted by year."""
+        start, stop = self.bounds(iso, start_year, end_year)
+        return self.data.iloc[start:stop]
+
+    def type_counts(
+        self,
+        iso: str,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        grouped: bool = False,
+    ) -> pd.Series:
+        """
+        Count the events of a country by disaster type within a year range.
+
+        Args:
+            grouped: Fold similar disaster types together (see DISASTER_TYPE_GROUPS)
+
+        Returns:
+            Counts indexed by disaster type, sorted in descending order, without zeros
+        """
+        if iso not in self._slices:
+            return pd.Series(dtype=np.int64)
+
+        start, stop = self.bounds(iso, start_year, end_year)
+        if (start, stop) == self._slices[iso]:
+            counts = self._type_counts[self._positions[iso]]
+        else:
+            codes = self._type_codes[start:stop]
+            counts = np.bincount(codes[codes >= 0], minlength=len(self.types))
+
+        labels = self.types
+        if grouped:
+            counts = np.bincount(
+                self._type_group_codes, weights=counts, minlength=len(self.type_groups)
+            ).astype(np.int64)
+            labels = self.type_groups
+
+        series = pd.Series(counts, index=labels)
+        return series[series > 0].sort_values(ascending=False, kind="stable")
+
+    def totals(
+        self,
+        metric: str = "count",
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        disaster_type: Optional[str] = None,
+    ) -> pd.Series:
+        """
+        Total of a metric for every country within a year range.
+
+        Args:
+            metric: 'count' or one of CUBE_MEASURES
+            disaster_type: Keep only this disaster type ('All' or None keeps every type)
+
+        Returns:
+            Totals indexed by ISO code, sorted in descending order, without zeros
+        """
+        cumulative = self._cumulative_for(metric, disaster_type)
+        bounds = np.array(
+            [self.bounds(iso, start_year, end_year) for iso in self._slices], dtype=np.int64
+        ).reshape(-1, 2)
+        series = pd.Series(
+            cumulative[bounds[:, 1]] - cumulative[bounds[:, 0]], index=self.isos
+        )
+        return series[series > 0].sort_values(ascending=False, kind="stable")
+
+    def measures(
+        self, iso: str, start_year: Optional[int] = None, end_year: Optional[int] = None
+    ) -> Dict[str, float]:
+        """Totals of the count and of every available measure for a country within a year range."""
+        start, stop = self.bounds(iso, start_year, end_year)
+        return {
+            metric: float(cumulative[stop] - cumulative[start])
+            for metric, cumulative in self._cumulative.items()
+        }
+
+    def _cumulative_for(self, metric: str, disaster_type: Optional[str]) -> np.ndarray:
+        """Running sums of a metric, restricted to a disaster type when one is given."""
+        if not disaster_type or disaster_type == "All":
+            return self._cumulative.get(metric, np.zeros(len(self.data) + 1))
+
+        values = self._values.get(metric, np.zeros(len(self.data)))
+        # Missing types are coded -1, -2 matches no event
+        code = self.types.index(disaster_type) if disaster_type in self.types else -2
+        return np.concatenate([[0.0], np.cumsum(np.where(self._type_codes == code, values, 0.0))])
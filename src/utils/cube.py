@@ -0,0 +1,320 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import logger
+
+# Month axis: slot 0 holds events whose start month is unknown, 1-12 the calendar months
+UNKNOWN_MONTH = 0
+MONTH_LABELS = [
+    "Unknown", "Jan", "Feb", "Mar", "Apr", "May", "Jun",
+    "Jul", "Aug", "Sep", "Oct", "Nov", "Dec",
+]
+
+# Impact metrics aggregated alongside the event count
+CUBE_MEASURES = [
+    "Total Deaths",
+    "Total Affected",
+    "Total Damage",
+    "Insured Damage",
+    "Reconstruction Costs",
+]
+
+# Raw disaster types folded together when similar disasters are grouped
+DISASTER_TYPE_GROUPS = {
+    "Mass Movement": ["Mass movement (dry)", "Mass movement (wet)"],
+    "Collapse": ["Collapse (Industrial)", "Collapse (Miscellaneous)"],
+    "Explosion": ["Explosion (Industrial)", "Explosion (Miscellaneous)"],
+    "Fire": ["Fire (Industrial)", "Fire (Miscellaneous)"],
+}
+
+
+def group_disaster_types(types: List[str]) -> Tuple[List[str], np.ndarray]:
+    """
+    Map raw disaster types to their grouped type.
+
+    Args:
+        types: Raw disaster type labels, in code order
+
+    Returns:
+        The sorted grouped labels, and the grouped code of every raw type
+    """
+    group_of = {raw: group for group, raws in DISASTER_TYPE_GROUPS.items() for raw in raws}
+    grouped = [group_of.get(disaster_type, disaster_type) for disaster_type in types]
+    labels = sorted(set(grouped))
+    codes = np.array([labels.index(group) for group in grouped], dtype=np.int64)
+    return labels, codes
+
+
+class DisasterCube:
+    """
+    Dense year x month x disaster type x area aggregate of the cleaned data.
+
+    The geographic axis is kept at (Region, Subregion) grain so that charts
+    grouped by either column are answered from the same arrays. Every query
+    slices and sums the precomputed arrays instead of scanning the events.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        years = pd.to_numeric(data["Start Year"], errors="coerce")
+        months = (
+            pd.to_numeric(data["Start Month"], errors="coerce")
+            if "Start Month" in data.columns
+            else pd.Series(np.nan, index=data.index)
+        )
+        # Out of range months are as good as unknown ones
+        months = months.where(months.between(1, 12)).fillna(UNKNOWN_MONTH).astype(int)
+
+        type_codes, types = pd.factorize(data["Disaster Type"], sort=True)
+        subregions = data["Subregion"] if "Subregion" in data.columns else data["Region"]
+        area_codes, areas = pd.factorize(
+            pd.MultiIndex.from_arrays([data["Region"], subregions]), sort=True
+        )
+
+        valid = (type_codes >= 0) & (area_codes >= 0) & years.notna().to_numpy()
+        if not valid.all():
+            logger.info(f"Cube ignores {int((~valid).sum())} events without year, type or region")
+
+        self.min_year = int(years[valid].min()) if valid.any() else 0
+        self.max_year = int(years[valid].max()) if valid.any() else -1
+        self.years = np.arange(self.min_year, self.max_year + 1)
+        self.types: List[str] = [str(t) for t in types]
+        self.type_groups, self.type_group_codes = group_disaster_types(self.types)
+        self.area_regions = np.array([str(region) for region, _ in areas], dtype=object)
+        self.area_subregions = np.array([str(sub) for _, sub in areas], dtype=object)
+        self.shape = (len(self.years), len(MONTH_LABELS), len(self.types), len(areas))
+
+        flat = (
+            (
+                (years[valid].to_numpy(dtype=np.int64) - self.min_year) * self.shape[1]
+                + months[valid].to_numpy()
+            ) * self.shape[2]
+            + type_codes[valid]
+        ) * self.shape[3] + area_codes[valid]
+        size = int(np.prod(self.shape))
+
+        self._measures: Dict[str, np.ndarray] = {
+            "count": np.bincount(flat, minlength=size).reshape(self.shape)
+        }
+        for measure in CUBE_MEASURES:
+            if measure not in data.columns:
+                continue
+            weights = pd.to_numeric(data[measure], errors="coerce")[valid].fillna(0)
+            self._measures[measure] = np.bincount(
+                flat, weights=weights.to_numpy(dtype=float), minlength=size
+            ).reshape(self.shape)
+
+        logger.info(f"Built disaster cube of shape {self.shape} for {int(valid.sum())} events")
+
+    def save(self, directory: Path) -> None:
+        """Write the cube arrays (.npy) and its axes (cube.json) to directory."""
+        directory.mkdir(parents=True, exist_ok=True)
+        for position, (metric, values) in enumerate(self._measures.items()):
+            np.save(directory / f"measure_{position}.npy", values)
+        (directory / "cube.json").write_text(json.dumps({
+            "min_year": self.min_year,
+            "max_year": self.max_year,
+            "types": self.types,
+            "area_regions": self.area_regions.tolist(),
+            "area_subregions": self.area_subregions.tolist(),
+            "measures": list(self._measures),
+        }))
+
+    @classmethod
+    def load(cls, directory: Path) -> "DisasterCube":
+        """Load a cube written by save, its arrays are memory-mapped read-only."""
+        meta = json.loads((directory / "cube.json").read_text())
+        cube = cls.__new__(cls)
+        cube.min_year, cube.max_year = meta["min_year"], meta["max_year"]
+        cube.years = np.arange(cube.min_year, cube.max_year + 1)
+        cube.types = meta["types"]
+        cube.type_groups, cube.type_group_codes = group_disaster_types(cube.types)
+        cube.area_regions = np.array(meta["area_regions"], dtype=object)
+        cube.area_subregions = np.array(meta["area_subregions"], dtype=object)
+        cube.shape = (len(cube.years), len(MONTH_LABELS), len(cube.types), len(cube.area_regions))
+        cube._measures = {
+            metric: np.load(directory / f"measure_{position}.npy", mmap_mode="r")
+            for position, metric in enumerate(meta["measures"])
+        }
+        return cube
+
+    def measure(self, metric: str) -> np.ndarray:
+        """Return the full array of a metric, zeros if the column was not in the data."""
+        if metric not in self._measures:
+            return np.zeros(self.shape)
+        return self._measures[metric]
+
+    def select(
+        self,
+        metric: str = "count",
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        disaster_type: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Return the (year, month, type, area) block matching the filters.
+
+        Args:
+            metric: 'count' or one of CUBE_MEASURES
+            start_year: First year included, defaults to the first year of the data
+            end_year: Last year included, defaults to the last year of the data
+            disaster_type: Keep only this disaster type ('All' or None keeps every type)
+            region: Keep only this region ('All' or None keeps every region)
+        """
+        values = self.measure(metric)[self._year_slice(start_year, end_year)]
+        if disaster_type and disaster_type != "All":
+            if disaster_type in self.types:
+                code = self.types.index(disaster_type)
+                values = values[:, :, code:code + 1]
+            else:
+                values = values[:, :, :0]
+        if region and region != "All":
+            values = values[..., self.area_regions == region]
+        return values
+
+    def yearly(
+        self,
+        metric: str = "count",
+        group_by: str = "Region",
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Yearly totals, one column per category of group_by."""
+        values, labels = self._group(self.select(metric, start_year, end_year), group_by)
+        return pd.DataFrame(
+            values.sum(axis=1),
+            index=self.years[self._year_slice(start_year, end_year)],
+            columns=labels,
+        )
+
+    def monthly(
+        self,
+        metric: str = "count",
+        group_by: str = "Region",
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+    ) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Monthly totals, one column per category of group_by.
+
+        Returns:
+            A frame indexed by the first day of each month, and the totals of
+            events with an unknown start month that the frame cannot place
+        """
+        values, labels = self._group(self.select(metric, start_year, end_year), group_by)
+        years = self.years[self._year_slice(start_year, end_year)]
+        index = pd.to_datetime(
+            {
+                "year": np.repeat(years, 12),
+                "month": np.tile(np.arange(1, 13), len(years)),
+                "day": 1,
+            }
+        )
+        monthly = pd.DataFrame(
+            values[:, 1:].reshape(-1, len(labels)), index=index, columns=labels
+        )
+        unknown = pd.Series(values[:, UNKNOWN_MONTH].sum(axis=0), index=labels)
+        return monthly, unknown
+
+    def type_totals(
+        self,
+        metric: str = "count",
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+        grouped: bool = False,
+    ) -> pd.Series:
+        """
+        Totals by disaster type over the year range.
+
+        Args:
+            grouped: Fold similar disaster types together (see DISASTER_TYPE_GROUPS)
+
+        Returns:
+            Totals sorted in descending order, without zeros
+        """
+        totals = self.select(metric, start_year, end_year, region=region).sum(axis=(0, 1, 3))
+        labels = self.types
+        if grouped:
+            totals = np.bincount(
+                self.type_group_codes, weights=totals, minlength=len(self.type_groups)
+            ).astype(totals.dtype)
+            labels = self.type_groups
+
+        series = pd.Series(totals, index=labels)
+        return series[series > 0].sort_values(ascending=False, kind="stable")
+
+    def totals(
+        self,
+        metric: str = "count",
+        group_by: str = "Year",
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        disaster_type: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> pd.Series:
+        """
+        Totals over the filters, by one category.
+
+        Args:
+            metric: 'count' or one of CUBE_MEASURES
+            group_by: 'Year', 'Disaster Type', 'Region' or 'Subregion'
+            start_year: First year included
+            end_year: Last year included
+            disaster_type: Keep only this disaster type ('All' or None keeps every type)
+            region: Keep only this region ('All' or None keeps every region)
+
+        Returns:
+            Totals by year (every year of the range), or by category sorted in
+            descending order without zeros
+        """
+        values = self.select(metric, start_year, end_year)
+        # Filters are applied as masks so that the type and area axes keep their labels
+        if disaster_type and disaster_type != "All":
+            values = values * (np.array(self.types) == disaster_type)[None, None, :, None]
+        if region and region != "All":
+            values = values * (self.area_regions == region)[None, None, None, :]
+
+        if group_by == "Year":
+            return pd.Series(
+                values.sum(axis=(1, 2, 3)),
+                index=self.years[self._year_slice(start_year, end_year)],
+            )
+
+        grouped, labels = self._group(values, group_by)
+        series = pd.Series(grouped.sum(axis=(0, 1)), index=labels)
+        return series[series > 0].sort_values(ascending=False, kind="stable")
+
+    def seasonality(
+        self,
+        metric: str = "count",
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Disaster type x month totals (unknown month first) over the year range."""
+        values = self.select(metric, start_year, end_year, region=region)
+        return pd.DataFrame(
+            values.sum(axis=(0, 3)).T, index=self.types, columns=MONTH_LABELS
+        )
+
+    def _year_slice(self, start_year: Optional[int], end_year: Optional[int]) -> slice:
+        """Translate an inclusive year range into a slice of the year axis."""
+        start = 0 if start_year is None else int(start_year) - self.min_year
+        end = len(self.years) if end_year is None else int(end_year) - self.min_year + 1
+        return slice(max(start, 0), max(end, 0))
+
+    def _group(self, values: np.ndarray, group_by: str) -> Tuple[np.ndarray, List[str]]:
+        """Collapse the type and area axes of a block into the categories of group_by."""
+        if group_by == "Disaster Type":
+            return values.sum(axis=3), self.types
+
+        by_area = values.sum(axis=2)
+        keys = self.area_subregions if group_by == "Subregion" else self.area_regions
+        labels = sorted(set(keys))
+        membership = (keys[:, None] == np.array(labels, dtype=object)[None, :]).astype(float)
+        return by_area @ membership, labels
@@ -0,0 +1,335 @@
+import base64
+import hashlib
+import os
+import re
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import logger
+
+# Endpoints of the EM-DAT site, relative to its base URL. They are not
+# documented: only benchmarks/download_stub.py is known to serve them
+LOGIN_PATH = "/login"
+EXPORT_PATH = "/data/download"
+
+# Content types of a spreadsheet export; anything else (an HTML login page
+# answered 200, a JSON error) is refused instead of being saved as the export
+SPREADSHEET_CONTENT_TYPES = (
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.ms-excel",
+    "application/zip",
+    "application/octet-stream",
+    "text/csv",
+)
+
+# Chunks streamed to disk, large enough to keep the syscalls out of the way
+CHUNK_SIZE = 1 << 20
+
+# Resumes of an interrupted transfer before giving up
+MAX_RESUMES = 5
+
+# Connect and read timeouts (s), a stalled transfer is resumed rather than waited for
+TIMEOUT = (10, 60)
+
+# Suffix of the file being downloaded, renamed once complete and verified
+PARTIAL_SUFFIX = ".part"
+
+# Transient connection errors, resumed from the bytes already on disk
+RESUMABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class DownloadError(Exception):
+    """Raised when an export cannot be downloaded or fails verification."""
+
+
+def sha256_file(path: Path, chunk_size: int = CHUNK_SIZE) -> str:
+    """Return the sha256 hex digest of a file, read by chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_digest(headers: Any) -> Optional[str]:
+    """
+    Read the sha256 of a representation from its response headers.
+
+    Both "Repr-Digest: sha-256=:<base64>:" (RFC 9530) and the older
+    "Digest: sha-256=<base64>" (RFC 3230) are understood.
+
+    Returns:
+        The hex digest, None if the server sent none
+    """
+    for header in ("Repr-Digest", "Digest"):
+        match = re.search(r"sha-256=:?([A-Za-z0-9+/=]+):?", headers.get(header, ""), re.IGNORECASE)
+        if match:
+            return base64.b64decode(match.group(1)).hex()
+    return None
+
+
+def parse_total_size(response: requests.Response, offset: int) -> Optional[int]:
+    """Full size of the file, from Content-Range (206, 416) or Content-Length (200)."""
+    content_range = response.headers.get("Content-Range", "")
+    match = re.match(r"bytes (?:\d+-\d+|\*)/(\d+)", content_range)
+    if match:
+        return int(match.group(1))
+    length = response.headers.get("Content-Length")
+    return offset + int(length) if length is not None else None
+
+
+def check_unverified(partial: Path, destination: Path) -> None:
+    """
+    Check a download that has no size or checksum to compare with.
+
+    An .xlsx file is a zip archive, whose directory is written last: a
+    truncated transfer is not a valid archive.
+
+    Raises:
+        DownloadError: An .xlsx file that is not a whole zip archive
+    """
+    logger.warning(
+        f"{destination.name}: the server sent no Content-Length or digest and none was given, "
+        "its completeness cannot be verified"
+    )
+    if destination.suffix.lower() == ".xlsx" and not zipfile.is_zipfile(partial):
+        partial.unlink()
+        raise DownloadError(f"{destination.name} is not a complete .xlsx file")
+
+
+class EmdatClient:
+    """
+    HTTP client of the EM-DAT site, without a browser.
+
+    A single pooled session holds the login cookies and keeps its
+    connections alive between the login and the export requests.
+    """
+
+    def __init__(self, url: str, pool_size: int = 4, retries: int = 3):
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+        # Retries cover refused connections and 5xx answers before any byte is read,
+        # transfers cut in the middle are resumed by download
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=("GET", "POST"),
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def login(self, username: str, password: str) -> None:
+        """
+        Log in with the site form, the session keeps the cookies it sets.
+
+        Raises:
+            DownloadError: The credentials are refused or no session cookie is set
+        """
+        response = self.session.post(
+            f"{self.url}{LOGIN_PATH}",
+            data={"username": username, "password": password},
+            timeout=TIMEOUT,
+        )
+        if response.status_code in (401, 403) or not self.session.cookies:
+            raise DownloadError(f"Login refused by {self.url} (HTTP {response.status_code})")
+        response.raise_for_status()
+        logger.info(f"Logged in to {self.url}")
+
+    def download(
+        self,
+        destination: Path,
+        path: str = EXPORT_PATH,
+        expected_size: Optional[int] = None,
+        expected_sha256: Optional[str] = None,
+        chunk_size: int = CHUNK_SIZE,
+        max_resumes: int = MAX_RESUMES,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        content_types: Sequence[str] = SPREADSHEET_CONTENT_TYPES,
+    ) -> Dict[str, Any]:
+        """
+        Stream a file to disk, resuming with Range requests after an interruption.
+
+        The bytes go to destination + PARTIAL_SUFFIX, which is only renamed
+        once its size and checksum match. A partial file left by an earlier
+        run is resumed as well. When neither the server nor the caller gives
+        a size or a checksum, a warning is logged and an .xlsx file is only
+        checked to be a whole zip archive (see check_unverified).
+
+        Given the ETag or Last-Modified of a previous download, the request is
+        conditional: an unchanged file is answered 304 and not downloaded again.
+
+        Args:
+            destination: Final path of the file
+            path: Path of the file on the site
+            expected_size: Size in bytes, checked on top of the size announced by the server
+            expected_sha256: Hex digest, checked on top of the digest announced by the server
+            chunk_size: Bytes written at a time
+            max_resumes: Interruptions tolerated
+            etag: ETag of the previous download
+            last_modified: Last-Modified of the previous download
+            content_types: Content types accepted, a response without one is accepted
+
+        Returns:
+            Dictionary with the size, sha256, ETag, Last-Modified, number of
+            resumes, duration and whether a size or checksum was checked
+            ("verified"); only {"not_modified": True} when the server answered 304
+
+        Raises:
+            DownloadError: Too many interruptions, an unexpected content type,
+                or the file fails verification
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        partial = destination.with_name(destination.name + PARTIAL_SUFFIX)
+        started = time.perf_counter()
+        total_size, announced_sha256, validator = None, None, None
+        response_etag, response_last_modified = None, None
+        resumes = 0
+
+        while True:
+            offset = partial.stat().st_size if partial.exists() else 0
+            headers = {}
+            if not offset and etag:
+                headers["If-None-Match"] = etag
+            if not offset and last_modified:
+                headers["If-Modified-Since"] = last_modified
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                # The range only applies to the same version of the export
+                if validator:
+                    headers["If-Range"] = validator
+
+            try:
+                with self.session.get(
+                    f"{self.url}{path}", headers=headers, stream=True, timeout=TIMEOUT
+                ) as response:
+                    if response.status_code == 304:
+                        logger.info(f"{path} not modified since the previous download")
+                        return {"not_modified": True}
+                    if response.status_code == 416 and offset:
+                        # Nothing left past offset, the partial file is complete if
+                        # it has the announced size (checked below)
+                        total_size = parse_total_size(response, offset) or offset
+                        break
+                    response.raise_for_status()
+                    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                    if content_type and content_type not in content_types:
+                        raise DownloadError(
+                            f"{path} answered {content_type} instead of the export, "
+                            "the endpoint or the login may have changed"
+                        )
+
+                    if response.status_code != 206:
+                        # Full content: no partial file, or the export changed meanwhile
+                        offset = 0
+                    total_size = parse_total_size(response, offset)
+                    announced_sha256 = parse_digest(response.headers) or announced_sha256
+                    response_etag = response.headers.get("ETag")
+                    response_last_modified = response.headers.get("Last-Modified")
+                    validator = response_etag or response_last_modified
+
+                    with open(partial, "ab" if offset else "wb") as f:
+                        for chunk in response.iter_content(chunk_size):
+                            f.write(chunk)
+                break
+
+            except RESUMABLE_ERRORS as e:
+                resumes += 1
+                if resumes > max_resumes:
+                    raise DownloadError(f"Download interrupted {resumes} times: {e}") from e
+                received = partial.stat().st_size if partial.exists() else 0
+                logger.warning(f"Download interrupted at {received} bytes, resuming ({e})")
+
+        # A partial file failing verification is dropped, it would otherwise be resumed forever
+        size = partial.stat().st_size
+        for expected_bytes in (total_size, expected_size):
+            if expected_bytes is not None and size != expected_bytes:
+                partial.unlink()
+                raise DownloadError(f"Downloaded {size} bytes, expected {expected_bytes}")
+
+        sha256 = sha256_file(partial)
+        for expected_digest in (announced_sha256, expected_sha256):
+            if expected_digest is not None and sha256 != expected_digest.lower():
+                partial.unlink()
+                raise DownloadError(f"Checksum mismatch: got {sha256}, expected {expected_digest}")
+
+        verified = any(value is not None for value in (total_size, expected_size, announced_sha256, expected_sha256))
+        if not verified:
+            check_unverified(partial, destination)
+
+        os.replace(partial, destination)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Downloaded {destination.name}: {size / 1e6:.1f} MB in {elapsed:.1f}s"
+            + (f" ({resumes} resumes)" if resumes else "")
+        )
+        return {
+            "size": size,
+            "sha256": sha256,
+            "etag": response_etag,
+            "last_modified": response_last_modified,
+            "resumes": resumes,
+            "seconds": elapsed,
+            "verified": verified,
+        }
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def download_export(
+    url: str,
+    username: str,
+    password: str,
+    download_path: str,
+    filename: str,
+    previous: Optional[Dict[str, Any]] = None,
+    expected_size: Optional[int] = None,
+    expected_sha256: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Download the EM-DAT export over HTTP, the browserless counterpart of
+    scraper.download_from_site.
+
+    Args:
+        url: Base URL of the EMDAT website
+        username: EMDAT login username
+        password: EMDAT login password
+        download_path: Directory to save downloaded file
+        filename: Name to save the file as
+        previous: Record of the previous download (its "etag" and "last_modified"),
+            makes the download conditional
+        expected_size: Size in bytes of the export, when known beforehand
+        expected_sha256: Hex digest of the export, when known beforehand
+
+    Returns:
+        The summary returned by EmdatClient.download
+    """
+    previous = previous or {}
+    client = EmdatClient(url)
+    try:
+        client.login(username, password)
+        return client.download(
+            Path(download_path) / filename,
+            expected_size=expected_size,
+            expected_sha256=expected_sha256,
+            etag=previous.get("etag"),
+            last_modified=previous.get("last_modified"),
+        )
+    finally:
+        client.close()
@@ -0,0 +1,157 @@
+import importlib.util
+import io
+import threading
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .country_index import CountryIndex
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# pyarrow is optional and slow to import, it is only loaded by the Parquet export
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# Rows converted at once, memory use of an export is bounded by one chunk
+EXPORT_CHUNK_ROWS = 2000
+
+# Exports streamed at the same time, further requests are refused until one ends
+MAX_CONCURRENT_EXPORTS = 2
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+export_slots = threading.BoundedSemaphore(MAX_CONCURRENT_EXPORTS)
+
+
+def filtered_chunks(
+    countries: CountryIndex,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    disaster_type: Optional[str] = None,
+    region: Optional[str] = None,
+    iso: Optional[str] = None,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the events matching the filters, chunk_rows rows of the indexed data at a time.
+
+    The events are read from the country index, sorted by (ISO, Start Year):
+    a country filter reads only that country's slice.
+
+    Args:
+        countries: Country index holding the sorted events
+        start_year: First year included
+        end_year: Last year included
+        disaster_type: Keep only this disaster type ('All' or None keeps every type)
+        region: Keep only this region ('All' or None keeps every region)
+        iso: Keep only this country
+        chunk_rows: Rows of the indexed data scanned per chunk
+    """
+    data = countries.data
+    if iso:
+        start, stop = countries.bounds(iso, start_year, end_year)
+    else:
+        start, stop = 0, len(data)
+
+    for chunk_start in range(start, stop, chunk_rows):
+        chunk = data.iloc[chunk_start:min(chunk_start + chunk_rows, stop)]
+        mask = np.ones(len(chunk), dtype=bool)
+        if start_year is not None:
+            mask &= (chunk["Start Year"] >= start_year).to_numpy()
+        if end_year is not None:
+            mask &= (chunk["Start Year"] <= end_year).to_numpy()
+        if disaster_type and disaster_type != "All":
+            mask &= (chunk["Disaster Type"] == disaster_type).to_numpy()
+        if region and region != "All":
+            mask &= (chunk["Region"] == region).to_numpy()
+        if mask.any():
+            yield chunk[mask]
+
+
+def stream_csv(chunks: Iterator[pd.DataFrame], columns: pd.Index) -> Iterator[bytes]:
+    """Encode chunks of events as one CSV document, header first."""
+    yield pd.DataFrame(columns=columns).to_csv(index=False).encode("utf-8")
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=False).encode("utf-8")
+
+
+def parquet_schema(data: pd.DataFrame) -> "pa.Schema":
+    """
+    Arrow schema of the events, decided from the column dtypes.
+
+    Chunks are converted with this schema so that a column missing in one
+    chunk (all values empty) keeps the same type in every row group.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for column, dtype in data.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            arrow_type = pa.bool_()
+        elif pd.api.types.is_integer_dtype(dtype):
+            arrow_type = pa.int64()
+        elif pd.api.types.is_float_dtype(dtype):
+            arrow_type = pa.float64()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(str(column), arrow_type))
+    return pa.schema(fields)
+
+
+class _StreamSink(io.RawIOBase):
+    """
+    Write-only file handing its content over as it is written.
+
+    Unlike a truncated BytesIO it keeps counting the bytes already handed
+    over, the Parquet footer records absolute offsets.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """Return and forget what was written since the last call."""
+        body = b"".join(self._parts)
+        self._parts = []
+        return body
+
+
+def stream_parquet(chunks: Iterator[pd.DataFrame], schema: "pa.Schema") -> Iterator[bytes]:
+    """
+    Encode chunks of events as one Parquet file, one row group per chunk.
+
+    Each row group is handed over as soon as it is written, so only the
+    current chunk is held in memory.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    strings = {field.name: "string" for field in schema if pa.types.is_string(field.type)}
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk.astype(strings), schema=schema, preserve_index=False)
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
@@ -1,15 +1,34 @@
+import glob
+import hashlib
 import json
-from typing import Optional, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, List, Union
 from pathlib import Path
 import pandas as pd
 from pandas import DataFrame
 from . import logger
-from .clean_data import process_and_clean_data
-from .scraper import download_from_site
+from .clean_data import EMDATCleaner, process_and_clean_data
 import os
 
 RAW_DISASTER_DATA_FILE = "public_emdat.xlsx"
 
+# Set DISASTERS_EMDAT_URL to download from another server (e.g. benchmarks/download_stub.py)
+EMDAT_URL = os.environ.get("DISASTERS_EMDAT_URL", "https://public.emdat.be")
+
+# "browser" drives Chrome with selenium, "http" streams the export with requests
+# (its login and export endpoints are not confirmed against the EM-DAT site yet)
+DOWNLOAD_MODE = os.environ.get("DISASTERS_DOWNLOAD_MODE", "browser")
+
+# Raw files to clean instead of data/raw/public_emdat.xlsx: a directory or a glob pattern
+RAW_SOURCE = os.environ.get("DISASTERS_RAW_SOURCE")
+
+# Raw files picked up in a directory (the CSV copy of the export is left out)
+RAW_FILE_SUFFIXES = (".xlsx", ".xls", ".csv")
+RAW_CSV_FILE = "raw_disasters.csv"
+
+# Record of the last export downloaded (checksum, size, ETag, Last-Modified)
+EXPORT_STATE_FILE = "export_state.json"
+
 
 def convert_to_csv(excel_path: Path, output_path: Path) -> bool:
     """
@@ -57,8 +76,152 @@ def read_raw_disaster_data(file_path: Path) -> Optional[DataFrame]:
         return None
 
 
+def find_raw_files(source: Union[str, Path]) -> List[Path]:
+    """
+    List the raw exports designated by a directory or a glob pattern.
+
+    Args:
+        source: Directory (its Excel and CSV files) or glob pattern (** recurses)
+
+    Returns:
+        The files, sorted by path
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        files = [
+            path for path in source_path.iterdir()
+            if path.suffix.lower() in RAW_FILE_SUFFIXES and path.name != RAW_CSV_FILE
+        ]
+    else:
+        files = [Path(path) for path in glob.glob(str(source), recursive=True)]
+    return sorted(path for path in files if path.is_file())
+
+
+def read_raw_file(path: Path, nrows: Optional[int] = None) -> DataFrame:
+    """Read a raw export, Excel or CSV."""
+    if path.suffix.lower() == ".csv":
+        return pd.read_csv(path, nrows=nrows)
+    return pd.read_excel(path, nrows=nrows)
+
+
+def check_raw_schemas(files: List[Path]) -> None:
+    """
+    Check from their headers that raw exports can be cleaned and merged.
+
+    Every file needs the columns the cleaning requires; columns missing
+    from only some of the files are reported and left empty for their rows.
+
+    Raises:
+        ValueError: A file misses required columns
+    """
+    headers = {path: list(read_raw_file(path, nrows=0).columns) for path in files}
+
+    incompatible = {}
+    for path, columns in headers.items():
+        missing = [c for c in EMDATCleaner.REQUIRED_COLUMNS if c not in columns]
+        if missing:
+            incompatible[path.name] = missing
+    if incompatible:
+        raise ValueError(f"Raw files missing required columns: {incompatible}")
+
+    all_columns = set().union(*headers.values())
+    for path, columns in headers.items():
+        missing = sorted(all_columns - set(columns))
+        if missing:
+            logger.warning(f"{path.name} has no {missing}, left empty for its events")
+
+
+def read_and_clean(path: Path) -> Optional[DataFrame]:
+    """Read and clean one raw export, run in a worker process."""
+    raw_df = read_raw_file(path)
+    logger.info(f"Read {len(raw_df)} records from {path.name}")
+    return process_and_clean_data(raw_df)
+
+
+def ingest_raw_files(files: List[Path], max_workers: Optional[int] = None) -> Optional[DataFrame]:
+    """
+    Read and clean several raw exports in parallel, then merge them.
+
+    Files are cleaned independently in a process pool, one file per
+    worker. An event found in several files (same DisNo.) is kept once,
+    from the last file in path order.
+
+    Args:
+        files: Raw exports, e.g. from find_raw_files
+        max_workers: Worker processes, the number of CPUs by default
+
+    Returns:
+        The cleaned events of every file, None if one of them fails to clean
+    """
+    check_raw_schemas(files)
+
+    workers = min(len(files), max_workers or os.cpu_count() or 1)
+    if workers > 1:
+        logger.info(f"Cleaning {len(files)} raw files with {workers} processes")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            cleaned = list(pool.map(read_and_clean, files))
+    else:
+        cleaned = [read_and_clean(path) for path in files]
+
+    failed = [path.name for path, df in zip(files, cleaned) if df is None]
+    if failed:
+        logger.error(f"Cleaning failed for {failed}")
+        return None
+
+    merged = pd.concat(cleaned, ignore_index=True)
+    deduplicated = merged.drop_duplicates(subset="DisNo.", keep="last").reset_index(drop=True)
+    logger.info(
+        f"Merged {len(files)} raw files: {len(deduplicated)} events "
+        f"({len(merged) - len(deduplicated)} duplicates dropped)"
+    )
+    return deduplicated
+
+
+def load_export_state(raw_path: Path) -> Dict[str, Any]:
+    """Return the record of the last export cleaned, empty if there is none."""
+    try:
+        with open(raw_path / EXPORT_STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return dict()
+
+
+def save_export_state(raw_path: Path, state: Dict[str, Any]) -> None:
+    """Write the record of the export just cleaned."""
+    with open(raw_path / EXPORT_STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def export_state(export_path: Path, download: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Describe a downloaded export, to be compared with the next ones.
+
+    Args:
+        export_path: Downloaded file
+        download: Summary of the download (HTTP mode), its checksum is reused
+    """
+    if download.get("sha256"):
+        sha256 = download["sha256"]
+    else:
+        digest = hashlib.sha256()
+        with open(export_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+
+    return {
+        "sha256": sha256,
+        "size": export_path.stat().st_size,
+        "etag": download.get("etag"),
+        "last_modified": download.get("last_modified"),
+    }
+
+
 def process_data(
-    data_path: Path, force_clean: bool = False, force_scrape: bool = False
+    data_path: Path,
+    force_clean: bool = False,
+    force_scrape: bool = False,
+    raw_source: Optional[Union[str, Path]] = RAW_SOURCE,
 ) -> Dict[str, Any]:
     """
     Main function to process the disasters data.
@@ -67,6 +230,8 @@ def process_data(
         data_path: Path to base data directory
         force_clean: Force data reprocessing even if cleaned data exists
         force_scrape: Enable web scraping to get fresh data
+        raw_source: Directory or glob pattern of raw exports to clean and merge,
+            instead of the single export in data/raw
     """
     try:
         # Ensure directories exist
@@ -86,37 +251,88 @@ def process_data(
             return {"success": True, "data": df}
 
         # Download fresh data if scraping is enabled
+        export_path = raw_path / RAW_DISASTER_DATA_FILE
+        new_state: Optional[Dict[str, Any]] = None
         if force_scrape:
-            URL = "https://public.emdat.be"
+            # An export identical to the one already cleaned needs no rebuild
+            previous = load_export_state(raw_path)
+            up_to_date = (
+                (clean_path / "cleaned_disasters.csv").exists()
+                and export_path.exists()
+                and export_path.stat().st_size == previous.get("size")
+            )
+
+            if DOWNLOAD_MODE == "browser":
+                # Imported here so that selenium is only needed to scrape
+                try:
+                    from .scraper import download_from_site
+                except ImportError:
+                    logger.error(
+                        "Scraping needs selenium, install it with: pip install -r requirements-scrape.txt"
+                    )
+                    return {"success": False, "error": "selenium is not installed"}
+            else:
+                from .downloader import download_export
+
             download_dir = str(os.path.abspath(raw_path))
             try:
                 from config import USERNAME, PASSWORD
-                logger.info("Downloading data from EMDAT website")
-                download_from_site(
-                    URL, USERNAME, PASSWORD, download_dir, RAW_DISASTER_DATA_FILE
-                )
             except ImportError:
                 logger.error(
                     "Please provide a emdat USERNAME and PASSWORD in a config.py file at project root"
                 )
                 return {"success": False, "error": "No credentials provided"}
 
-        # Read raw data
-        raw_df = read_raw_disaster_data(raw_path)
-        if raw_df is None:
-            return {"success": False, "error": "Failed to read raw data"}
-
-        # Convert to CSV for readability
-        csv_path = raw_path / "raw_disasters.csv"
-        convert_to_csv(raw_path / RAW_DISASTER_DATA_FILE, csv_path)
+            logger.info(f"Downloading data from EMDAT website ({DOWNLOAD_MODE})")
+            result: Dict[str, Any] = {}
+            if DOWNLOAD_MODE == "browser":
+                download_from_site(EMDAT_URL, USERNAME, PASSWORD, download_dir, RAW_DISASTER_DATA_FILE)
+            else:
+                # Conditional on the previous export, unchanged is answered without a body
+                result = download_export(
+                    EMDAT_URL, USERNAME, PASSWORD, download_dir, RAW_DISASTER_DATA_FILE,
+                    previous=previous if up_to_date else None,
+                )
 
-        # Clean data
-        cleaned_df = process_and_clean_data(raw_df)
+            if not result.get("not_modified"):
+                new_state = export_state(export_path, result)
+            if up_to_date and (
+                new_state is None or new_state["sha256"] == previous.get("sha256")
+            ):
+                logger.info("EMDAT export unchanged since the last refresh, keeping the cleaned data")
+                df = pd.read_csv(clean_path / "cleaned_disasters.csv")
+                return {"success": True, "data": df, "unchanged": True}
+
+        if raw_source is not None:
+            # Several exports (split downloads, archives, supplements) are cleaned in parallel
+            files = find_raw_files(raw_source)
+            if not files:
+                return {"success": False, "error": f"No raw files found for {raw_source}"}
+            cleaned_df = ingest_raw_files(files)
+        else:
+            # Read raw data
+            raw_df = read_raw_disaster_data(raw_path)
+            if raw_df is None:
+                return {"success": False, "error": "Failed to read raw data"}
+
+            # Convert to CSV for readability
+            csv_path = raw_path / RAW_CSV_FILE
+            convert_to_csv(raw_path / RAW_DISASTER_DATA_FILE, csv_path)
+
+            # Clean data
+            cleaned_df = process_and_clean_data(raw_df)
+
+        if cleaned_df is None:
+            return {"success": False, "error": "Failed to clean raw data"}
 
         # Save cleaned data
         final_df_path = clean_path / "cleaned_disasters.csv"
         cleaned_df.to_csv(final_df_path, index=False)
 
+        # Recorded once cleaned, an export that failed to clean is not skipped next time
+        if new_state is not None:
+            save_export_state(raw_path, new_state)
+
         return {"success": True, "data": cleaned_df}
 
     except Exception as e:
@@ -159,7 +375,7 @@ def load_areas_file(file_path: Path) -> Dict[str, float]:
         areas_df = pd.read_csv(file_path)
 
         # Convertir le DataFrame en dictionnaire avec ISO comme clé
-        areas_dict = areas_df.set_index("ISO")["Area"].to_dict()
+        areas_dict = {str(iso): float(area) for iso, area in zip(areas_df["ISO"], areas_df["Area"])}
 
         return areas_dict
 
@@ -0,0 +1,280 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import logger
+from .cascades import CascadeIndex
+from .country_index import CountryIndex
+from .cube import DisasterCube
+from .intervals import EventIntervals, to_date
+from .quantiles import QuantileSketches
+from .search import SearchIndex
+
+# Columns describing an event outside of the dashboard (API, exports)
+EVENT_COLUMNS = [
+    "DisNo.",
+    "Event Name",
+    "Disaster Type",
+    "Country",
+    "ISO",
+    "Region",
+    "Location",
+    "Start Year",
+    "Start Month",
+    "Total Deaths",
+    "Total Affected",
+    "Total Damage",
+]
+
+
+def dataset_version(data: pd.DataFrame) -> str:
+    """
+    Return a short fingerprint of the data content.
+
+    It changes whenever a value, a row or a column changes, and is used to
+    tag everything derived from the data (API ETags, caches on disk).
+    """
+    digest = hashlib.sha256(",".join(map(str, data.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+class DisasterIndexes:
+    """
+    Precomputed structures built once from the cleaned data at startup.
+
+    Callbacks read from these instead of filtering the full DataFrame on
+    every interaction.
+    """
+
+    def __init__(self, data: pd.DataFrame, previous_cascades: Optional[CascadeIndex] = None):
+        logger.info("Building dashboard indexes")
+        self.version = dataset_version(data)
+        self.rows = len(data)
+        self.cube = DisasterCube(data)
+        self.countries = CountryIndex(data)
+        self.quantiles = QuantileSketches(data)
+        self.intervals = EventIntervals(data)
+        self.cascade_index = CascadeIndex(data, previous=previous_cascades)
+
+        # Events from the deadliest down, a top-N query is then a filter and a head
+        self._deaths_order = np.argsort(
+            -pd.to_numeric(data["Total Deaths"], errors="coerce").fillna(-np.inf).to_numpy(),
+            kind="stable",
+        )
+        self._by_deaths = self._event_view(data, self._deaths_order)
+        self._deaths_rank = self._rank(self._deaths_order)
+        self.search_index = SearchIndex(data, self._deaths_order)
+        logger.info(f"Dataset version {self.version} ({self.rows} events)")
+
+    @staticmethod
+    def _event_view(data: pd.DataFrame, order: np.ndarray) -> pd.DataFrame:
+        """Return the event columns of data in the given row order."""
+        return data[[c for c in EVENT_COLUMNS if c in data.columns]].iloc[order]
+
+    @staticmethod
+    def _rank(order: np.ndarray) -> np.ndarray:
+        """Position of every row in the given order, the inverse permutation."""
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        return rank
+
+    def save(self, directory: Path) -> None:
+        """
+        Write every index to directory, to be loaded back by DisasterIndexes.load.
+
+        Args:
+            directory: Destination, created if needed
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        self.cube.save(directory / "cube")
+        self.countries.save(directory / "countries")
+        self.quantiles.save(directory / "quantiles")
+        self.intervals.save(directory / "intervals")
+        self.cascade_index.save(directory / "cascades")
+        self.search_index.save(directory / "search")
+        np.save(directory / "deaths_order.npy", self._deaths_order)
+        (directory / "indexes.json").write_text(json.dumps({"version": self.version, "rows": self.rows}))
+
+    @classmethod
+    def load(cls, directory: Path, data: pd.DataFrame) -> "DisasterIndexes":
+        """
+        Load the indexes written by save for the same data.
+
+        Arrays are memory-mapped read-only rather than recomputed, the data
+        fingerprint is taken from the saved indexes. The event views ordered
+        by deaths and by country are still copies of data.
+
+        Args:
+            directory: Directory written by save
+            data: The cleaned data the indexes were built from, in the same row order
+        """
+        meta = json.loads((directory / "indexes.json").read_text())
+        if meta["rows"] != len(data):
+            raise ValueError(f"Indexes of {meta['rows']} events cannot describe {len(data)} events")
+
+        indexes = cls.__new__(cls)
+        indexes.version = meta["version"]
+        indexes.rows = meta["rows"]
+        indexes.cube = DisasterCube.load(directory / "cube")
+        indexes.countries = CountryIndex.load(directory / "countries", data)
+        indexes.quantiles = QuantileSketches.load(directory / "quantiles")
+        indexes.intervals = EventIntervals.load(directory / "intervals")
+        indexes.cascade_index = CascadeIndex.load(directory / "cascades")
+        indexes._deaths_order = np.load(directory / "deaths_order.npy", mmap_mode="r")
+        indexes._by_deaths = cls._event_view(data, indexes._deaths_order)
+        indexes._deaths_rank = cls._rank(indexes._deaths_order)
+        indexes.search_index = SearchIndex.load(directory / "search")
+        logger.info(f"Loaded dashboard indexes for dataset version {indexes.version}")
+        return indexes
+
+    def deadliest(
+        self,
+        n: int = 10,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        disaster_type: Optional[str] = None,
+        region: Optional[str] = None,
+        iso: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Return the n deadliest events matching the filters.
+
+        Args:
+            n: Number of events returned
+            start_year: First year included
+            end_year: Last year included
+            disaster_type: Keep only this disaster type ('All' or None keeps every type)
+            region: Keep only this region ('All' or None keeps every region)
+            iso: Keep only this country
+        """
+        events = self._by_deaths
+        mask = events["Total Deaths"].notna()
+        if start_year is not None:
+            mask &= events["Start Year"] >= start_year
+        if end_year is not None:
+            mask &= events["Start Year"] <= end_year
+        if disaster_type and disaster_type != "All":
+            mask &= events["Disaster Type"] == disaster_type
+        if region and region != "All":
+            mask &= events["Region"] == region
+        if iso:
+            mask &= events["ISO"] == iso
+        return events[mask].head(n)
+
+    def search(
+        self,
+        query: str,
+        rank_by: str = "deaths",
+        n: int = 50,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Search the events by the words of their location, name and country.
+
+        Args:
+            query: Words searched, the last one matched as a prefix
+            rank_by: "deaths" (deadliest first) or "date" (most recent first)
+            n: Number of events returned
+            start_year: First year included
+            end_year: Last year included
+        """
+        return self._by_deaths.iloc[self.search_index.search(query, rank_by, n, start_year, end_year)]
+
+    def active_events(
+        self,
+        start: Any,
+        end: Any = None,
+        region: Optional[str] = None,
+        n: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Return the events active at some point between two dates, deadliest first.
+
+        Args:
+            start: First day of the period, or the day of a point query
+            end: Last day of the period included (the start day when None)
+            region: Keep only this region ('All' or None keeps every region)
+            n: Number of events returned, all of them when None
+
+        Returns:
+            The event columns, with the Start_Date and End_Date of each event
+        """
+        rows = self.intervals.overlapping(start, end, region)
+        rows = rows[np.argsort(self._deaths_rank[rows])][:n]
+        starts, ends = self.intervals.spans(rows)
+        return self._by_deaths.iloc[self._deaths_rank[rows]].assign(Start_Date=starts, End_Date=ends)
+
+    def cascades(
+        self,
+        n: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+        iso: Optional[str] = None,
+        pairs: Optional[List[Tuple[str, str]]] = None,
+        window: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Return the cascades of disasters matching the filters, deadliest first.
+
+        Args:
+            n: Number of cascades returned, all of them when None
+            start_year: First year in which a cascade may start
+            end_year: Last year in which a cascade may start
+            region: Keep only this region ('All' or None keeps every region)
+            iso: Keep only this country
+            pairs: (trigger, follow-up) disaster types linked, every rule when None
+            window: Longest gap in days between linked starts, each rule's own when None
+
+        Returns:
+            One row per cascade: its start, span in days, country, sequence of
+            disaster types, event numbers and total deaths
+        """
+        rules = None if pairs is None and window is None else self.cascade_index.select_rules(pairs, window)
+        members = self.cascade_index.members(start_year, end_year, region, iso, rules)
+        ranks = self._deaths_rank[members["Row"].to_numpy()]
+        members["Total Deaths"] = self._by_deaths["Total Deaths"].to_numpy()[ranks]
+
+        # Ranked on numeric aggregates, the text columns are only built for the cascades returned
+        grouped = members.groupby("Cascade", sort=False)
+        totals = pd.DataFrame({
+            "first": grouped["Day"].min(),
+            "last": grouped["Day"].max(),
+            "deaths": grouped["Total Deaths"].sum(min_count=1),
+        }).sort_values(["deaths", "first"], ascending=False, na_position="last")
+        if n is not None:
+            totals = totals.head(n)
+
+        top = members[members["Cascade"].isin(totals.index)]
+        events = self._by_deaths.iloc[self._deaths_rank[top["Row"].to_numpy()]]
+        grouped = top.assign(**{
+            column: events[column].to_numpy() for column in ("DisNo.", "Country", "ISO")
+        }).groupby("Cascade", sort=False)
+        return pd.DataFrame({
+            "Start_Date": to_date(totals["first"].to_numpy()),
+            "Days": (totals["last"] - totals["first"]).to_numpy(),
+            "Country": grouped["Country"].first().reindex(totals.index).to_numpy(),
+            "ISO": grouped["ISO"].first().reindex(totals.index).to_numpy(),
+            "Sequence": grouped["Disaster Type"].agg(" > ".join).reindex(totals.index).to_numpy(),
+            "Events": grouped["DisNo."].agg(list).reindex(totals.index).to_numpy(),
+            "Total Deaths": totals["deaths"].to_numpy(),
+        })
+
+def build_indexes(data: pd.DataFrame, previous_cascades: Optional[CascadeIndex] = None) -> DisasterIndexes:
+    """
+    Build every index used by the dashboard callbacks.
+
+    Args:
+        data: Cleaned disasters DataFrame
+        previous_cascades: Cascades of a previous dataset, whose unchanged countries are reused
+
+    Returns:
+        The shared DisasterIndexes instance
+    """
+    return DisasterIndexes(data, previous_cascades)
@@ -0,0 +1,254 @@
+import json
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import logger
+
+# Steps of the active-count series
+ACTIVE_STEPS = ("day", "month")
+
+# Marks the rows without a start date, which are never active
+NO_DAY = np.iinfo(np.int32).min
+
+
+def event_days(data: pd.DataFrame, prefix: str) -> np.ndarray:
+    """
+    Day number (days since 1970-01-01) of the Start or End date of every event, NaN if unknown.
+
+    Reads the Start_Date / End_Date columns of the cleaner, or rebuilds them
+    from the year, month and day columns as the cleaner does.
+    """
+    column = f"{prefix}_Date"
+    if column in data.columns:
+        dates = pd.to_datetime(data[column], errors="coerce")
+    elif f"{prefix} Year" in data.columns:
+        # A missing month or day column counts as the first month or day
+        parts = pd.DataFrame({"year": pd.to_numeric(data[f"{prefix} Year"], errors="coerce")})
+        for part in ("Month", "Day"):
+            column_part = f"{prefix} {part}"
+            values = data[column_part] if column_part in data.columns else pd.Series(1, index=data.index)
+            parts[part.lower()] = pd.to_numeric(values, errors="coerce").fillna(1)
+        dates = pd.to_datetime(parts, errors="coerce")
+    else:
+        return np.full(len(data), np.nan)
+    days = dates.to_numpy(dtype="datetime64[D]").astype(np.int64).astype(float)
+    days[dates.isna().to_numpy()] = np.nan
+    return days
+
+
+def to_day(value: Any) -> int:
+    """
+    Day number of a date given as a string, a datetime or a numpy datetime64.
+
+    Numbers are refused: pandas would read them as nanoseconds since 1970,
+    and a day number or a year would silently select nothing. A day number
+    is given as np.datetime64(day, "D").
+
+    Raises:
+        TypeError: The value is a number
+    """
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        raise TypeError(f"Dates are given as strings, datetimes or datetime64, got the number {value!r}")
+    return int(np.datetime64(pd.Timestamp(value), "D").astype(np.int64))
+
+
+def to_date(days: np.ndarray) -> pd.DatetimeIndex:
+    """Dates of day numbers."""
+    return pd.DatetimeIndex(np.asarray(days, dtype=np.int64).astype("datetime64[D]"))
+
+
+class EventIntervals:
+    """
+    Interval index over the [Start_Date, End_Date] span of every event.
+
+    Answers which events are active on a day (point stabbing) or during a
+    period (range stabbing), and holds the number of active events per day
+    and per month of every region, for charting.
+
+    Events are split by duration class, class c holding the events lasting
+    up to 2^c days (class 0 the single days), and sorted by start inside each
+    class. An event of class c active on day d started within 2^c days
+    before d: each class is read over one binary-searched block of starts,
+    of which about half or more is active, so a query costs
+    O(log(n) log(max duration) + active events) instead of a pass over
+    every event. An unknown end counts as a single day, an end before the
+    start is moved to the start; events without a start date are left out.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        starts = event_days(data, "Start")
+        ends = event_days(data, "End")
+        known = ~np.isnan(starts)
+        ends = np.where(np.isnan(ends), starts, np.maximum(ends, starts))
+
+        region_codes, regions = pd.factorize(data["Region"].fillna("").astype(str), sort=True)
+        self.regions: List[str] = [str(region) for region in regions]
+        self.rows = len(data)
+
+        # Per row spans, to describe the events found
+        self._row_starts = np.where(known, starts, NO_DAY).astype(np.int32)
+        self._row_ends = np.where(known, ends, NO_DAY).astype(np.int32)
+
+        rows = np.flatnonzero(known)
+        starts, ends = starts[known].astype(np.int64), ends[known].astype(np.int64)
+        self.min_day = int(starts.min()) if len(rows) else 0
+        self.max_day = int(ends.max()) if len(rows) else -1
+
+        # Rows sorted by duration class, then by start
+        classes = np.ceil(np.log2(ends - starts + 1)).astype(np.int64)
+        order = np.lexsort((starts, classes))
+        self._order = rows[order].astype(np.int64)
+        self._starts = starts[order].astype(np.int32)
+        self._ends = ends[order].astype(np.int32)
+        self._region_codes = region_codes[rows[order]].astype(np.int16)
+        self._class_offsets = np.searchsorted(
+            classes[order], np.arange(int(classes.max()) + 2 if len(rows) else 1)
+        ).astype(np.int64)
+
+        self._daily = self._daily_counts(starts, ends, region_codes[rows])
+        self._monthly = self._monthly_counts(starts, ends, region_codes[rows])
+        logger.info(
+            f"Built interval index: {len(rows)} events over {self._daily.shape[1]} days, "
+            f"{len(self._class_offsets) - 1} duration classes"
+        )
+
+    @property
+    def min_month(self) -> int:
+        """Month number (months since 1970-01) of the first day."""
+        return int(np.datetime64(self.min_day, "D").astype("datetime64[M]").astype(np.int64))
+
+    def _daily_counts(self, starts: np.ndarray, ends: np.ndarray, regions: np.ndarray) -> np.ndarray:
+        """Active events of every region (rows) on every day (columns), from a difference array."""
+        days = self.max_day - self.min_day + 1 if len(starts) else 0
+        changes = np.zeros((len(self.regions), days + 1), dtype=np.int64)
+        np.add.at(changes, (regions, starts - self.min_day), 1)
+        np.add.at(changes, (regions, ends - self.min_day + 1), -1)
+        return np.cumsum(changes[:, :days], axis=1).astype(np.int32)
+
+    def _monthly_counts(self, starts: np.ndarray, ends: np.ndarray, regions: np.ndarray) -> np.ndarray:
+        """Events of every region active at some point of every month."""
+        first = self.min_month
+        start_months = starts.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) - first
+        end_months = ends.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) - first
+        months = int(end_months.max()) + 1 if len(starts) else 0
+        changes = np.zeros((len(self.regions), months + 1), dtype=np.int64)
+        np.add.at(changes, (regions, start_months), 1)
+        np.add.at(changes, (regions, end_months + 1), -1)
+        return np.cumsum(changes[:, :months], axis=1).astype(np.int32)
+
+    def save(self, directory: Path) -> None:
+        """Write the index arrays (.npy) and its axes (intervals.json) to directory."""
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ("row_starts", "row_ends", "order", "starts", "ends", "region_codes",
+                     "class_offsets", "daily", "monthly"):
+            np.save(directory / f"{name}.npy", getattr(self, f"_{name}"))
+        (directory / "intervals.json").write_text(json.dumps({
+            "regions": self.regions,
+            "rows": self.rows,
+            "min_day": self.min_day,
+            "max_day": self.max_day,
+        }))
+
+    @classmethod
+    def load(cls, directory: Path) -> "EventIntervals":
+        """Load an index written by save, the arrays are memory-mapped read-only."""
+        meta = json.loads((directory / "intervals.json").read_text())
+        intervals = cls.__new__(cls)
+        intervals.regions = meta["regions"]
+        intervals.rows = meta["rows"]
+        intervals.min_day, intervals.max_day = meta["min_day"], meta["max_day"]
+        for name in ("row_starts", "row_ends", "order", "starts", "ends", "region_codes",
+                     "class_offsets", "daily", "monthly"):
+            setattr(intervals, f"_{name}", np.load(directory / f"{name}.npy", mmap_mode="r"))
+        return intervals
+
+    def _region_code(self, region: Optional[str]) -> Optional[int]:
+        """Code of a region filter, None for every region and -1 for an unknown one."""
+        if not region or region == "All":
+            return None
+        return self.regions.index(region) if region in self.regions else -1
+
+    def overlapping(self, start: Any, end: Any = None, region: Optional[str] = None) -> np.ndarray:
+        """
+        Rows of the events active at some point between two dates.
+
+        Args:
+            start: First day of the period, or the day of a point query (any date but a number, see to_day)
+            end: Last day of the period included (the start day when None)
+            region: Keep only this region ('All' or None keeps every region)
+
+        Returns:
+            The row positions of the events in the data, in increasing order
+        """
+        first = to_day(start)
+        last = first if end is None else to_day(end)
+        code = self._region_code(region)
+        found = []
+        for duration_class in range(len(self._class_offsets) - 1):
+            lo, hi = self._class_offsets[duration_class], self._class_offsets[duration_class + 1]
+            if lo == hi:
+                continue
+            # Started at most 2^c - 1 days before the period, and before its end
+            starts = self._starts[lo:hi]
+            begin = np.searchsorted(starts, starts.dtype.type(first - 2 ** duration_class + 1), side="left")
+            stop = np.searchsorted(starts, starts.dtype.type(last), side="right")
+            keep = self._ends[lo + begin:lo + stop] >= first
+            if code is not None:
+                keep &= self._region_codes[lo + begin:lo + stop] == code
+            found.append(self._order[lo + begin:lo + stop][keep])
+        return np.sort(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def active_on(self, day: Any, region: Optional[str] = None) -> np.ndarray:
+        """Rows of the events active on a day, see overlapping."""
+        return self.overlapping(day, None, region)
+
+    def spans(self, rows: np.ndarray) -> Tuple[pd.DatetimeIndex, pd.DatetimeIndex]:
+        """Start and end dates of the given rows."""
+        return to_date(self._row_starts[rows]), to_date(self._row_ends[rows])
+
+    def active_counts(
+        self,
+        step: str = "month",
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+    ) -> pd.Series:
+        """
+        Number of events active on each day, or at some point of each month.
+
+        Args:
+            step: "day" or "month"
+            start_year: First year included
+            end_year: Last year included
+            region: Keep only this region ('All' or None keeps every region)
+
+        Returns:
+            The counts indexed by the first day of each step, over the years kept
+        """
+        if step not in ACTIVE_STEPS:
+            raise ValueError(f"step must be one of {list(ACTIVE_STEPS)}, got '{step}'")
+        counts = self._daily if step == "day" else self._monthly
+        code = self._region_code(region)
+        if code == -1 or counts.shape[1] == 0:
+            return pd.Series(dtype=np.int64)
+
+        if step == "day":
+            origin = self.min_day
+            first = origin if start_year is None else to_day(f"{int(start_year)}-01-01")
+            last = origin + counts.shape[1] - 1 if end_year is None else to_day(f"{int(end_year)}-12-31")
+        else:
+            origin = self.min_month
+            first = origin if start_year is None else (int(start_year) - 1970) * 12
+            last = origin + counts.shape[1] - 1 if end_year is None else (int(end_year) - 1970) * 12 + 11
+        first, last = max(first, origin), min(last, origin + counts.shape[1] - 1)
+        if first > last:
+            return pd.Series(dtype=np.int64)
+
+        block = counts[:, first - origin:last - origin + 1]
+        values = block.sum(axis=0) if code is None else np.asarray(block[code])
+        steps = np.arange(first, last + 1)
+        dates = to_date(steps) if step == "day" else pd.DatetimeIndex(steps.astype("datetime64[M]"))
+        return pd.Series(values.astype(np.int64), index=dates)
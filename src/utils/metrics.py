@@ -0,0 +1,212 @@
+import functools
+import os
+import resource
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import flask
+from dash import Dash
+from dash.exceptions import PreventUpdate
+
+from . import logger
+
+# Upper bounds of the histogram buckets (Prometheus 'le' labels)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAYLOAD_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative histogram of observed values, in the Prometheus sense."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[position] += 1
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Metrics of the current worker process.
+
+    Each gunicorn worker keeps its own registry, scrapes are told apart by
+    the pid label.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latency: Dict[str, Histogram] = {}
+        self.payload: Dict[str, Histogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.cache_lookups: Dict[Tuple[str, bool], int] = {}
+        self.info: Dict[str, Any] = {}
+
+    def observe_callback(
+        self, callback_id: str, seconds: float, payload_bytes: Optional[int], failed: bool
+    ) -> None:
+        """Record one run of a callback."""
+        with self._lock:
+            self.latency.setdefault(callback_id, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            if payload_bytes is not None:
+                self.payload.setdefault(callback_id, Histogram(PAYLOAD_BUCKETS)).observe(payload_bytes)
+            if failed:
+                self.errors[callback_id] = self.errors.get(callback_id, 0) + 1
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Record a lookup in one of the server caches."""
+        with self._lock:
+            self.cache_lookups[(cache, hit)] = self.cache_lookups.get((cache, hit), 0) + 1
+
+    def render(self) -> str:
+        """Format every metric in the Prometheus text exposition format."""
+        pid = os.getpid()
+        lines: List[str] = []
+
+        def histogram(name: str, help_text: str, histograms: Dict[str, Histogram]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for callback_id, hist in sorted(histograms.items()):
+                labels = f'callback="{_escape(callback_id)}",pid="{pid}"'
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        with self._lock:
+            histogram(
+                "disasters_callback_duration_seconds",
+                "Time spent running each Dash callback.",
+                self.latency,
+            )
+            histogram(
+                "disasters_callback_response_bytes",
+                "Size of the JSON response of each Dash callback.",
+                self.payload,
+            )
+
+            lines.append("# HELP disasters_callback_errors_total Dash callbacks that raised.")
+            lines.append("# TYPE disasters_callback_errors_total counter")
+            for callback_id, count in sorted(self.errors.items()):
+                lines.append(
+                    f'disasters_callback_errors_total{{callback="{_escape(callback_id)}",pid="{pid}"}} {count}'
+                )
+
+            lines.append("# HELP disasters_cache_lookups_total Lookups in the server caches.")
+            lines.append("# TYPE disasters_cache_lookups_total counter")
+            caches = sorted({cache for cache, _ in self.cache_lookups})
+            for cache in caches:
+                for hit in (True, False):
+                    lines.append(
+                        f'disasters_cache_lookups_total{{cache="{cache}",result="{"hit" if hit else "miss"}",pid="{pid}"}} '
+                        f"{self.cache_lookups.get((cache, hit), 0)}"
+                    )
+
+            lines.append("# HELP disasters_cache_hit_ratio Share of the lookups answered from the cache.")
+            lines.append("# TYPE disasters_cache_hit_ratio gauge")
+            for cache in caches:
+                hits = self.cache_lookups.get((cache, True), 0)
+                total = hits + self.cache_lookups.get((cache, False), 0)
+                lines.append(
+                    f'disasters_cache_hit_ratio{{cache="{cache}",pid="{pid}"}} {hits / total if total else 0.0}'
+                )
+
+            info = dict(self.info)
+
+        lines.append("# HELP disasters_dataset_info Version of the data served.")
+        lines.append("# TYPE disasters_dataset_info gauge")
+        lines.append(f'disasters_dataset_info{{version="{info.get("version", "")}",pid="{pid}"}} 1')
+        lines.append("# HELP disasters_dataset_rows Number of events in the data served.")
+        lines.append("# TYPE disasters_dataset_rows gauge")
+        lines.append(f'disasters_dataset_rows{{pid="{pid}"}} {info.get("rows", 0)}')
+        lines.append("# HELP disasters_process_resident_memory_bytes Resident memory of the worker.")
+        lines.append("# TYPE disasters_process_resident_memory_bytes gauge")
+        lines.append(f'disasters_process_resident_memory_bytes{{pid="{pid}"}} {resident_memory()}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def resident_memory() -> int:
+    """Resident set size of the current process in bytes (peak size where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if peak > 1 << 32 else peak * 1024
+
+
+# Registry of this worker, shared by every module recording metrics
+metrics = MetricsRegistry()
+
+
+def timed_callback(callback_id: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a Dash callback handler to record its duration and response size.
+
+    Args:
+        callback_id: Label of the callback in the metrics (its output)
+        func: Handler registered by Dash, which returns the JSON response
+    """
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        failed = False
+        response = None
+        try:
+            response = func(*args, **kwargs)
+            return response
+        except PreventUpdate:
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            payload = len(response) if isinstance(response, (str, bytes)) else None
+            metrics.observe_callback(callback_id, time.perf_counter() - start, payload, failed)
+
+    setattr(wrapper, "timed", True)
+    return wrapper
+
+
+def instrument_callbacks(app: Dash) -> None:
+    """Wrap every server-side callback registered so far with timed_callback."""
+    for callback_id, callback in app.callback_map.items():
+        if "callback" in callback and not getattr(callback["callback"], "timed", False):
+            callback["callback"] = timed_callback(callback_id.strip("."), callback["callback"])
+
+
+def init_metrics(app: Dash, version: str, rows: int) -> None:
+    """
+    Instrument the registered callbacks and serve the metrics at /metrics.
+
+    Must be called after every register_*_callbacks function.
+
+    Args:
+        app: Dash application instance
+        version: Dataset version served
+        rows: Number of events served
+    """
+    metrics.info.update(version=version, rows=rows)
+    instrument_callbacks(app)
+
+    @app.server.route("/metrics")
+    def prometheus_metrics() -> flask.Response:
+        return flask.Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+    logger.info(f"Serving metrics of {len(app.callback_map)} callbacks at /metrics")
@@ -0,0 +1,253 @@
+import collections
+import functools
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Counter, List, Optional, Tuple
+
+import flask
+from dash import Dash
+
+from . import logger
+from .settings import get_project_paths
+
+# Send this header, set to DISASTERS_PROFILE_TOKEN, with a callback request to profile it;
+# the header is ignored when no token is set
+PROFILE_HEADER = "X-Profile"
+PROFILE_TOKEN = os.environ.get("DISASTERS_PROFILE_TOKEN", "")
+# Header of the response naming the files written for a profiled request
+PROFILE_FILE_HEADER = "X-Profile-File"
+
+# DISASTERS_PROFILE=1 profiles every callback, DISASTERS_PROFILE_RATE=0.01 one in a hundred
+PROFILE_ALL = os.environ.get("DISASTERS_PROFILE", "0") == "1"
+PROFILE_RATE = float(os.environ.get("DISASTERS_PROFILE_RATE", "0"))
+PROFILE_DIR = Path(os.environ.get("DISASTERS_PROFILE_DIR", get_project_paths()["profiles"]))
+
+# Profiles kept in PROFILE_DIR, the oldest are deleted past this number
+MAX_PROFILES = int(os.environ.get("DISASTERS_PROFILE_MAX_FILES", "200"))
+
+# Time between two stack samples, in seconds
+SAMPLE_INTERVAL = 0.001
+TOP_FUNCTIONS = 25
+
+Stack = Tuple[str, ...]
+
+# The switch interval is process-wide: the first running sampler lowers it,
+# the last one to stop restores it
+_switch_lock = threading.Lock()
+_running_samplers = 0
+_saved_switch_interval = 0.0
+
+
+def _lower_switch_interval(interval: float) -> None:
+    global _running_samplers, _saved_switch_interval
+    with _switch_lock:
+        if not _running_samplers:
+            _saved_switch_interval = sys.getswitchinterval()
+        _running_samplers += 1
+        sys.setswitchinterval(min(sys.getswitchinterval(), interval))
+
+
+def _restore_switch_interval() -> None:
+    global _running_samplers
+    with _switch_lock:
+        _running_samplers -= 1
+        if not _running_samplers:
+            sys.setswitchinterval(_saved_switch_interval)
+
+
+def _frame_label(frame: FrameType) -> str:
+    """Name a frame as function (file:line of its definition)."""
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Sample the Python stack of the thread that enters it at a fixed interval.
+
+    A background thread reads the profiled thread's current frame, so the
+    profiled code runs unmodified. Stacks are cut at the frame that entered
+    the sampler. Python only switches threads every sys.getswitchinterval()
+    seconds, so the interval is lowered to the sampling interval while
+    samplers run (restored when the last one stops); code running in C without releasing the GIL is attributed
+    to the Python frame that called it, like with any sampling profiler.
+
+    Usage:
+        with StackSampler() as sampler:
+            work()
+        sampler.samples  # Counter of stacks, outermost frame first
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter[Stack] = collections.Counter()
+        self.duration = 0.0
+        self._root: Optional[FrameType] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                if frame is self._root:
+                    break
+                frame = frame.f_back
+            # A sample taken while stopping shows the sampler itself
+            if stack and not self._stop.is_set():
+                self.samples[tuple(reversed(stack))] += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._thread_id = threading.get_ident()
+        self._root = sys._getframe(1)
+        _lower_switch_interval(self.interval)
+        self._start = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.duration = time.perf_counter() - self._start
+        self._stop.set()
+        self._thread.join()
+        _restore_switch_interval()
+        self._root = None
+
+
+def collapsed_stacks(samples: Counter[Stack]) -> str:
+    """
+    Format samples as collapsed stacks, one 'frame;frame;frame count' line per stack.
+
+    This is the input format of flamegraph.pl and speedscope.
+    """
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in samples.most_common())
+
+
+def top_functions(samples: Counter[Stack], limit: int = TOP_FUNCTIONS) -> str:
+    """
+    Summarize samples as the functions with the most self and total samples.
+
+    Self samples count the stacks a function is on top of, total samples the
+    stacks it appears in (once per stack, recursion is not counted twice).
+    """
+    total = sum(samples.values()) or 1
+    own: Counter[str] = collections.Counter()
+    inclusive: Counter[str] = collections.Counter()
+    for stack, count in samples.items():
+        own[stack[-1]] += count
+        for label in set(stack):
+            inclusive[label] += count
+
+    lines = [f"{total} samples", "", f"{'self %':>8}{'total %':>9}  function"]
+    for label, _ in own.most_common(limit):
+        lines.append(f"{100 * own[label] / total:>7.1f}%{100 * inclusive[label] / total:>8.1f}%  {label}")
+    return "\n".join(lines) + "\n"
+
+
+def write_profile(sampler: StackSampler, name: str, directory: Path = PROFILE_DIR) -> Path:
+    """
+    Write the samples of a profiled run to directory.
+
+    Writes <timestamp>-<name>.collapsed (collapsed stacks) and
+    <timestamp>-<name>.txt (top functions summary). Only the MAX_PROFILES
+    most recent profiles of the directory are kept.
+
+    Returns:
+        Path of the collapsed stacks file
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{re.sub(r'[^A-Za-z0-9_-]+', '_', name).strip('_')}"
+    collapsed = directory / f"{stem}.collapsed"
+    collapsed.write_text(collapsed_stacks(sampler.samples))
+    (directory / f"{stem}.txt").write_text(
+        f"{name}: {sampler.duration * 1000:.1f} ms\n" + top_functions(sampler.samples)
+    )
+    profiles = sorted(directory.glob("*.collapsed"), key=lambda file: file.stat().st_mtime, reverse=True)
+    for stale in profiles[MAX_PROFILES:]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix(".txt").unlink(missing_ok=True)
+    return collapsed
+
+
+def profile_requested() -> bool:
+    """Whether the current request carries the profiling header with the configured token."""
+    return bool(PROFILE_TOKEN) and hmac.compare_digest(
+        flask.request.headers.get(PROFILE_HEADER, "").encode(), PROFILE_TOKEN.encode()
+    )
+
+
+def _should_profile() -> bool:
+    """Profile the current request if asked to by its header, the environment or the sampling rate."""
+    return (
+        PROFILE_ALL
+        or profile_requested()
+        or (PROFILE_RATE > 0 and random.random() < PROFILE_RATE)
+    )
+
+
+def profiled_callback(callback_id: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a Dash callback handler to sample its stacks when the request asks for it.
+
+    Args:
+        callback_id: Name of the callback in the profile files (its output)
+        func: Handler registered by Dash
+    """
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not flask.has_request_context() or not _should_profile():
+            return func(*args, **kwargs)
+
+        sampler = StackSampler()
+        try:
+            with sampler:
+                return func(*args, **kwargs)
+        finally:
+            path = write_profile(sampler, callback_id)
+            flask.g.profile_file = path.name
+            logger.info(
+                f"Profiled {callback_id} ({sampler.duration * 1000:.1f} ms, "
+                f"{sum(sampler.samples.values())} samples): {path}"
+            )
+
+    setattr(wrapper, "profiled", True)
+    return wrapper
+
+
+def init_profiling(app: Dash) -> None:
+    """
+    Make every server-side callback registered so far profilable.
+
+    A callback is profiled when its request carries the X-Profile header
+    set to DISASTERS_PROFILE_TOKEN, when DISASTERS_PROFILE=1, or at random
+    with probability DISASTERS_PROFILE_RATE. Profiles are written to
+    DISASTERS_PROFILE_DIR (default: profiles/ at the project root), which
+    keeps the DISASTERS_PROFILE_MAX_FILES most recent, and named in the
+    X-Profile-File response header.
+
+    Args:
+        app: Dash application instance
+    """
+    for callback_id, callback in app.callback_map.items():
+        if "callback" in callback and not getattr(callback["callback"], "profiled", False):
+            callback["callback"] = profiled_callback(callback_id.strip("."), callback["callback"])
+
+    @app.server.after_request
+    def name_profile_file(response: flask.Response) -> flask.Response:
+        if "profile_file" in flask.g:
+            response.headers[PROFILE_FILE_HEADER] = flask.g.profile_file
+        return response
+
+    if PROFILE_ALL or PROFILE_RATE > 0 or PROFILE_TOKEN:
+        logger.info(
+            f"Profiling callbacks (all: {PROFILE_ALL}, rate: {PROFILE_RATE}, header: {bool(PROFILE_TOKEN)}) "
+            f"to {PROFILE_DIR}"
+        )
@@ -0,0 +1,232 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from . import logger
+
+# Impact metrics whose distribution is sketched
+QUANTILE_MEASURES = ["Total Deaths", "Total Affected", "Total Damage"]
+
+# Quantiles shown by default: median, p90, p99
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+# Relative accuracy of every quantile: the estimate of the q-quantile is
+# within 1% of the exact q-quantile of the same events
+RELATIVE_ACCURACY = 0.01
+
+# Bucket 0 holds the zeros, bucket 1 + k the values in (GAMMA^(k-1), GAMMA^k]
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+ZERO_BUCKET = 0
+
+
+def bucket_keys(values: np.ndarray) -> np.ndarray:
+    """Logarithmic bucket key of positive values, ceil(log_GAMMA(value))."""
+    return np.ceil(np.log(values) / np.log(GAMMA)).astype(np.int64)
+
+
+class QuantileSketches:
+    """
+    Mergeable quantile sketches of the impact metrics, per (year, disaster type, country) cell.
+
+    Each cell holds a relative-error sketch (DDSketch): the number of its
+    events falling in each logarithmic bucket (GAMMA^(k-1), GAMMA^k], zeros
+    apart. Merging the cells of a filter is adding their bucket counts, so
+    any combination of year range, disaster type, region and country is
+    answered without reading the events.
+
+    Error bound: the bucket of the exact q-quantile is found exactly, and
+    its representative 2 GAMMA^k / (GAMMA + 1) lies within RELATIVE_ACCURACY
+    of any value of the bucket. Every estimate is thus within 1% of the
+    exact lower q-quantile (the value of rank floor(q (n - 1)) among the n
+    filtered events), whatever the filter and the skew of the data.
+    Negative values count as zeros, missing values are left out.
+
+    The buckets of every cell are stored back to back, cells sorted by
+    year first, so a year range is a contiguous block of entries.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        years = pd.to_numeric(data["Start Year"], errors="coerce")
+        type_codes, types = pd.factorize(data["Disaster Type"], sort=True)
+        iso_codes, isos = pd.factorize(data["ISO"], sort=True)
+
+        valid = (type_codes >= 0) & (iso_codes >= 0) & years.notna().to_numpy()
+        self.min_year = int(years[valid].min()) if valid.any() else 0
+        self.max_year = int(years[valid].max()) if valid.any() else -1
+        self.types: List[str] = [str(t) for t in types]
+        self.isos: List[str] = [str(iso) for iso in isos]
+
+        # Region of every country, a region filter is a set of countries
+        regions = data.loc[valid, ["ISO", "Region"]].drop_duplicates("ISO").set_index("ISO")["Region"]
+        self.iso_regions = np.array([str(regions.get(iso, "")) for iso in self.isos], dtype=object)
+
+        cells = (
+            (years[valid].to_numpy(dtype=np.int64) - self.min_year) * len(self.types)
+            + type_codes[valid]
+        ) * len(self.isos) + iso_codes[valid]
+
+        self._min_keys: Dict[str, int] = {}
+        self._cells: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[str, np.ndarray] = {}
+        self._counts: Dict[str, np.ndarray] = {}
+        for measure in QUANTILE_MEASURES:
+            if measure not in data.columns:
+                continue
+            values = pd.to_numeric(data[measure], errors="coerce").to_numpy(dtype=float)[valid]
+            known = ~np.isnan(values)
+            values = np.maximum(values[known], 0)
+
+            positive = values > 0
+            keys = bucket_keys(values[positive])
+            min_key = int(keys.min()) if len(keys) else 0
+            buckets = np.full(len(values), ZERO_BUCKET, dtype=np.int64)
+            buckets[positive] = 1 + keys - min_key
+
+            # One entry per non-empty (cell, bucket), sorted by cell then bucket
+            width = int(buckets.max()) + 1 if len(buckets) else 1
+            entries, counts = np.unique(cells[known] * width + buckets, return_counts=True)
+            self._min_keys[measure] = min_key
+            self._cells[measure] = entries // width
+            self._buckets[measure] = (entries % width).astype(np.int32)
+            self._counts[measure] = counts.astype(np.int64)
+
+        logger.info(
+            f"Built quantile sketches for {len(self._cells)} measures "
+            f"({sum(len(cells) for cells in self._cells.values())} buckets)"
+        )
+
+    def save(self, directory: Path) -> None:
+        """Write the sketch entries (.npy) and their axes (quantiles.json) to directory."""
+        directory.mkdir(parents=True, exist_ok=True)
+        for position, measure in enumerate(self._cells):
+            np.save(directory / f"cells_{position}.npy", self._cells[measure])
+            np.save(directory / f"buckets_{position}.npy", self._buckets[measure])
+            np.save(directory / f"counts_{position}.npy", self._counts[measure])
+        (directory / "quantiles.json").write_text(json.dumps({
+            "min_year": self.min_year,
+            "max_year": self.max_year,
+            "types": self.types,
+            "isos": self.isos,
+            "iso_regions": self.iso_regions.tolist(),
+            "min_keys": self._min_keys,
+        }))
+
+    @classmethod
+    def load(cls, directory: Path) -> "QuantileSketches":
+        """Load sketches written by save, the entries are memory-mapped read-only."""
+        meta = json.loads((directory / "quantiles.json").read_text())
+        sketches = cls.__new__(cls)
+        sketches.min_year, sketches.max_year = meta["min_year"], meta["max_year"]
+        sketches.types = meta["types"]
+        sketches.isos = meta["isos"]
+        sketches.iso_regions = np.array(meta["iso_regions"], dtype=object)
+        sketches._min_keys = meta["min_keys"]
+        sketches._cells, sketches._buckets, sketches._counts = {}, {}, {}
+        for position, measure in enumerate(meta["min_keys"]):
+            sketches._cells[measure] = np.load(directory / f"cells_{position}.npy", mmap_mode="r")
+            sketches._buckets[measure] = np.load(directory / f"buckets_{position}.npy", mmap_mode="r")
+            sketches._counts[measure] = np.load(directory / f"counts_{position}.npy", mmap_mode="r")
+        return sketches
+
+    def __contains__(self, measure: str) -> bool:
+        return measure in self._cells
+
+    def merge(
+        self,
+        measure: str,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        disaster_type: Optional[str] = None,
+        region: Optional[str] = None,
+        iso: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Merge the sketches of the cells matching the filters.
+
+        Args:
+            measure: One of QUANTILE_MEASURES
+            start_year: First year included
+            end_year: Last year included
+            disaster_type: Keep only this disaster type ('All' or None keeps every type)
+            region: Keep only this region ('All' or None keeps every region)
+            iso: Keep only this country
+
+        Returns:
+            The number of events in each bucket
+        """
+        if measure not in self._cells:
+            raise ValueError(f"measure must be one of {list(self._cells)}, got '{measure}'")
+        cells, buckets, counts = self._cells[measure], self._buckets[measure], self._counts[measure]
+        width = len(self.types) * len(self.isos)
+
+        # Year range: a block of entries, found by binary search
+        first = 0 if start_year is None else max(int(start_year) - self.min_year, 0)
+        last = self.max_year - self.min_year if end_year is None else int(end_year) - self.min_year
+        start, stop = np.searchsorted(cells, [first * width, (max(last, first - 1) + 1) * width])
+        cells, buckets, counts = cells[start:stop], buckets[start:stop], counts[start:stop]
+
+        mask = np.ones(len(cells), dtype=bool)
+        if disaster_type and disaster_type != "All":
+            code = self.types.index(disaster_type) if disaster_type in self.types else -1
+            mask &= (cells // len(self.isos)) % len(self.types) == code
+        if region and region != "All":
+            mask &= (self.iso_regions == region)[cells % len(self.isos)]
+        if iso:
+            code = self.isos.index(iso) if iso in self.isos else -1
+            mask &= cells % len(self.isos) == code
+
+        size = int(buckets.max()) + 1 if len(buckets) else 1
+        return np.bincount(buckets[mask], weights=counts[mask], minlength=size).astype(np.int64)
+
+    def bucket_values(self, measure: str, size: int) -> np.ndarray:
+        """Representative value of the first size buckets of a measure (0 for the zeros)."""
+        keys = np.arange(size) - 1 + self._min_keys[measure]
+        values = 2 * GAMMA ** keys.astype(float) / (GAMMA + 1)
+        values[ZERO_BUCKET] = 0.0
+        return values
+
+    def quantiles(
+        self,
+        measure: str,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        disaster_type: Optional[str] = None,
+        region: Optional[str] = None,
+        iso: Optional[str] = None,
+    ) -> pd.Series:
+        """
+        Approximate quantiles of a measure over the events matching the filters.
+
+        Args:
+            measure: One of QUANTILE_MEASURES
+            quantiles: Quantiles wanted, between 0 and 1
+            start_year, end_year, disaster_type, region, iso: Filters, see merge
+
+        Returns:
+            The value of each quantile (NaN when no event matches), indexed by quantile
+        """
+        counts = self.merge(measure, start_year, end_year, disaster_type, region, iso)
+        return self.quantiles_of(measure, counts, quantiles)
+
+    def quantiles_of(
+        self,
+        measure: str,
+        counts: np.ndarray,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    ) -> pd.Series:
+        """Quantiles of a merged sketch, see quantiles."""
+        levels = np.asarray(quantiles, dtype=float)
+        if ((levels < 0) | (levels > 1)).any():
+            raise ValueError(f"Quantiles must be between 0 and 1, got {levels.tolist()}")
+
+        cumulative = np.cumsum(counts)
+        total = int(cumulative[-1]) if len(cumulative) else 0
+        if total == 0:
+            return pd.Series(np.nan, index=levels)
+        # First bucket holding more than rank events, the bucket of the rank-th value
+        buckets = np.searchsorted(cumulative, levels * (total - 1), side="right")
+        return pd.Series(self.bucket_values(measure, len(counts))[buckets], index=levels)
@@ -34,6 +34,24 @@ PIE_CARD_CAPTION = (
     "impossible, unlike floods and storms, which can often be anticipated thanks to weather forecasting systems."
 )
 
+DISTRIBUTION_CARD_CAPTION = (
+    "Note: Disaster impacts are extremely skewed: most events cause a handful of deaths, while a few "
+    "catastrophes reach hundreds of thousands. The median, p90 and p99 lines show how far the tail "
+    "stretches, each estimated within 1% of its exact value for any combination of filters."
+)
+
+ONGOING_CARD_CAPTION = (
+    "Note: Disasters overlap: droughts and epidemics last for months while new floods and storms keep "
+    "striking, so a region often has to cope with several crises at once. Click on a day of the upper chart "
+    "to list the deadliest disasters ongoing on that day."
+)
+
+CASCADE_CARD_CAPTION = (
+    "Note: Disasters rarely come alone: storms bring floods and landslides, floods are followed by "
+    "epidemics, droughts by wildfires. A cascade links the events of a country that follow a trigger "
+    "within a few days or weeks, and its toll adds up the deaths of all its events."
+)
+
 TABLE_CARD_CAPTION = (
     "Note: The deadliest disasters are mainly earthquakes, floods, and storms, which cause the most deaths "
     "notably in 2010 with the devastating earthquake in Haiti. This table allows us to identify the most vulnerable "
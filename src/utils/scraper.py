@@ -1,5 +1,6 @@
 import os
 import time
+from typing import Dict, Optional, Set
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -7,9 +8,83 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+# Set DISASTERS_SCRAPER_HEADLESS=1 to run Chrome without a window
+HEADLESS = os.environ.get("DISASTERS_SCRAPER_HEADLESS", "0") == "1"
+
+# Chrome profile directory reused between scrapes, the login is then skipped
+PROFILE_DIR = os.environ.get("DISASTERS_SCRAPER_PROFILE")
+
+# Files of downloads in progress (Chrome, Firefox and Chrome's temporary name)
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp")
+
+# Longest wait for the export, in seconds
+DOWNLOAD_TIMEOUT = 300
+
+# A finished file keeps the same size for this long (s) before it is used
+STABLE_FOR = 1.0
+
+POLL_INTERVAL = 0.2
+
+
+def wait_for_download(
+    download_path: str,
+    before: Set[str],
+    timeout: float = DOWNLOAD_TIMEOUT,
+    stable_for: float = STABLE_FOR,
+    poll_interval: float = POLL_INTERVAL,
+) -> str:
+    """
+    Wait for the file of a download started after listing a directory.
+
+    Only files absent from the listing are considered. The file is returned
+    once no partial download is left in the directory and its size has not
+    changed for stable_for seconds.
+
+    Args:
+        download_path: Directory the browser downloads to
+        before: Names in the directory before the download was started
+        timeout: Longest wait, in seconds
+        stable_for: Time the size must stay the same, in seconds
+        poll_interval: Time between two checks, in seconds
+
+    Returns:
+        Path of the downloaded file
+
+    Raises:
+        TimeoutError: No complete file appeared within timeout
+    """
+    deadline = time.monotonic() + timeout
+    sizes: Dict[str, int] = {}
+    stable_since: Dict[str, float] = {}
+
+    while time.monotonic() < deadline:
+        new = set(os.listdir(download_path)) - before
+        partial = {name for name in new if name.endswith(PARTIAL_SUFFIXES)}
+        complete = sorted(new - partial)
+
+        if complete and not partial:
+            name = complete[0]
+            size = os.path.getsize(os.path.join(download_path, name))
+            now = time.monotonic()
+            if sizes.get(name) != size:
+                sizes[name], stable_since[name] = size, now
+            elif size > 0 and now - stable_since[name] >= stable_for:
+                return os.path.join(download_path, name)
+
+        time.sleep(poll_interval)
+
+    raise TimeoutError(f"No complete download in {download_path} after {timeout:g}s")
+
 
 def download_from_site(
-    url: str, username: str, password: str, download_path: str, filename: str
+    url: str,
+    username: str,
+    password: str,
+    download_path: str,
+    filename: str,
+    headless: bool = HEADLESS,
+    profile_dir: Optional[str] = PROFILE_DIR,
+    timeout: float = DOWNLOAD_TIMEOUT,
 ) -> None:
     """
     Download data file from EMDAT website using Selenium.
@@ -20,6 +95,9 @@ def download_from_site(
         password: EMDAT login password
         download_path: Directory to save downloaded file
         filename: Name to save the file as
+        headless: Run Chrome without a window
+        profile_dir: Chrome profile to reuse, a session still logged in skips the login
+        timeout: Longest wait for the download, in seconds
     """
     chrome_options = Options()
     chrome_options.add_experimental_option(
@@ -31,29 +109,46 @@ def download_from_site(
             "download.suggested_name": filename,
         },
     )
+    if headless:
+        chrome_options.add_argument("--headless=new")
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
 
     driver = webdriver.Chrome(options=chrome_options)
 
     try:
+        if headless:
+            # Headless Chrome ignores the download preferences
+            driver.execute_cdp_cmd(
+                "Browser.setDownloadBehavior", {"behavior": "allow", "downloadPath": download_path}
+            )
+
         # Navigate to the login page
         driver.get(f"{url}/login")
 
-        # Wait for login form elements and fill them
-        username_field = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "username"))
+        # A warm profile may still be logged in: the data link shows instead of the form
+        WebDriverWait(driver, 10).until(
+            EC.any_of(
+                EC.presence_of_element_located((By.ID, "username")),
+                EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/data']")),
+            )
         )
-        password_field = driver.find_element(By.ID, "password")
 
-        username_field.send_keys(username)
-        password_field.send_keys(password)
+        if driver.find_elements(By.ID, "username"):
+            # Fill the login form
+            username_field = driver.find_element(By.ID, "username")
+            password_field = driver.find_element(By.ID, "password")
 
-        # Submit login form
-        login_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable(
-                (By.CSS_SELECTOR, "button.ant-btn-primary[type='submit']")
+            username_field.send_keys(username)
+            password_field.send_keys(password)
+
+            # Submit login form
+            login_button = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable(
+                    (By.CSS_SELECTOR, "button.ant-btn-primary[type='submit']")
+                )
             )
-        )
-        login_button.click()
+            login_button.click()
 
         # Go to data page
         go_button = WebDriverWait(driver, 10).until(
@@ -67,20 +162,15 @@ def download_from_site(
                 (By.XPATH, "//span[contains(text(), 'Download')]")
             )
         )
+        before = set(os.listdir(download_path))
         download_button.click()
 
-        # Wait for download to complete
-        time.sleep(7)
+        # Wait for the new file to be complete, however long the export takes
+        downloaded_file = wait_for_download(download_path, before, timeout)
 
         # Rename downloaded file
-        downloaded_file = max(
-            [os.path.join(download_path, f) for f in os.listdir(download_path)],
-            key=os.path.getctime,
-        )
         target_file = os.path.join(download_path, filename)
-        if os.path.exists(target_file):
-            os.remove(target_file)
-        os.rename(downloaded_file, target_file)
+        os.replace(downloaded_file, target_file)
 
     finally:
         driver.quit()
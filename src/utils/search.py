@@ -0,0 +1,324 @@
+import json
+import re
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import logger
+
+# Text columns of an event searched by the dashboard
+SEARCH_COLUMNS = ["Location", "Event Name", "Country"]
+
+# Orders of the search results: deadliest first, or most recent first
+SEARCH_RANKINGS = ("deaths", "date")
+
+# Shorter tokens only match whole words, a one or two letter prefix would
+# match a large share of the events on every keystroke
+MIN_PREFIX_LENGTH = 3
+
+# Smallest range of ranks scanned for a top-N query
+MIN_SCAN_WINDOW = 1024
+
+# Letters and digits, in any script
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Sorts after every character, closes the vocabulary range of a prefix
+PREFIX_END = "\U0010ffff"
+
+
+def sorted_unique(values: np.ndarray) -> np.ndarray:
+    """
+    Return the distinct values of an integer array, sorted.
+
+    A sort and a comparison of neighbours, several times faster on large
+    arrays than np.unique, which hashes the values first.
+    """
+    values = np.sort(values)
+    if len(values) < 2:
+        return values
+    return values[np.concatenate([[True], values[1:] != values[:-1]])]
+
+
+def tokenize(text: Any) -> List[str]:
+    """
+    Split a text into lowercase words without accents.
+
+    "Port-au-Prince (Ouest)" gives ["port", "au", "prince", "ouest"] and
+    "Río Negro" gives ["rio", "negro"], so that queries need neither case
+    nor accents.
+    """
+    if not isinstance(text, str):
+        return []
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return TOKEN_PATTERN.findall(stripped.casefold())
+
+
+class SearchIndex:
+    """
+    Inverted index over the words of the event locations, names and countries.
+
+    Events are identified by their position in a fixed order (the deadliest
+    first, see DisasterIndexes). The vocabulary is sorted, so the words
+    starting with a prefix are a contiguous range found by binary search.
+    The postings of every word are stored back to back (CSR layout), once
+    per ranking: as positions for "deaths", as date ranks (most recent
+    first) for "date".
+
+    A query matches the events holding all of its words. Its last word is
+    matched as a prefix (the word being typed), the others as whole words.
+
+    Since postings are sorted by rank, the first n results only need the
+    postings of the best ranks: search scans a window of ranks, grown until
+    n events pass the filters, and costs about n instead of the number of
+    matches. Only countries, which needs every match, reads them all.
+    """
+
+    def __init__(self, data: pd.DataFrame, order: np.ndarray):
+        """
+        Args:
+            data: Cleaned disasters DataFrame
+            order: Positions of the events of data in ranking order, the
+                positions returned by the index are positions in this order
+        """
+        events = data.iloc[order].reset_index(drop=True)
+        self.count = len(events)
+        scale = max(self.count, 1)
+
+        # Tokenize each distinct text once, the events only hold its code
+        terms: Dict[str, int] = {}
+        term_parts, position_parts = [], []
+        for column in SEARCH_COLUMNS:
+            if column not in events.columns:
+                continue
+            codes, values = pd.factorize(events[column])
+            pair_terms, pair_values = [], []
+            for value_id, value in enumerate(values):
+                for token in set(tokenize(value)):
+                    pair_terms.append(terms.setdefault(token, len(terms)))
+                    pair_values.append(value_id)
+            if not pair_terms:
+                continue
+
+            # Events grouped by value, in ranking order within each group;
+            # missing values (code -1) sort first and are skipped
+            grouped = np.argsort(codes, kind="stable")
+            lengths = np.bincount(codes[codes >= 0], minlength=len(values))
+            starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]) + int((codes < 0).sum())
+
+            # Expand every (term, value) pair to the events holding the value
+            pair_values_array = np.asarray(pair_values)
+            pair_lengths = lengths[pair_values_array]
+            total = int(pair_lengths.sum())
+            pair_offsets = np.cumsum(pair_lengths) - pair_lengths
+            within = np.arange(total) - np.repeat(pair_offsets, pair_lengths)
+            position_parts.append(grouped[np.repeat(starts[pair_values_array], pair_lengths) + within])
+            term_parts.append(np.repeat(np.asarray(pair_terms), pair_lengths))
+
+        # Alphabetical term ids, for the prefix ranges
+        self.vocabulary: List[str] = sorted(terms)
+        alphabetical = np.empty(len(terms), dtype=np.int64)
+        alphabetical[[terms[term] for term in self.vocabulary]] = np.arange(len(terms))
+
+        # One posting per (term, event), sorted by term then by position. A word
+        # found in several columns of an event (a country named in its location)
+        # is only posted once
+        if term_parts:
+            keys = sorted_unique(alphabetical[np.concatenate(term_parts)] * scale + np.concatenate(position_parts))
+        else:
+            keys = np.empty(0, dtype=np.int64)
+        term_ids = keys // scale
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(term_ids, minlength=len(terms)))]).astype(np.int64)
+
+        # Date ranks, the most recent first (unknown months and days count as 0)
+        years = pd.to_numeric(events["Start Year"], errors="coerce").to_numpy(dtype=float)
+        dates = (
+            years * 10000
+            + pd.to_numeric(events["Start Month"], errors="coerce").fillna(0).to_numpy() * 100
+            + pd.to_numeric(events["Start Day"], errors="coerce").fillna(0).to_numpy()
+        )
+        date_order = np.argsort(-np.nan_to_num(dates, nan=-np.inf), kind="stable")
+        date_ranks = np.empty(self.count, dtype=np.int64)
+        date_ranks[date_order] = np.arange(self.count)
+
+        # Per ranking: the postings as ranks, and the position and year of each rank
+        positions = keys % scale
+        date_keys = term_ids * scale + date_ranks[positions]
+        date_keys.sort()
+        self._postings = {
+            "deaths": positions.astype(np.int32),
+            "date": (date_keys % scale).astype(np.int32),
+        }
+        self._positions = {"deaths": np.arange(self.count, dtype=np.int32), "date": date_order.astype(np.int32)}
+        self._years = {"deaths": years, "date": years[date_order]}
+
+        # Events per year, the share of a year range sizes the first scanned window
+        self._year_values, year_counts = np.unique(years[~np.isnan(years)], return_counts=True)
+        self._year_cumulative = np.concatenate([[0], np.cumsum(year_counts)])
+
+        iso_codes, isos = pd.factorize(events["ISO"], sort=True)
+        self._iso_codes = iso_codes.astype(np.int32)
+        self.isos: List[str] = [str(iso) for iso in isos]
+
+        logger.info(f"Built search index: {len(self.vocabulary)} words, {len(keys)} postings")
+
+    def save(self, directory: Path) -> None:
+        """Write the vocabulary, postings and per-event attributes to directory."""
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "search.json").write_text(json.dumps({"count": self.count, "isos": self.isos}))
+        (directory / "vocabulary.json").write_text(json.dumps(self.vocabulary))
+        np.save(directory / "offsets.npy", self._offsets)
+        np.save(directory / "iso_codes.npy", self._iso_codes)
+        np.save(directory / "year_values.npy", self._year_values)
+        np.save(directory / "year_cumulative.npy", self._year_cumulative)
+        for ranking in SEARCH_RANKINGS:
+            np.save(directory / f"postings_{ranking}.npy", self._postings[ranking])
+            np.save(directory / f"positions_{ranking}.npy", self._positions[ranking])
+            np.save(directory / f"years_{ranking}.npy", self._years[ranking])
+
+    @classmethod
+    def load(cls, directory: Path) -> "SearchIndex":
+        """Load an index written by save, its arrays memory-mapped read-only."""
+        meta = json.loads((directory / "search.json").read_text())
+        index = cls.__new__(cls)
+        index.count = meta["count"]
+        index.isos = meta["isos"]
+        index.vocabulary = json.loads((directory / "vocabulary.json").read_text())
+        index._offsets = np.load(directory / "offsets.npy", mmap_mode="r")
+        index._iso_codes = np.load(directory / "iso_codes.npy", mmap_mode="r")
+        index._year_values = np.load(directory / "year_values.npy")
+        index._year_cumulative = np.load(directory / "year_cumulative.npy")
+        index._postings, index._positions, index._years = {}, {}, {}
+        for ranking in SEARCH_RANKINGS:
+            index._postings[ranking] = np.load(directory / f"postings_{ranking}.npy", mmap_mode="r")
+            index._positions[ranking] = np.load(directory / f"positions_{ranking}.npy", mmap_mode="r")
+            index._years[ranking] = np.load(directory / f"years_{ranking}.npy", mmap_mode="r")
+        return index
+
+    def _term_range(self, token: str, prefix: bool) -> range:
+        """Ids of the vocabulary words equal to token, or starting with it."""
+        start = bisect_left(self.vocabulary, token)
+        if prefix:
+            return range(start, bisect_left(self.vocabulary, token + PREFIX_END, start))
+        found = start < len(self.vocabulary) and self.vocabulary[start] == token
+        return range(start, start + 1 if found else start)
+
+    def _query_terms(self, query: str) -> List[range]:
+        """Vocabulary ranges of the words of a query, the last one as a prefix."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Whole words first, then the prefix, unless it repeats one of them
+        words = {token: False for token in tokens[:-1]}
+        words.setdefault(tokens[-1], len(tokens[-1]) >= MIN_PREFIX_LENGTH)
+        return [self._term_range(token, prefix) for token, prefix in words.items()]
+
+    def _ranks(
+        self,
+        query_terms: List[range],
+        ranking: str,
+        stop: int,
+        start_year: Optional[int],
+        end_year: Optional[int],
+    ) -> np.ndarray:
+        """
+        Ranks below stop of the events holding every word and within the years.
+
+        Unsorted, and an event holding several words of a prefix is repeated.
+        """
+        postings = self._postings[ranking]
+
+        # Sorted posting list of each vocabulary word, cut at stop
+        words = []
+        for terms in query_terms:
+            bounds = self._offsets[terms.start:terms.stop + 1]
+            lists = [postings[first:last] for first, last in zip(bounds[:-1], bounds[1:])]
+            if stop < self.count:
+                # Searched in the dtype of the postings, a wider value would copy them
+                bound = postings.dtype.type(stop)
+                lists = [ranks[:np.searchsorted(ranks, bound)] for ranks in lists]
+            words.append(lists)
+
+        # Candidates from the rarest query word, kept if every other query word
+        # holds them: a binary search in each of its posting lists
+        words.sort(key=lambda lists: sum(len(ranks) for ranks in lists))
+        candidates = np.concatenate(words[0])
+        for lists in words[1:]:
+            found = np.zeros(len(candidates), dtype=bool)
+            for ranks in lists:
+                if len(ranks):
+                    at = np.minimum(np.searchsorted(ranks, candidates), len(ranks) - 1)
+                    found |= ranks[at] == candidates
+            candidates = candidates[found]
+
+        years = self._years[ranking]
+        if start_year is not None:
+            candidates = candidates[years[candidates] >= start_year]
+        if end_year is not None:
+            candidates = candidates[years[candidates] <= end_year]
+        return candidates
+
+    def _year_share(self, start_year: Optional[int], end_year: Optional[int]) -> float:
+        """Share of the events within a year range."""
+        first = 0 if start_year is None else np.searchsorted(self._year_values, start_year, side="left")
+        last = len(self._year_values) if end_year is None else np.searchsorted(self._year_values, end_year, side="right")
+        inside = self._year_cumulative[max(last, first)] - self._year_cumulative[first]
+        return float(inside) / max(self.count, 1)
+
+    def search(
+        self,
+        query: str,
+        rank_by: str = "deaths",
+        n: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Return the positions of the events matching a query, in a ranking.
+
+        Args:
+            query: Words searched, the last one as a prefix
+            rank_by: "deaths" (deadliest first) or "date" (most recent first)
+            n: Number of events returned, all of them if None
+            start_year: First year included
+            end_year: Last year included
+        """
+        if rank_by not in SEARCH_RANKINGS:
+            raise ValueError(f"rank_by must be one of {SEARCH_RANKINGS}, got '{rank_by}'")
+        query_terms = self._query_terms(query)
+        if not query_terms or not all(query_terms):
+            return np.empty(0, dtype=np.int32)
+
+        # First window: where n matches of the rarest word within the years would
+        # fall if its events were spread evenly over the ranks and the years, then
+        # 4 times wider each time fewer than n events pass the other words
+        stop = self.count
+        if n is not None:
+            rarest = min(int(self._offsets[terms.stop] - self._offsets[terms.start]) for terms in query_terms)
+            expected = rarest * self._year_share(start_year, end_year)
+            stop = min(self.count, max(MIN_SCAN_WINDOW, int(2 * n * self.count / max(expected, 1))))
+        while True:
+            ranks = sorted_unique(self._ranks(query_terms, rank_by, stop, start_year, end_year))
+            if n is None or len(ranks) >= n or stop >= self.count:
+                break
+            stop = min(self.count, stop * 4)
+        return self._positions[rank_by][ranks[:n]]
+
+    def countries(
+        self,
+        query: str,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+    ) -> List[str]:
+        """ISO codes of the countries of every event matching a query."""
+        query_terms = self._query_terms(query)
+        if not query_terms or not all(query_terms):
+            return []
+        # Repeated events do not change the set of countries, no need to sort them out
+        codes = self._iso_codes[self._ranks(query_terms, "deaths", self.count, start_year, end_year)]
+        present = np.bincount(codes[codes >= 0], minlength=len(self.isos))
+        return [self.isos[code] for code in np.flatnonzero(present)]
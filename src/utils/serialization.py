@@ -0,0 +1,85 @@
+import base64
+import os
+from typing import Any, Dict, Iterable
+
+import numpy as np
+from plotly.io import json as plotly_json
+
+try:
+    import orjson
+except ImportError:  # plotly falls back to the standard json module
+    orjson = None  # type: ignore[assignment]
+
+# Set DISASTERS_TYPED_ARRAYS=0 to send plain JSON lists (e.g. for an older plotly.js)
+TYPED_ARRAYS_ENABLED = os.environ.get("DISASTERS_TYPED_ARRAYS", "1") != "0"
+
+# Below this size a plain JSON list is as small and cheaper to produce
+TYPED_ARRAY_MIN_SIZE = 16
+
+# Data array attributes of the traces built in src/graphics
+TRACE_ARRAY_KEYS = ("x", "y", "z", "values", "customdata")
+
+# Integer dtypes understood by plotly.js typed arrays, smallest first (no 64 bits integers)
+_INTEGER_DTYPES = ("i1", "u1", "i2", "u2", "i4", "u4")
+
+
+def typed_array(values: Any, min_size: int = TYPED_ARRAY_MIN_SIZE) -> Any:
+    """
+    Encode a numeric array as a plotly.js typed array (base64 'bdata' with a dtype).
+
+    Integers (and whole floats) are stored in the smallest dtype holding
+    their range, other floats as float64 so that no precision is lost.
+    Non numeric or small arrays are returned unchanged, as is everything
+    when TYPED_ARRAYS_ENABLED is off.
+
+    Args:
+        values: Array-like (numpy array, pandas Series or Index, list)
+        min_size: Smallest array encoded
+
+    Returns:
+        A {"dtype", "bdata"[, "shape"]} dict, or values itself
+    """
+    if not TYPED_ARRAYS_ENABLED:
+        return values
+
+    array = np.asarray(values)
+    if array.dtype.kind not in "iuf" or array.size < min_size:
+        return values
+
+    # Whole floats (counts summed as floats) are as well off as integers
+    if array.dtype.kind == "f" and not (np.isfinite(array).all() and (array == np.round(array)).all()):
+        dtype = np.dtype("<f8")
+    else:
+        low, high = array.min(), array.max()
+        fitting = [code for code in _INTEGER_DTYPES
+                   if np.iinfo(code).min <= low and high <= np.iinfo(code).max]
+        dtype = np.dtype("<" + fitting[0]) if fitting else np.dtype("<f8")
+
+    spec = {
+        "dtype": dtype.str[1:],
+        "bdata": base64.b64encode(np.ascontiguousarray(array, dtype=dtype).tobytes()).decode("ascii"),
+    }
+    if array.ndim > 1:
+        spec["shape"] = ",".join(str(length) for length in array.shape)
+    return spec
+
+
+def encode_trace_arrays(trace: Dict[str, Any], keys: Iterable[str] = TRACE_ARRAY_KEYS) -> Dict[str, Any]:
+    """Return a copy of a trace dict with its numeric data arrays encoded as typed arrays."""
+    return {
+        key: typed_array(value) if key in keys else value
+        for key, value in trace.items()
+    }
+
+
+def json_engine() -> str:
+    """
+    Name the JSON encoder used by Dash for callback responses.
+
+    Dash serializes through plotly, which picks orjson when it is installed
+    and falls back to the standard json module otherwise.
+    """
+    engine = plotly_json.config.default_engine
+    if engine == "auto":
+        return "orjson" if orjson is not None else "json"
+    return engine
@@ -16,6 +16,10 @@ def get_project_paths() -> Dict[str, Path]:
         'geo_mapping': project_root / 'data' / 'geo_mapping',
         'geojson_file': project_root / 'data' / 'geo_mapping' / 'countries.geojson',
         'areas_file': project_root / 'data' / 'geo_mapping' / 'countries_area.csv', 
+        'artifacts': project_root / 'data' / 'artifacts',
+        'assets': project_root / 'assets',
+        'profiles': project_root / 'profiles',
+        'src': project_root / 'src',
         'components': project_root / 'src' / 'components',
         'pages': project_root / 'src' / 'pages',
         'utils': project_root / 'src' / 'utils'
@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import flask
+from dash import Dash
+
+from . import logger
+
+# Set DISASTERS_WARMUP=0 to serve (and report ready) without warming up
+WARMUP_ENABLED = os.environ.get("DISASTERS_WARMUP", "1") != "0"
+
+# Single-year ranges warmed up, counted back from the last year of the data
+WARMUP_RECENT_YEARS = 10
+
+YEAR_INPUTS = ("start-year-filter.value", "end-year-filter.value")
+
+
+def collect_props(node: Any, props: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Map each component id of a serialized layout (/_dash-layout) to its props.
+
+    Args:
+        node: Layout, or part of it, as served by Dash
+        props: Mapping filled in place
+    """
+    props = {} if props is None else props
+    if isinstance(node, dict):
+        node_props = node.get("props") if "type" in node else None
+        if isinstance(node_props, dict):
+            if isinstance(node_props.get("id"), str):
+                props[node_props["id"]] = node_props
+            children = node_props.values()
+        else:
+            children = node.values()
+        for child in children:
+            collect_props(child, props)
+    elif isinstance(node, list):
+        for child in node:
+            collect_props(child, props)
+    return props
+
+
+def initial_state(callbacks: List[Dict[str, Any]], props: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Values of every callback input and state ('id.property' keys), as first rendered."""
+    state = {}
+    for callback in callbacks:
+        for dependency in callback["inputs"] + callback["state"]:
+            key = f"{dependency['id']}.{dependency['property']}"
+            state[key] = props.get(dependency["id"], {}).get(dependency["property"])
+    return state
+
+
+def affected_callbacks(callbacks: List[Dict[str, Any]], changed: List[str]) -> List[Dict[str, Any]]:
+    """Server-side callbacks with one of the changed props as input."""
+    return [
+        callback for callback in callbacks
+        if not callback.get("clientside_function")
+        and any(f"{i['id']}.{i['property']}" in changed for i in callback["inputs"])
+    ]
+
+
+def callback_request(callback: Dict[str, Any], state: Dict[str, Any], changed: List[str]) -> Dict[str, Any]:
+    """
+    Build the _dash-update-component body the browser sends for a callback.
+
+    Args:
+        callback: Callback as listed by /_dash-dependencies
+        state: Current value of every prop ('id.property' keys)
+        changed: Props whose change triggers the callback
+    """
+    def values(dependencies: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        return [
+            {**dependency, "value": state.get(f"{dependency['id']}.{dependency['property']}")}
+            for dependency in dependencies
+        ]
+
+    inputs = {f"{i['id']}.{i['property']}" for i in callback["inputs"]}
+    outputs = [
+        dict(zip(("id", "property"), output.rsplit(".", 1)))
+        for output in callback["output"].strip(".").split("...")
+    ]
+    return {
+        "output": callback["output"],
+        "outputs": outputs if callback["output"].startswith("..") else outputs[0],
+        "inputs": values(callback["inputs"]),
+        "state": values(callback["state"]),
+        "changedPropIds": [key for key in changed if key in inputs],
+    }
+
+
+class WarmUp:
+    """
+    Run the dashboard callbacks for the common views before serving users.
+
+    Requests go through the app's own request handling (Flask test client),
+    so they fill the callback response cache and load every pandas and
+    plotly code path exactly as user requests would. The views warmed up
+    are the default state and, for the last WARMUP_RECENT_YEARS years of
+    the data, the last decade and every single-year range.
+
+    The requests are shaped like the browser's, whose triggers are part of
+    the cache keys: the first load runs the callbacks without
+    prevent_initial_call with no input changed, then the year dropdowns
+    are changed one at a time, the start year first.
+    """
+
+    def __init__(self, app: Dash, last_year: int):
+        self.app = app
+        self.last_year = last_year
+        self.ready = threading.Event()
+        self.done = 0
+        self.failed = 0
+        self.total: Optional[int] = None
+
+    def scenarios(self) -> List[List[Tuple[str, int]]]:
+        """Year filter changes warmed up after the first load, as (prop, value) steps from the default state."""
+        first = self.last_year - WARMUP_RECENT_YEARS + 1
+        ranges = [(first, self.last_year)] + [(year, year) for year in range(self.last_year, first - 1, -1)]
+        return [list(zip(YEAR_INPUTS, years)) for years in ranges]
+
+    def run(self) -> None:
+        start = time.perf_counter()
+        client = self.app.server.test_client()
+        prefix = self.app.config.routes_pathname_prefix
+        try:
+            props = collect_props(client.get(f"{prefix}_dash-layout").get_json())
+            callbacks = client.get(f"{prefix}_dash-dependencies").get_json()
+            default = initial_state(callbacks, props)
+
+            requests = [
+                callback_request(callback, default, [])
+                for callback in callbacks
+                if not callback.get("clientside_function") and not callback.get("prevent_initial_call")
+            ]
+            for steps in self.scenarios():
+                state = dict(default)
+                for key, value in steps:
+                    # Picking the value already selected fires nothing
+                    if state.get(key) == value:
+                        continue
+                    state[key] = value
+                    requests.extend(
+                        callback_request(callback, state, [key])
+                        for callback in affected_callbacks(callbacks, [key])
+                    )
+
+            self.total = len(requests)
+            for body in requests:
+                response = client.post(f"{prefix}_dash-update-component", json=body)
+                self.done += 1
+                self.failed += response.status_code not in (200, 204)
+        except Exception as e:
+            logger.error(f"Warm-up stopped: {e}")
+        finally:
+            self.ready.set()
+
+        logger.info(
+            f"Warm-up ran {self.done} callbacks ({self.failed} failed) "
+            f"in {time.perf_counter() - start:.1f}s, ready for traffic"
+        )
+
+    def start(self) -> None:
+        """Warm up in a background thread, the server accepts connections meanwhile."""
+        self.ready.clear()
+        self.done = self.failed = 0
+        threading.Thread(target=self.run, name="warm-up", daemon=True).start()
+
+
+def init_warmup(app: Dash, last_year: int) -> WarmUp:
+    """
+    Warm up the callbacks and serve /ready.
+
+    /ready answers 503 until the warm-up finished, 200 afterwards; /health
+    keeps answering as soon as the server runs. With gunicorn --preload,
+    workers forked before the master finished warming up warm up again.
+
+    Args:
+        app: Dash application instance, with its layout and callbacks registered
+        last_year: Last year of the data
+
+    Returns:
+        The warm-up, started unless DISASTERS_WARMUP=0
+    """
+    warmup = WarmUp(app, last_year)
+
+    @app.server.route("/ready")
+    def ready() -> Tuple[flask.Response, int]:
+        if warmup.ready.is_set():
+            return flask.jsonify({"ready": True}), 200
+        return flask.jsonify({"ready": False, "done": warmup.done, "total": warmup.total}), 503
+
+    if not WARMUP_ENABLED:
+        warmup.ready.set()
+        return warmup
+
+    # The warm-up thread does not survive a fork, unfinished warm-ups start over
+    os.register_at_fork(after_in_child=lambda: None if warmup.ready.is_set() else warmup.start())
+    warmup.start()
+    return warmup